@@ -0,0 +1,5 @@
+"""AI research assistant built on LangGraph and Ollama.
+
+Submodules are imported on demand; use ``research_assistant.agent_graph.get_app()``
+to build and compile the pipeline on first use.
+"""
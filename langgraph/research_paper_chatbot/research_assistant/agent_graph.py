@@ -1,13 +1,21 @@
+import asyncio
 import logging
-import json
+import argparse
 import os
+import threading
+import time
+from collections import OrderedDict
 from typing import TypedDict, List, Dict, Any, Optional
-from langgraph.graph import StateGraph
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Heavy dependencies (langgraph, langchain, ollama, serpapi, PyPDF2) are imported
+# inside build_graph() so importing this module, or running --help, stays fast.
 logger = logging.getLogger(__name__)
 
+NOTES_DIR = os.path.join(os.path.dirname(__file__), "..", "notes")
+
+# LLM tasks of the graph; models are chosen per task by utils.model_router unless pinned
+LLM_TASKS = ["topic_explainer", "related_topics", "summarizer", "research_draft"]
+
 def log_state(state: Dict, node_name: str):
     """Log the current state in a readable format."""
     logger.info(f"\n{'='*50}")
@@ -62,57 +70,75 @@ class State(TypedDict):
     summaries: Optional[List[Dict[str, Any]]]
     notes: Optional[List[Dict[str, Any]]]
     draft: Optional[str]
+    research_draft: Optional[str]
+    processed_papers: Optional[List[Dict[str, Any]]]
+    search_error: Optional[str]
+    cleaning_report: Optional[Dict[str, Any]]
+    # Output files
+    notes_file: Optional[str]
+    report_path: Optional[str]
+    export_paths: Optional[Dict[str, str]]
+    # Key of this run's background exports; see exporter.wait_for_exports
+    export_id: Optional[str]
     # Add error tracking
     error: Optional[str]
     current_stage: Optional[str]
+    # Catalog run this state belongs to; node timings are recorded against it
+    run_id: Optional[str]
+    # Refresh runs: outputs of the previous run, and the papers/summaries carried over from it
+    previous_run: Optional[Dict[str, Any]]
+    known_papers: Optional[List[Dict[str, Any]]]
+    reused_summaries: Optional[List[Dict[str, Any]]]
 
-from research_assistant.nodes.topic_explainer import TopicExplainerNode
-from research_assistant.nodes.related_topics import RelatedTopicsNode
-from research_assistant.nodes.scholar_search import ScholarSearchNode
-from research_assistant.nodes.pdf_downloader import PDFDownloaderNode
-from research_assistant.nodes.pdf_processor import PDFProcessorNode
-from research_assistant.nodes.pdf_parser import PDFParserNode
-from research_assistant.nodes.rag_summarizer import EnhancedResearchSummarizerNode
-from research_assistant.nodes.note_saver import NoteSaverNode
-from research_assistant.nodes.research_draft import ResearchDraftNode
-from research_assistant.nodes.report_generator import ReportGeneratorNode
+def as_node(func, afunc=None, name: Optional[str] = None):
+    """Pair a node's sync and async implementations so both app.invoke and app.ainvoke use the right one."""
+    afunc = afunc or getattr(func, "acall", None)
+    if afunc is None:
+        # LangGraph runs sync-only nodes in a worker thread under ainvoke
+        return func
+    from langchain_core.runnables import RunnableLambda
+    return RunnableLambda(func, afunc=afunc, name=name)
 
-# Create the graph with state schema
-graph = StateGraph(State)
+def record_timing(state: Dict, node_name: str, started: float, outcome: str = "ok") -> None:
+    """Store how long a node took in the catalog run of this state, if there is one."""
+    if not state.get("run_id"):
+        return
+    try:
+        from research_assistant.utils.catalog import get_catalog
+        get_catalog().record_node(state["run_id"], node_name, time.perf_counter() - started, outcome)
+    except Exception as e:
+        logger.warning(f"Could not record timing of {node_name}: {str(e)}")
 
 # Add nodes with logging wrappers
 def wrap_with_logging(node_func, node_name):
     def wrapper(state):
         logger.info(f"\n{'*'*20} ENTERING {node_name.upper()} {'*'*20}")
-        result = node_func(state)
+        started = time.perf_counter()
+        try:
+            result = node_func(state)
+        except Exception:
+            record_timing(state, node_name, started, "error")
+            raise
+        record_timing(state, node_name, started)
         log_state(result, node_name)
         return result
-    return wrapper
-
-# Add nodes with logging
-graph.add_node("topic_explainer", wrap_with_logging(TopicExplainerNode(), "topic_explainer"))
-graph.add_node("related_topics", wrap_with_logging(RelatedTopicsNode(), "related_topics"))
-graph.add_node("scholar_search", wrap_with_logging(ScholarSearchNode(max_results=10, year_min=2020), "scholar_search"))
-graph.add_node("pdf_downloader", wrap_with_logging(PDFDownloaderNode(), "pdf_downloader"))
-graph.add_node("pdf_processor", wrap_with_logging(PDFProcessorNode(), "pdf_processor"))
-graph.add_node("pdf_parser", wrap_with_logging(PDFParserNode(), "pdf_parser"))
-# Initialize the enhanced research summarizer
-summarizer = EnhancedResearchSummarizerNode(model_name="llama2")
-graph.add_node("summarizer", wrap_with_logging(summarizer, "summarizer"))
-graph.add_node("note_saver", NoteSaverNode(output_dir=os.path.join(os.path.dirname(__file__), "..", "notes")))
-graph.add_node("research_draft", ResearchDraftNode())
-graph.add_node("report_generator", ReportGeneratorNode(output_dir=os.path.join(os.path.dirname(__file__), "..", "notes")))
-
-# Create a notes directory if it doesn't exist
-notes_dir = os.path.join(os.path.dirname(__file__), "..", "notes")
-os.makedirs(notes_dir, exist_ok=True)
-
-# Define the edges with conditional routing
-graph.add_edge("topic_explainer", "related_topics")
-graph.add_edge("related_topics", "scholar_search")
-graph.add_edge("scholar_search", "pdf_downloader")
-graph.add_edge("pdf_downloader", "pdf_processor")
-graph.add_edge("pdf_processor", "pdf_parser")
+
+    acall = getattr(node_func, "acall", None)
+    if acall is None:
+        return as_node(wrapper, name=node_name)
+
+    async def awrapper(state):
+        logger.info(f"\n{'*'*20} ENTERING {node_name.upper()} {'*'*20}")
+        started = time.perf_counter()
+        try:
+            result = await acall(state)
+        except Exception:
+            record_timing(state, node_name, started, "error")
+            raise
+        record_timing(state, node_name, started)
+        log_state(result, node_name)
+        return result
+    return as_node(wrapper, awrapper, node_name)
 
 def should_summarize(state: State) -> str:
     """Decide whether to summarize or skip to draft generation."""
@@ -121,51 +147,273 @@ def should_summarize(state: State) -> str:
     logger.warning("No parsed content available, skipping summarization")
     return "research_draft"
 
-# Add conditional edge for summarization
-graph.add_conditional_edges(
-    "pdf_parser",
-    should_summarize,
-    {
-        "summarizer": "summarizer",
-        "research_draft": "research_draft"
+def entry_node(state: State) -> str:
+    """Refresh runs reuse the previous explanation and related topics and start at the search."""
+    return "scholar_search" if state.get("previous_run") else "topic_explainer"
+
+def build_graph(max_papers: int = 10, min_year: Optional[int] = 2020,
+                output_dir: str = NOTES_DIR, expand_queries: bool = False,
+                draft_mode: str = "single", models: Optional[Dict[str, str]] = None,
+                depth: str = "auto"):
+    """Instantiate all nodes and wire them into an uncompiled StateGraph."""
+    # Pinned models per task; unpinned tasks are routed by model tier and latency target
+    models = models or {}
+    from langgraph.graph import StateGraph
+
+    from research_assistant.nodes.topic_explainer import TopicExplainerNode
+    from research_assistant.nodes.related_topics import RelatedTopicsNode
+    from research_assistant.nodes.scholar_search import ScholarSearchNode
+    from research_assistant.nodes.paper_dedup import PaperDedupNode
+    from research_assistant.nodes.refresh import RefreshNode
+    from research_assistant.nodes.pdf_downloader import PDFDownloaderNode
+    from research_assistant.nodes.pdf_processor import PDFProcessorNode
+    from research_assistant.nodes.pdf_parser import PDFParserNode
+    from research_assistant.nodes.content_cleaner import ContentCleanerNode
+    from research_assistant.nodes.rag_summarizer import EnhancedResearchSummarizerNode
+    from research_assistant.nodes.research_draft import ResearchDraftNode
+    from research_assistant.nodes.exporter import ExportNode
+    from research_assistant.utils.acquisition import AcquisitionPolicy
+
+    # Create the graph with state schema
+    graph = StateGraph(State)
+
+    # Create a notes directory if it doesn't exist
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Add nodes with logging
+    graph.add_node("topic_explainer", wrap_with_logging(TopicExplainerNode(model=models.get("topic_explainer")), "topic_explainer"))
+    graph.add_node("related_topics", wrap_with_logging(RelatedTopicsNode(model=models.get("related_topics")), "related_topics"))
+    graph.add_node("scholar_search", wrap_with_logging(
+        ScholarSearchNode(max_results=max_papers, year_min=min_year, expand_queries=expand_queries),
+        "scholar_search"
+    ))
+    graph.add_node("search_dedup", wrap_with_logging(PaperDedupNode(stage="search"), "search_dedup"))
+    # Both refresh stages pass the state through unchanged outside refresh runs
+    graph.add_node("refresh_diff", wrap_with_logging(RefreshNode(stage="diff"), "refresh_diff"))
+    graph.add_node("refresh_merge", wrap_with_logging(RefreshNode(stage="merge"), "refresh_merge"))
+    # Shared so the downloader, processor and parser agree on which papers need full text
+    acquisition = AcquisitionPolicy(depth=depth)
+    graph.add_node("pdf_downloader", wrap_with_logging(PDFDownloaderNode(acquisition=acquisition), "pdf_downloader"))
+    graph.add_node("pdf_processor", wrap_with_logging(PDFProcessorNode(acquisition=acquisition), "pdf_processor"))
+    graph.add_node("pdf_parser", wrap_with_logging(PDFParserNode(acquisition=acquisition), "pdf_parser"))
+    graph.add_node("content_dedup", wrap_with_logging(PaperDedupNode(stage="parsed"), "content_dedup"))
+    # Strip headers/footers, references and hyphenation before any text reaches an LLM
+    graph.add_node("content_cleaner", wrap_with_logging(ContentCleanerNode(), "content_cleaner"))
+    # Initialize the enhanced research summarizer
+    summarizer = EnhancedResearchSummarizerNode(model_name=models.get("summarizer"))
+    graph.add_node("summarizer", wrap_with_logging(summarizer, "summarizer"))
+    graph.add_node("research_draft", wrap_with_logging(
+        ResearchDraftNode(mode=draft_mode, model=models.get("research_draft")), "research_draft"
+    ))
+    # Notes, report, JSON and NDJSON are rendered in one pass, off the critical path
+    graph.add_node("exporter", wrap_with_logging(ExportNode(output_dir=output_dir), "exporter"))
+
+    # Define the edges with conditional routing
+    graph.add_edge("topic_explainer", "related_topics")
+    graph.add_edge("related_topics", "scholar_search")
+    graph.add_edge("scholar_search", "search_dedup")
+    graph.add_edge("search_dedup", "refresh_diff")
+    graph.add_edge("refresh_diff", "pdf_downloader")
+    graph.add_edge("pdf_downloader", "pdf_processor")
+    graph.add_edge("pdf_processor", "pdf_parser")
+    graph.add_edge("pdf_parser", "content_dedup")
+    graph.add_edge("content_dedup", "content_cleaner")
+
+    # Add conditional edge for summarization
+    graph.add_conditional_edges(
+        "content_cleaner",
+        should_summarize,
+        {
+            "summarizer": "summarizer",
+            "research_draft": "refresh_merge"
+        }
+    )
+
+    graph.add_edge("summarizer", "refresh_merge")
+    graph.add_edge("refresh_merge", "research_draft")
+    graph.add_edge("research_draft", "exporter")
+
+    # Set the entry point
+    graph.set_conditional_entry_point(
+        entry_node,
+        {"topic_explainer": "topic_explainer", "scholar_search": "scholar_search"}
+    )
+    return graph
+
+def required_models(models: Optional[Dict[str, str]] = None, draft_mode: str = "single", **config) -> Dict[str, int]:
+    """Every Ollama model the graph built with this configuration will call, with the num_ctx to load it at."""
+    from research_assistant.utils.model_router import default_router
+    models = dict(models or {})
+    tasks = list(LLM_TASKS)
+    if draft_mode == "sectional":
+        tasks.append("draft_outline")
+        # A pinned draft model is used for the outline as well
+        if models.get("research_draft"):
+            models.setdefault("draft_outline", models["research_draft"])
+    return default_router.contexts(default_router.plan(tasks, models))
+
+# Compiled graphs by configuration, least recently used first; every job option
+# combination compiles its own graph, so the cache is bounded
+MAX_APPS = int(os.getenv("RESEARCH_MAX_GRAPHS", "8"))
+_apps: "OrderedDict[str, Any]" = OrderedDict()
+_apps_lock = threading.Lock()
+
+def get_app(**config):
+    """Return the compiled graph for this configuration, building it on first use."""
+    key = repr(sorted(config.items()))
+    with _apps_lock:
+        if key in _apps:
+            _apps.move_to_end(key)
+            return _apps[key]
+        # Compile the graph with error handling
+        try:
+            app = build_graph(**config).compile()
+            logger.info("Graph compiled successfully")
+        except Exception as e:
+            logger.error(f"Error compiling graph: {str(e)}")
+            raise
+        _apps[key] = app
+        while len(_apps) > MAX_APPS:
+            _apps.popitem(last=False)
+        return app
+
+def __getattr__(name: str):
+    # Keep `from research_assistant.agent_graph import app` working without compiling at import time
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def initial_state(topic: str, run_id: Optional[str] = None) -> Dict[str, Any]:
+    """Return an empty pipeline state for the given topic."""
+    return {
+        "run_id": run_id,
+        "topic": topic,
+        "explanation": None,
+        "related_topics": None,
+        "search_results": None,
+        "selected_papers": None,
+        "pdf_links": None,
+        "downloaded_files": None,
+        "parsed_content": None,
+        "summaries": None,
+        "notes": None,
+        "draft": None
     }
-)
 
-graph.add_edge("summarizer", "research_draft")
-graph.add_edge("research_draft", "note_saver")
-graph.add_edge("note_saver", "report_generator")
+def load_previous_run(topic: str) -> Optional[Dict[str, Any]]:
+    """Outputs of the latest completed run of a topic, or None."""
+    from research_assistant.utils.artifact_store import get_store
+    from research_assistant.utils.catalog import get_catalog
+    try:
+        last = get_catalog().last_run(topic)
+        if not last:
+            return None
+        return dict(get_store().get_json(last["result_ref"]), run_id=last["run_id"], started=last["started"])
+    except Exception as e:
+        logger.warning(f"Could not load the previous run of {topic!r}: {str(e)}")
+        return None
 
-# Set the entry point
-graph.set_entry_point("topic_explainer")
+def start_run(topic: str, refresh: bool = False, **config) -> Dict[str, Any]:
+    """Initial state for a run recorded in the catalog (unrecorded if the catalog is unavailable).
 
-# Compile the graph with error handling
-try:
-    app = graph.compile()
-    logger.info("Graph compiled successfully")
-except Exception as e:
-    logger.error(f"Error compiling graph: {str(e)}")
-    raise
+    With refresh, the previous run of the topic is loaded so only new papers are processed.
+    """
+    from research_assistant.utils.catalog import get_catalog
+    try:
+        state = initial_state(topic, get_catalog().start_run(topic, dict(config, refresh=refresh)))
+    except Exception as e:
+        logger.warning(f"Could not record run in the catalog: {str(e)}")
+        state = initial_state(topic)
+    previous = load_previous_run(topic) if refresh else None
+    if previous:
+        logger.info(f"Refreshing {topic!r} from run {previous['run_id']}")
+        state.update(previous_run=previous, explanation=previous.get("explanation"),
+                     related_topics=previous.get("related_topics"))
+    elif refresh:
+        logger.info(f"No previous run of {topic!r}; running the full pipeline")
+    return state
+
+def finish_run(state: Dict[str, Any], status: str = "completed") -> None:
+    """Close the state's catalog run, recording which papers it covered."""
+    if not state.get("run_id"):
+        return
+    from research_assistant.utils.artifact_store import get_store
+    from research_assistant.utils.catalog import get_catalog
+    try:
+        catalog = get_catalog()
+        catalog.add_run_papers(state["run_id"], [p.get("paper_id") for p in state.get("search_results") or []
+                                                 if isinstance(p, dict)])
+        # What a later refresh of this topic starts from
+        result_ref = get_store().put_json({
+            "explanation": state.get("explanation"),
+            "related_topics": state.get("related_topics"),
+            "summaries": state.get("summaries") or []
+        }) if status == "completed" else None
+        catalog.finish_run(state["run_id"], status, result_ref)
+        timings = catalog.run_timings(state["run_id"])
+        logger.info("Node timings: " + ", ".join(f"{node} {seconds:.1f}s" for node, seconds in timings.items()))
+    except Exception as e:
+        logger.warning(f"Could not finish run {state['run_id']} in the catalog: {str(e)}")
+
+async def arun(topic: str, refresh: bool = False, **config) -> Dict[str, Any]:
+    """Run the pipeline with app.ainvoke so I/O-bound nodes overlap on one event loop."""
+    from research_assistant.nodes.exporter import wait_for_exports
+    result = await get_app(**config).ainvoke(start_run(topic, refresh=refresh, **config))
+    # The run is only finished once its notes and report are on disk
+    await asyncio.to_thread(wait_for_exports, result.get("export_id"))
+    finish_run(result)
+    return result
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the research assistant pipeline on a topic.")
+    parser.add_argument("--topic", default="AI in education", help="Research topic")
+    parser.add_argument("--max_papers", type=int, default=10, help="Maximum papers to process")
+    parser.add_argument("--min_year", type=int, default=2020, help="Minimum publication year")
+    parser.add_argument("--output_dir", default=NOTES_DIR, help="Directory to save outputs")
+    parser.add_argument("--expand_queries", action="store_true",
+                        help="Also search each related topic and fuse the rankings")
+    parser.add_argument("--draft_mode", choices=["single", "sectional"], default="single",
+                        help="Draft in one call, or outline first and draft sections concurrently")
+    parser.add_argument("--depth", choices=["abstract", "auto", "full"], default="auto",
+                        help="Summarize from abstracts, fetch full PDFs only for thin abstracts, or always fetch")
+    parser.add_argument("--model", action="append", default=[], metavar="TASK=MODEL",
+                        help=f"Pin the model for a task ({', '.join(LLM_TASKS)}); repeatable")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Only process papers that are new since the last run of this topic")
+    parser.add_argument("--use_async", action="store_true",
+                        help="Run the graph with ainvoke: concurrent downloads, parsing and LLM calls")
+    parser.add_argument("--release_models", action="store_true",
+                        help="Unload the models this run loaded when it ends, instead of after OLLAMA_KEEP_ALIVE")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    # Configure logging
+    logging.basicConfig(level=logging.INFO)
+
+    from research_assistant.utils.model_manager import ModelLifecycleManager
+    config = dict(max_papers=args.max_papers, min_year=args.min_year, output_dir=args.output_dir,
+                  expand_queries=args.expand_queries, draft_mode=args.draft_mode,
+                  depth=args.depth)
+    pinned = dict(item.split("=", 1) for item in args.model if "=" in item)
+    if pinned:
+        config["models"] = pinned
+    model_manager = ModelLifecycleManager()
+    state: Dict[str, Any] = {}
 
-if __name__ == "__main__":
     try:
         logger.info("Starting research assistant...")
-        # Example usage with proper state dictionary
-        initial_state = {
-            "topic": "AI in education",
-            "explanation": None,
-            "related_topics": None,
-            "search_results": None,
-            "selected_papers": None,
-            "pdf_links": None,
-            "downloaded_files": None,
-            "parsed_content": None,
-            "summaries": None,
-            "notes": None,
-            "draft": None
-        }
-        
-        logger.info(f"Processing topic: {initial_state['topic']}")
-        result = app.invoke(initial_state)
+        # Load every model in the background while the first nodes and the search run
+        model_manager.start(required_models(**config))
+        app = get_app(**config)
+        state = start_run(args.topic, refresh=args.refresh, **config)
+
+        logger.info(f"Processing topic: {state['topic']}")
+        if args.use_async:
+            import asyncio
+            result = asyncio.run(app.ainvoke(state))
+        else:
+            result = app.invoke(state)
         
         # Log final state
         logger.info("\n" + "="*50)
@@ -182,9 +430,21 @@ if __name__ == "__main__":
         else:
             logger.warning("No summaries were generated")
             
-        if 'notes_file' in result:
+        # Exports are written in the background; make sure they land before exiting
+        from research_assistant.nodes.exporter import wait_for_exports
+        wait_for_exports(result.get("export_id"))
+        finish_run(result)
+        if result.get('notes_file'):
             logger.info(f"\nNotes saved to: {result['notes_file']}")
+        return result
         
     except Exception as e:
         logger.error(f"Error in research pipeline: {str(e)}", exc_info=True)
+        finish_run(state, "failed")
         raise
+    finally:
+        if args.release_models:
+            model_manager.release()
+
+if __name__ == "__main__":
+    main()
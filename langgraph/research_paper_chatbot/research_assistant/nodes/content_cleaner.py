@@ -0,0 +1,52 @@
+import logging
+from typing import Dict, Any, Optional
+
+from research_assistant.utils.artifact_store import get_store, load_text, make_text_handle
+from research_assistant.utils.text_cleaner import TextCleaner, default_cleaner
+
+logger = logging.getLogger(__name__)
+
+class ContentCleanerNode:
+    """Strip headers/footers, references and line-break hyphens from parsed content before any LLM call."""
+
+    def __init__(self, cleaner: Optional[TextCleaner] = None):
+        self.cleaner = cleaner or default_cleaner
+        self.store = get_store()
+
+    def __call__(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace each parsed text with its cleaned version and report the token savings."""
+        papers = state.get("parsed_content")
+        if not papers:
+            return state
+
+        before = after = 0
+        removed: Dict[str, int] = {}
+        cleaned_papers = []
+        for paper in papers:
+            if not isinstance(paper, dict):
+                continue
+            try:
+                result = self.cleaner.clean(load_text(paper, store=self.store))
+                # Drop the old handle fields before adding the new ones
+                paper = {k: v for k, v in paper.items() if k not in ("content", "content_ref", "content_chars")}
+                paper.update(make_text_handle(result.text, store=self.store))
+                paper["tokens_saved"] = result.tokens_saved
+                before += result.tokens_before
+                after += result.tokens_after
+                for rule, chars in result.removed.items():
+                    removed[rule] = removed.get(rule, 0) + chars
+            except Exception as e:
+                logger.error(f"Error cleaning content for {paper.get('title', 'Unknown')}: {str(e)}")
+            cleaned_papers.append(paper)
+
+        saved = before - after
+        share = saved / before if before else 0.0
+        logger.info(f"Cleaning cut LLM input from ~{before} to ~{after} tokens ({share:.0%} saved)")
+        state["parsed_content"] = cleaned_papers
+        state["cleaning_report"] = {
+            "tokens_before": before,
+            "tokens_after": after,
+            "tokens_saved": saved,
+            "chars_removed": removed
+        }
+        return state
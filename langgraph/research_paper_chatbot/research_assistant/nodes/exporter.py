@@ -0,0 +1,376 @@
+import os
+import re
+import json
+import uuid
+import atexit
+import logging
+import threading
+import concurrent.futures
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from research_assistant.utils.search_index import SearchIndex, get_index
+
+logger = logging.getLogger(__name__)
+
+# Keys the sinks read; everything else in the state is left behind when exporting
+EXPORT_KEYS = ["topic", "explanation", "related_topics", "search_results", "summaries", "research_draft"]
+
+_BUFFER_SIZE = 1 << 16
+
+
+class ExportSink:
+    """One output file, written through a large buffer and renamed into place when complete."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._tmp_path = path.with_name(f".{path.name}.tmp")
+        self._file = None
+
+    def open(self) -> None:
+        self._file = open(self._tmp_path, "w", encoding="utf-8", buffering=_BUFFER_SIZE)
+
+    def write(self, text: str) -> None:
+        self._file.write(text)
+
+    def close(self, success: bool = True) -> None:
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        if success:
+            os.replace(self._tmp_path, self.path)
+        else:
+            self._tmp_path.unlink(missing_ok=True)
+
+    # Rendering hooks, called once per run in this order
+    def begin(self, state: Dict[str, Any], now: datetime) -> None:
+        pass
+
+    def paper(self, index: int, paper: Dict[str, Any], summary: Optional[Dict[str, Any]]) -> None:
+        pass
+
+    def summary(self, index: int, summary: Dict[str, Any]) -> None:
+        pass
+
+    def end(self, state: Dict[str, Any]) -> None:
+        pass
+
+
+class MarkdownNotesSink(ExportSink):
+    """Research notes: explanation, related topics, search results and summaries."""
+
+    def _format_metadata(self, metadata: Dict[str, Any]) -> str:
+        """Format metadata dictionary as markdown."""
+        lines = ["### Metadata\n"]
+        for key, value in metadata.items():
+            if value and value not in ["", "N/A"]:
+                if isinstance(value, (list, tuple)):
+                    value = ", ".join(str(v) for v in value if v)
+                lines.append(f"- **{key.replace('_', ' ').title()}:** {value}")
+        return "\n".join(lines) + "\n"
+
+    def begin(self, state: Dict[str, Any], now: datetime) -> None:
+        topic = state.get("topic", "research_notes")
+        self.write(f"# Research Notes: {topic}\n\n")
+        self.write(f"*Generated on: {now.strftime('%Y-%m-%d %H:%M:%S')}*\n\n")
+
+        if state.get("explanation"):
+            self.write(f"## Topic Explanation\n\n{state['explanation']}\n\n")
+
+        related_topics = state.get("related_topics")
+        if related_topics:
+            self.write("## Related Topics\n\n")
+            if isinstance(related_topics, str):
+                self.write(f"{related_topics}\n\n")
+            elif isinstance(related_topics, (list, tuple)):
+                self.write("\n".join(f"- {t}" for t in related_topics))
+                self.write("\n\n")
+
+        papers = state.get("search_results")
+        if papers:
+            self.write(f"## Search Results\n\nFound {len(papers)} papers.\n\n")
+
+    def paper(self, index: int, paper: Dict[str, Any], summary: Optional[Dict[str, Any]]) -> None:
+        self.write(f"### {index}. {paper.get('title', 'Untitled')}\n")
+        if paper.get("snippet"):
+            self.write(f"**Abstract:** {paper['snippet']}\n\n")
+        if paper.get("link"):
+            self.write(f"**🔗 [View Paper]({paper['link']})**  ")
+        if paper.get("publication_info"):
+            self.write(f"**Published in:** {paper['publication_info']}  ")
+        if paper.get("year"):
+            self.write(f"**Year:** {paper['year']}")
+        self.write("\n\n---\n\n")
+
+    def summary(self, index: int, summary: Dict[str, Any]) -> None:
+        if index == 1:
+            self.write("## Research Summaries\n\n")
+        self.write(f"### {index}. {summary.get('title', f'Summary {index}')}\n\n")
+        source = summary.get("source")
+        if source:
+            self.write(f"**Source:** [{source}]({source})\n\n")
+        metadata = summary.get("metadata")
+        if metadata:
+            self.write(self._format_metadata(metadata))
+        self.write(f"{summary.get('summary', '')}\n\n---\n\n")
+
+    def end(self, state: Dict[str, Any]) -> None:
+        if not state.get("summaries"):
+            self.write("## Research Summaries\n\nNo paper summaries were generated.\n\n")
+        draft = state.get("research_draft")
+        if draft:
+            self.write(f"## Research Draft\n\n{draft}\n\n")
+        self.write("\n---\n")
+        self.write("*This document was automatically generated by the Research Assistant.*\n")
+
+
+class MarkdownReportSink(ExportSink):
+    """Comprehensive report with key papers, themes and references."""
+
+    max_papers = 10
+
+    def begin(self, state: Dict[str, Any], now: datetime) -> None:
+        self._references: List[str] = []
+        self.write(f"# {state.get('topic', 'Research Topic')}: Research Summary\n\n")
+        self.write(f"*Generated on: {now.strftime('%B %d, %Y')}*\n\n")
+        self.write(
+            "## Table of Contents\n"
+            "1. [Introduction](#introduction)\n"
+            "2. [Key Research Papers](#key-research-papers)\n"
+            "3. [Common Themes](#common-themes)\n"
+            "4. [Technical Approaches](#technical-approaches)\n"
+            "5. [Challenges and Limitations](#challenges-and-limitations)\n"
+            "6. [Future Directions](#future-directions)\n"
+            "7. [References](#references)\n\n"
+        )
+        self.write(f"## Introduction\n\n{state.get('explanation') or ''}\n\n")
+        self.write("## Key Research Papers\n\n")
+
+    def paper(self, index: int, paper: Dict[str, Any], summary: Optional[Dict[str, Any]]) -> None:
+        if index > self.max_papers:
+            return
+        title = paper.get("title", f"Paper {index}")
+        link = paper.get("link") or "#"
+        self.write(f"### {index}. {title}\n")
+        if link != "#":
+            self.write(f"**Source:** [{link}]({link})  \n")
+        if "year" in paper:
+            self.write(f"**Year:** {paper['year']}  \n")
+        if "publication_info" in paper:
+            self.write(f"**Published in:** {paper['publication_info']}  \n")
+        self.write(f"\n{paper.get('snippet') or 'No abstract available.'}\n\n")
+        self._references.append(f"{index}. [{title}]({link})\n")
+
+    def end(self, state: Dict[str, Any]) -> None:
+        self.write("## Common Themes\n\n")
+        related_topics = state.get("related_topics") or []
+        if related_topics:
+            self.write("### Key Areas:\n")
+            self.write("".join(f"- {topic}\n" for topic in related_topics))
+            self.write("\n")
+
+        self.write("## Technical Approaches\n\n")
+        self.write("*Technical approaches would be extracted from paper summaries and content analysis.*\n\n")
+
+        self.write(
+            "## Challenges and Limitations\n\n"
+            "1. **Data Privacy and Security**\n"
+            "   - Handling sensitive information in AI training\n"
+            "   - Compliance with regulations (GDPR, CCPA, etc.)\n\n"
+            "2. **Model Robustness**\n"
+            "   - Vulnerability to adversarial attacks\n"
+            "   - Handling novel attack vectors\n\n"
+        )
+        self.write(
+            "## Future Directions\n\n"
+            "1. **Explainable AI (XAI)**\n"
+            "   - Making AI decisions more interpretable\n"
+            "   - Building trust in AI-driven security systems\n\n"
+            "2. **Federated Learning**\n"
+            "   - Collaborative model training without sharing raw data\n"
+            "   - Privacy-preserving threat intelligence sharing\n\n"
+        )
+
+        self.write("## References\n\n")
+        self.write("".join(self._references))
+        self.write("\n---\n")
+        self.write("*This report was automatically generated by the Research Assistant.*")
+
+
+class JSONSink(ExportSink):
+    """The whole run as one JSON document, streamed element by element."""
+
+    def begin(self, state: Dict[str, Any], now: datetime) -> None:
+        header = {
+            "topic": state.get("topic"),
+            "generated_at": now.isoformat(timespec="seconds"),
+            "explanation": state.get("explanation"),
+            "related_topics": state.get("related_topics") or [],
+        }
+        self.write(json.dumps(header, ensure_ascii=False)[:-1])
+        self.write(', "papers": [')
+        self._first = True
+
+    def paper(self, index: int, paper: Dict[str, Any], summary: Optional[Dict[str, Any]]) -> None:
+        self.write(("" if self._first else ", ") + json.dumps(paper, ensure_ascii=False, default=str))
+        self._first = False
+
+    def summary(self, index: int, summary: Dict[str, Any]) -> None:
+        if index == 1:
+            self.write('], "summaries": [')
+            self._first = True
+        self.write(("" if self._first else ", ") + json.dumps(summary, ensure_ascii=False, default=str))
+        self._first = False
+
+    def end(self, state: Dict[str, Any]) -> None:
+        if not state.get("summaries"):
+            self.write('], "summaries": [')
+        self.write('], "research_draft": ')
+        self.write(json.dumps(state.get("research_draft"), ensure_ascii=False))
+        self.write("}\n")
+
+
+class NDJSONSink(ExportSink):
+    """One JSON line per paper, with its summary attached when there is one."""
+
+    def paper(self, index: int, paper: Dict[str, Any], summary: Optional[Dict[str, Any]]) -> None:
+        record = dict(paper, rank=index)
+        if summary:
+            record["summary"] = summary.get("summary")
+            record["summary_status"] = summary.get("status")
+        self.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+
+SINKS = {
+    "notes": MarkdownNotesSink,
+    "report": MarkdownReportSink,
+    "json": JSONSink,
+    "ndjson": NDJSONSink,
+}
+
+# Exports run on a background thread so the graph can return as soon as results exist.
+# Pending futures are keyed by the export id the node puts in the state, so concurrent
+# runs in one process each wait only for their own files.
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="export")
+_pending: Dict[str, List[concurrent.futures.Future]] = {}
+_pending_lock = threading.Lock()
+
+
+def wait_for_exports(export_id: Optional[str] = None, timeout: Optional[float] = None) -> List[Dict[str, str]]:
+    """Block until the exports of one run (or, without an id, of every run) are written; return their paths."""
+    with _pending_lock:
+        ids = [export_id] if export_id is not None else list(_pending)
+        futures = {future: key for key in ids for future in _pending.pop(key, [])}
+    done, not_done = concurrent.futures.wait(futures, timeout=timeout)
+    with _pending_lock:
+        for future in not_done:
+            _pending.setdefault(futures[future], []).append(future)
+    results = []
+    for future in done:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            logger.error(f"Export failed: {str(e)}")
+    return results
+
+
+atexit.register(wait_for_exports)
+
+
+class ExportNode:
+    """
+    Render the final state once to several outputs (markdown notes, report, JSON,
+    NDJSON per paper).
+    """
+
+    def __init__(self, output_dir: str = ".", formats: Optional[List[str]] = None, background: bool = True,
+                 search_index: Optional[SearchIndex] = None):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.formats = formats or list(SINKS)
+        unknown = [f for f in self.formats if f not in SINKS]
+        if unknown:
+            raise ValueError(f"Unknown export formats: {unknown}")
+        self.background = background
+        # Notes and summaries become searchable as soon as they are written
+        self.search_index = search_index or get_index()
+
+    def _output_paths(self, topic: str, now: datetime, export_id: str) -> Dict[str, Path]:
+        # The id suffix keeps runs of the same topic started in the same second apart
+        timestamp = f"{now.strftime('%Y%m%d_%H%M%S')}-{export_id[:8]}"
+        notes_topic = re.sub(r'[<>:"/\\|?*]', '_', topic)[:50]
+        safe_topic = re.sub(r'[^\w\s-]', '', topic).strip().replace(' ', '_')
+        names = {
+            "notes": f"{timestamp}_{notes_topic}.md",
+            "report": f"{safe_topic}_{timestamp}.md",
+            "json": f"{safe_topic}_{timestamp}.json",
+            "ndjson": f"{safe_topic}_{timestamp}.papers.ndjson",
+        }
+        return {fmt: self.output_dir / names[fmt] for fmt in self.formats}
+
+    def export(self, state: Dict[str, Any], paths: Dict[str, Path], now: datetime) -> Dict[str, str]:
+        """Walk the state once, feeding every sink."""
+        sinks = [SINKS[fmt](path) for fmt, path in paths.items()]
+        summaries = [s for s in (state.get("summaries") or []) if isinstance(s, dict)]
+        by_title = {s.get("title"): s for s in summaries}
+        success = False
+        try:
+            for sink in sinks:
+                sink.open()
+                sink.begin(state, now)
+            for i, paper in enumerate(state.get("search_results") or [], 1):
+                summary = by_title.get(paper.get("title"))
+                for sink in sinks:
+                    sink.paper(i, paper, summary)
+            for i, summary in enumerate(summaries, 1):
+                for sink in sinks:
+                    sink.summary(i, summary)
+            for sink in sinks:
+                sink.end(state)
+            success = True
+        finally:
+            for sink in sinks:
+                sink.close(success)
+
+        written = {fmt: str(path.absolute()) for fmt, path in paths.items()}
+        self._index(state, paths, summaries)
+        logger.info(f"Exported {', '.join(written)} to: {self.output_dir.absolute()}")
+        return written
+
+    def _index(self, state: Dict[str, Any], paths: Dict[str, Path], summaries: List[Dict[str, Any]]) -> None:
+        """Add the new notes file and summaries to the search index; never fails the export."""
+        try:
+            if "notes" in paths:
+                self.search_index.index_note(str(paths["notes"]))
+            self.search_index.index_summaries(state.get("topic", ""), summaries)
+        except Exception as e:
+            logger.warning(f"Could not update the search index: {str(e)}")
+
+    def __call__(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue the export and return immediately with the paths that will be written."""
+        now = datetime.now()
+        export_id = state.get("run_id") or uuid.uuid4().hex
+        paths = self._output_paths(state.get("topic", "research"), now, export_id)
+        snapshot = {key: state.get(key) for key in EXPORT_KEYS}
+
+        try:
+            if self.background:
+                future = _executor.submit(self.export, snapshot, paths, now)
+                with _pending_lock:
+                    _pending.setdefault(export_id, []).append(future)
+            else:
+                self.export(snapshot, paths, now)
+        except Exception as e:
+            logger.error(f"Error exporting results: {str(e)}")
+            state["error"] = f"Failed to export results: {str(e)}"
+            return state
+
+        state["export_id"] = export_id
+        state["export_paths"] = {fmt: str(path.absolute()) for fmt, path in paths.items()}
+        if "notes" in paths:
+            state["notes_file"] = state["export_paths"]["notes"]
+        if "report" in paths:
+            state["report_path"] = state["export_paths"]["report"]
+        return state
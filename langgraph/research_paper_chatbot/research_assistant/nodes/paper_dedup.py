@@ -0,0 +1,69 @@
+import logging
+from typing import Dict, Any, List
+
+from research_assistant.utils.dedup import NearDuplicateDetector, merge_duplicates
+from research_assistant.utils.artifact_store import load_text
+
+logger = logging.getLogger(__name__)
+
+class PaperDedupNode:
+    """Collapse near-duplicate papers into one canonical record before expensive work.
+
+    stage="search" dedups state["search_results"] before any download; with titles as the
+    only evidence, a pair must have the same title, or a similar one with the same year
+    and first author;
+    stage="parsed" dedups state["parsed_content"] by title and extracted text.
+    """
+
+    def __init__(self, stage: str = "search", title_threshold: float = 0.8, text_threshold: float = 0.7):
+        if stage not in ("search", "parsed"):
+            raise ValueError(f"Unknown dedup stage: {stage}")
+        self.stage = stage
+        self.detector = NearDuplicateDetector(
+            title_threshold=title_threshold,
+            text_threshold=text_threshold
+        )
+
+    @staticmethod
+    def _search_score(paper: Dict[str, Any]) -> float:
+        """Prefer records with a direct PDF link, then any link, then a longer snippet."""
+        link = paper.get("link") or ""
+        score = 0.0
+        if link.lower().endswith(".pdf"):
+            score += 2
+        elif link:
+            score += 1
+        return score + min(len(paper.get("snippet") or ""), 1000) / 1000
+
+    @staticmethod
+    def _parsed_score(paper: Dict[str, Any]) -> float:
+        """Prefer the record with the most extracted text."""
+        return float(paper.get("content_chars") or len(paper.get("content") or ""))
+
+    def _dedup(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if self.stage == "search":
+            clusters = self.detector.find_clusters(records)
+            return merge_duplicates(records, clusters, self._search_score)
+        clusters = self.detector.find_clusters(records, text_fn=load_text)
+        return merge_duplicates(records, clusters, self._parsed_score)
+
+    def __call__(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace the stage's record list with its deduplicated version."""
+        key = "search_results" if self.stage == "search" else "parsed_content"
+        records = state.get(key)
+        if not records:
+            return state
+
+        try:
+            valid = [r for r in records if isinstance(r, dict)]
+            deduped = self._dedup(valid)
+            removed = len(valid) - len(deduped)
+            if removed:
+                logger.info(f"Removed {removed} duplicate(s) from {key}: {len(valid)} -> {len(deduped)}")
+            state[key] = deduped
+            if self.stage == "search":
+                state["papers"] = deduped  # Keep for backward compatibility
+        except Exception as e:
+            logger.error(f"Error deduplicating {key}: {str(e)}", exc_info=True)
+
+        return state
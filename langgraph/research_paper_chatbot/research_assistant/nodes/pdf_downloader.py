@@ -1,82 +1,160 @@
+import asyncio
 import logging
-import requests
 from typing import Dict, List, Any, Optional
-from urllib.parse import urlparse
 import os
 
+from research_assistant.utils.acquisition import AcquisitionPolicy
+from research_assistant.utils.catalog import Catalog, get_catalog
+from research_assistant.utils.mirror_fetch import HedgedFetcher, candidate_urls
+from research_assistant.utils.single_flight import SingleFlight, default_flight, work_key
+
 logger = logging.getLogger(__name__)
 
 class PDFDownloaderNode:
-    def __init__(self, download_dir: str = "downloaded_pdfs"):
+    def __init__(self, download_dir: str = "downloaded_pdfs", acquisition: Optional[AcquisitionPolicy] = None,
+                 max_concurrent: int = 4, flight: Optional[SingleFlight] = None,
+                 catalog: Optional[Catalog] = None, fetcher: Optional[HedgedFetcher] = None):
         self.download_dir = download_dir
+        self.max_concurrent = max_concurrent  # parallel downloads in acall
+        # Concurrent runs that want the same file share one download
+        self.flight = flight or default_flight
+        # Every paper is registered; PDFs downloaded by earlier runs are reused
+        self.catalog = catalog or get_catalog()
+        # Each paper is fetched from its fastest mirror, hedging to a second one when slow
+        self.fetcher = fetcher or HedgedFetcher()
+        # Without a policy every paper with a link is downloaded
+        self.acquisition = acquisition
         os.makedirs(download_dir, exist_ok=True)
 
-    def _is_pdf_link(self, url: str) -> bool:
-        """Check if the URL points to a PDF file."""
-        parsed = urlparse(url)
-        return parsed.path.lower().endswith('.pdf')
+    def _pdf_path(self, paper_title: str) -> str:
+        """Create a safe filename from the paper title."""
+        safe_title = "".join(c if c.isalnum() else "_" for c in paper_title[:50]).strip('_')
+        return os.path.join(self.download_dir, f"{safe_title}.pdf")
+
+    def _download_pdf(self, urls: List[str], paper_title: str) -> Optional[Dict[str, Any]]:
+        """Download a PDF from the first of its mirrors to deliver it; returns its local path and metadata."""
+        if not urls:
+            logger.info(f"No PDF URL for: {paper_title}")
+            return None
+        pdf_path = self._pdf_path(paper_title)
+        return self.flight.do(work_key("download", pdf_path, *sorted(urls)),
+                              lambda: self.fetcher.fetch(urls, pdf_path))
+
+    async def _adownload_pdf(self, client, urls: List[str], paper_title: str) -> Optional[Dict[str, Any]]:
+        """Async variant of _download_pdf on a shared httpx.AsyncClient."""
+        if not urls:
+            logger.info(f"No PDF URL for: {paper_title}")
+            return None
+        pdf_path = self._pdf_path(paper_title)
+        return await self.flight.ado(work_key("download", pdf_path, *sorted(urls)),
+                                     lambda: self.fetcher.afetch(client, urls, pdf_path))
 
-    def _download_pdf(self, url: str, paper_title: str) -> Optional[Dict[str, Any]]:
-        """Download a PDF and return its local path and metadata."""
+    def _register(self, paper: Dict[str, Any]) -> Optional[str]:
         try:
-            if not self._is_pdf_link(url):
-                logger.info(f"Skipping non-PDF URL: {url}")
-                return None
-                
-            response = requests.get(url, stream=True, timeout=30)
-            response.raise_for_status()
-            
-            # Create a safe filename from the paper title
-            safe_title = "".join(c if c.isalnum() else "_" for c in paper_title[:50]).strip('_')
-            pdf_path = os.path.join(self.download_dir, f"{safe_title}.pdf")
-            
-            with open(pdf_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-                    
-            logger.info(f"Downloaded PDF: {pdf_path}")
-            return {
-                "path": pdf_path,
-                "url": url,
-                "status": "downloaded"
-            }
-            
+            return self.catalog.register(paper)
         except Exception as e:
-            logger.warning(f"Failed to download PDF from {url}: {str(e)}")
+            logger.warning(f"Could not register {paper.get('title', 'Unknown')} in the catalog: {str(e)}")
             return None
 
+    def _cached_download(self, paper_info: Dict[str, Any]) -> bool:
+        """Point the paper at a PDF an earlier run downloaded; False if there is none."""
+        if not paper_info.get("paper_id"):
+            return False
+        try:
+            path = self.catalog.find_download(paper_info["paper_id"])
+        except Exception as e:
+            logger.warning(f"Catalog lookup failed for {paper_info['title']}: {str(e)}")
+            return False
+        if path:
+            logger.info(f"Reusing downloaded PDF: {path}")
+            self._apply_result(paper_info, {"path": path})
+        return bool(path)
+
+    def _record_download(self, paper_info: Dict[str, Any]) -> None:
+        if paper_info.get("paper_id") and paper_info["download_status"] == "success":
+            try:
+                self.catalog.record_download(paper_info["paper_id"], paper_info["pdf_path"])
+            except Exception as e:
+                logger.warning(f"Could not record download of {paper_info['title']}: {str(e)}")
+
+    def _paper_info(self, paper: Dict[str, Any]) -> Dict[str, Any]:
+        """Metadata record for one paper, before any download."""
+        paper_info = {
+            "paper_id": self._register(paper),
+            "title": paper.get("title", "Untitled"),
+            "link": paper.get("link"),
+            "snippet": paper.get("snippet", ""),
+            "publication_info": paper.get("publication_info"),
+            "year": paper.get("year"),
+            "acquisition": paper.get("acquisition"),
+            # Direct PDF URLs that may serve this paper; non-PDF pages are never fetched
+            "mirrors": candidate_urls(paper),
+            "download_status": "not_attempted"
+        }
+        # Abstract-tier papers are summarized from metadata; no download
+        if not AcquisitionPolicy.is_full(paper):
+            paper_info["download_status"] = "skipped"
+        return paper_info
+
+    @staticmethod
+    def _apply_result(paper_info: Dict[str, Any], download_result: Optional[Dict[str, Any]]) -> None:
+        if download_result:
+            paper_info.update({
+                "pdf_path": download_result["path"],
+                "download_status": "success"
+            })
+        else:
+            paper_info["download_status"] = "failed"
+
+    def _finish(self, state: Dict, processed_papers: List[Dict[str, Any]]) -> Dict:
+        logger.info(f"Processed {len(processed_papers)} papers. "
+                   f"Successfully downloaded {len([p for p in processed_papers if p.get('download_status') == 'success'])} PDFs.")
+        
+        # Update the state with processed papers
+        state["processed_papers"] = processed_papers
+        state["pdf_links"] = [p["link"] for p in processed_papers if p.get("link")]
+        return state
+
     def __call__(self, state: Dict) -> Dict:
         """Process papers and attempt to download their PDFs."""
         papers = state.get("search_results") or state.get("selected_papers") or []
         processed_papers = []
+        if self.acquisition:
+            self.acquisition.plan(papers)
         
         for paper in papers:
-            paper_info = {
-                "title": paper.get("title", "Untitled"),
-                "link": paper.get("link"),
-                "snippet": paper.get("snippet", ""),
-                "publication_info": paper.get("publication_info"),
-                "year": paper.get("year"),
-                "download_status": "not_attempted"
-            }
+            paper_info = self._paper_info(paper)
             
-            # Try to download PDF if we have a link
-            if paper_info["link"]:
-                download_result = self._download_pdf(paper_info["link"], paper_info["title"])
-                if download_result:
-                    paper_info.update({
-                        "pdf_path": download_result["path"],
-                        "download_status": "success"
-                    })
-                else:
-                    paper_info["download_status"] = "failed"
+            # Try to download PDF if we have a link; papers with only a landing page stay not_attempted
+            if (paper_info["download_status"] == "not_attempted" and paper_info["mirrors"]
+                    and not self._cached_download(paper_info)):
+                self._apply_result(paper_info, self._download_pdf(paper_info["mirrors"], paper_info["title"]))
+                self._record_download(paper_info)
             
             processed_papers.append(paper_info)
         
-        logger.info(f"Processed {len(processed_papers)} papers. "
-                   f"Successfully downloaded {len([p for p in processed_papers if p.get('download_status') == 'success'])} PDFs.")
-        
-        # Update the state with processed papers
-        state["processed_papers"] = processed_papers
-        state["pdf_links"] = [p["link"] for p in processed_papers if p.get("link")]
-        return state
+        return self._finish(state, processed_papers)
+
+    async def acall(self, state: Dict) -> Dict:
+        """Async variant of __call__: downloads run concurrently on one connection pool."""
+        import httpx
+        papers = state.get("search_results") or state.get("selected_papers") or []
+        if self.acquisition:
+            self.acquisition.plan(papers)
+        processed_papers = [self._paper_info(paper) for paper in papers]
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        async def download(paper_info: Dict[str, Any]) -> None:
+            async with semaphore:
+                result = await self._adownload_pdf(client, paper_info["mirrors"], paper_info["title"])
+            self._apply_result(paper_info, result)
+            self._record_download(paper_info)
+
+        async with httpx.AsyncClient(follow_redirects=True) as client:
+            await asyncio.gather(*(
+                download(paper_info) for paper_info in processed_papers
+                if paper_info["download_status"] == "not_attempted" and paper_info["mirrors"]
+                and not self._cached_download(paper_info)
+            ))
+
+        return self._finish(state, processed_papers)
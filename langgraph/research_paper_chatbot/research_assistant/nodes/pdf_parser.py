@@ -1,49 +1,109 @@
+import asyncio
 import logging
 import os
-import PyPDF2
 from typing import Dict, List, Any, Optional
-import io
-import requests
+
+from research_assistant.utils.artifact_store import get_store, make_text_handle
+from research_assistant.utils.acquisition import AcquisitionPolicy, abstract_text
+from research_assistant.utils.catalog import Catalog, config_version, get_catalog
+from research_assistant.utils.page_planner import PagePlanner
+from research_assistant.utils.extraction_worker import ExtractionLimits, ExtractionPool, get_pool
+from research_assistant.utils.pdf_backends import PdfDocument, open_document
+from research_assistant.utils.pdf_memory import (
+    DEFAULT_DOCUMENT_MEMORY, DEFAULT_MAX_DOWNLOAD, MemoryGuard, aspool_url, spool_url
+)
+from research_assistant.utils.search_index import SearchIndex, get_index
+from research_assistant.utils.single_flight import SingleFlight, default_flight, file_digest, work_key
 
 logger = logging.getLogger(__name__)
 
 class PDFParserNode:
-    def __init__(self, max_pages: int = 10):
+    def __init__(self, max_pages: int = 10, acquisition: Optional[AcquisitionPolicy] = None,
+                 max_chars: int = 40000, flight: Optional[SingleFlight] = None,
+                 search_index: Optional[SearchIndex] = None, catalog: Optional[Catalog] = None,
+                 max_document_memory: Optional[int] = DEFAULT_DOCUMENT_MEMORY,
+                 max_download_bytes: Optional[int] = DEFAULT_MAX_DOWNLOAD, backend: str = "auto",
+                 isolate: bool = True, pool: Optional[ExtractionPool] = None):
         self.max_pages = max_pages  # Limit pages to process per PDF
+        # Extraction library ("pypdf", "pdfminer", "pypdfium2"), or "auto" to pick one per document
+        self.backend = backend
+        # PDFs are spooled to disk and memory-mapped; extraction stops at this much extra RSS
+        self.max_document_memory = max_document_memory
+        self.max_download_bytes = max_download_bytes
+        # Extraction runs in supervised worker processes with time and memory limits, so a
+        # pathological PDF costs one killed worker and a partial text instead of a stalled run
+        self.pool = (pool or get_pool()) if isolate else None
+        self.limits = ExtractionLimits(memory_bytes=max_document_memory)
+        # Pick abstract/introduction/conclusion/results pages rather than the first max_pages
+        self.planner = PagePlanner(max_chars=max_chars, max_pages=max_pages)
+        self.store = get_store()
+        self.acquisition = acquisition
+        # Concurrent runs parsing the same PDF with the same page budget share one extraction
+        self.flight = flight or default_flight
+        # Parsed full text is indexed so later runs can search it without re-parsing
+        self.search_index = search_index or get_index()
+        # Text parsed by earlier runs with the same page budget is reused from the catalog
+        self.catalog = catalog or get_catalog()
+        self.text_config = config_version(stage="parse", max_chars=max_chars, max_pages=max_pages,
+                                          backend=backend)
+
+    def _parse_key(self, identity: str) -> str:
+        return work_key("parse", identity, max_chars=self.planner.max_chars, max_pages=self.planner.max_pages,
+                        backend=self.backend)
+
+    def _extract_planned_pages(self, document: PdfDocument) -> str:
+        """Extract only the pages the planner selects, stopping once its budget is filled."""
+        # Isolated workers are watched by the pool; this guards in-process extraction
+        guard = MemoryGuard(None if self.pool else self.max_document_memory)
+        plan = self.planner.plan(document.num_pages, guard.wrap(document.page_text), document.outline())
+        logger.info(f"Extracted {len(plan.pages)}/{document.num_pages} pages ({plan.method}, {document.backend})")
+        return plan.text.strip()
 
     def _extract_text_from_pdf(self, pdf_path: str) -> Optional[str]:
         """Extract text from a local PDF file."""
         try:
-            text = ""
-            with open(pdf_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                # Limit the number of pages to process
-                for page_num in range(min(len(reader.pages), self.max_pages)):
-                    text += reader.pages[page_num].extract_text() + "\n\n"
-            return text.strip()
+            # Keyed by content: the same paper saved under two names is still parsed once
+            return self.flight.do(self._parse_key(file_digest(pdf_path)), lambda: self._extract_file(pdf_path))
         except Exception as e:
             logger.error(f"Error extracting text from {pdf_path}: {str(e)}")
             return None
 
+    def _open_document(self, pdf_path: str):
+        if self.pool is None:
+            return open_document(pdf_path, self.backend)
+        return self.pool.open(pdf_path, self.backend, self.limits)
+
+    def _extract_file(self, pdf_path: str) -> str:
+        with self._open_document(pdf_path) as document:
+            return self._extract_planned_pages(document)
+
     def _extract_text_from_url(self, url: str) -> Optional[str]:
         """Extract text directly from a PDF URL."""
         try:
-            response = requests.get(url, stream=True, timeout=30)
-            response.raise_for_status()
-            
-            with io.BytesIO(response.content) as file:
-                reader = PyPDF2.PdfReader(file)
-                text = ""
-                # Limit the number of pages to process
-                for page_num in range(min(len(reader.pages), self.max_pages)):
-                    text += reader.pages[page_num].extract_text() + "\n\n"
-                return text.strip()
+            return self.flight.do(self._parse_key(url), lambda: self._fetch_and_extract(url))
         except Exception as e:
             logger.warning(f"Error extracting text from URL {url}: {str(e)}")
             return None
 
-    def __call__(self, state: Dict) -> Dict:
-        """Process papers and extract text from their PDFs or use available metadata."""
+    def _fetch_and_extract(self, url: str) -> str:
+        # Streamed to a temporary file; the PDF is never held in memory as a whole
+        with spool_url(url, max_bytes=self.max_download_bytes) as path:
+            return self._extract_file(path)
+
+    async def _aextract_text_from_url(self, client, url: str) -> Optional[str]:
+        """Fetch a PDF without blocking the event loop, then parse it in a worker thread."""
+        try:
+            return await self.flight.ado(self._parse_key(url), lambda: self._afetch_and_extract(client, url))
+        except Exception as e:
+            logger.warning(f"Error extracting text from URL {url}: {str(e)}")
+            return None
+
+    async def _afetch_and_extract(self, client, url: str) -> str:
+        async with aspool_url(client, url, max_bytes=self.max_download_bytes) as path:
+            return await asyncio.to_thread(self._extract_file, path)
+
+    @staticmethod
+    def _papers_from_state(state: Dict) -> List[Dict[str, Any]]:
         papers = []
         # Check for downloaded files first
         if "downloaded_files" in state and state["downloaded_files"]:
@@ -55,52 +115,138 @@ class PDFParserNode:
         elif "search_results" in state and state["search_results"]:
             papers = state["search_results"]
             logger.info(f"Using search results as fallback: {len(papers)} papers")
+        return papers
+
+    def _cached_text_ref(self, paper: Dict[str, Any]) -> Optional[str]:
+        """Artifact ref of text an earlier run parsed from this paper with the same settings."""
+        if not paper.get("paper_id"):
+            return None
+        try:
+            ref = self.catalog.get_artifact(paper["paper_id"], "text", self.text_config)
+            return ref if ref and self.store.exists(ref) else None
+        except Exception as e:
+            logger.warning(f"Catalog lookup failed for {paper.get('title', 'Unknown')}: {str(e)}")
+            return None
+
+    def _local_pdf(self, paper: Dict[str, Any]) -> Optional[str]:
+        """A local copy of the paper: its file_path, or a PDF the catalog knows was downloaded."""
+        if paper.get("file_path") and os.path.exists(paper["file_path"]):
+            return paper["file_path"]
+        if not paper.get("paper_id"):
+            return None
+        try:
+            return self.catalog.find_download(paper["paper_id"])
+        except Exception as e:
+            logger.warning(f"Catalog lookup failed for {paper.get('title', 'Unknown')}: {str(e)}")
+            return None
+
+    def _store_text(self, paper: Dict[str, Any], content: str) -> None:
+        try:
+            self.catalog.put_artifact(paper["paper_id"], "text", self.text_config, self.store.put_text(content))
+        except Exception as e:
+            logger.warning(f"Could not catalog parsed text of {paper.get('title', 'Unknown')}: {str(e)}")
+
+    def _remote_pdf_url(self, paper: Dict[str, Any]) -> Optional[str]:
+        """URL the paper's full text would be fetched from, if there is no local copy or earlier parse."""
+        if not AcquisitionPolicy.is_full(paper) and abstract_text(paper):
+            return None
+        if self._cached_text_ref(paper) or self._local_pdf(paper):
+            return None
+        if paper.get("pdf_url"):
+            return paper["pdf_url"]
+        if paper.get("link") and paper["link"].endswith('.pdf'):
+            return paper["link"]
+        return None
+
+    def _parse_paper(self, paper: Dict[str, Any], fetched: Optional[Dict[str, Optional[str]]] = None) -> Optional[Dict[str, Any]]:
+        """Parsed-content record for one paper; fetched maps URLs to text already extracted."""
+        fetched = fetched or {}
+        content = None
+        source = ""
+        title = paper.get("title", "Untitled")
+        acquisition = "full"
+        full = AcquisitionPolicy.is_full(paper) or not abstract_text(paper)
+        cached_ref = self._cached_text_ref(paper) if full else None
+        local_pdf = self._local_pdf(paper) if full and not cached_ref else None
+        
+        # Abstract-tier papers never touch the PDF
+        if not full:
+            content = abstract_text(paper)
+            source = paper.get("link", "")
+            acquisition = "abstract"
+        # Parsed by an earlier run
+        elif cached_ref:
+            content = self.store.get_text(cached_ref)
+            source = paper.get("link", "")
+            logger.info(f"Reusing parsed text from the catalog for: {title}")
+        # Try to get content from local file first
+        elif local_pdf:
+            content = self._extract_text_from_pdf(local_pdf)
+            source = local_pdf
+        # Fall back to URL if local file doesn't exist or failed
+        elif "pdf_url" in paper and paper["pdf_url"]:
+            url = paper["pdf_url"]
+            content = fetched[url] if url in fetched else self._extract_text_from_url(url)
+            source = url
+        elif "link" in paper and paper["link"] and paper["link"].endswith('.pdf'):
+            url = paper["link"]
+            content = fetched[url] if url in fetched else self._extract_text_from_url(url)
+            source = url
+        # Fall back to abstract if available
+        elif "abstract" in paper and paper["abstract"]:
+            content = paper["abstract"]
+            source = paper.get("source", "")
+            acquisition = "abstract"
+        elif "snippet" in paper and paper["snippet"]:
+            content = paper["snippet"]
+            source = paper.get("link", "")
+            acquisition = "abstract"
+        
+        # A failed full-text fetch still leaves the abstract to work with
+        if not content and abstract_text(paper):
+            content = abstract_text(paper)
+            source = paper.get("link", "")
+            acquisition = "abstract"
         
-        parsed_content = []
+        if not content:
+            logger.warning(f"Could not extract content for paper: {title}")
+            return None
         
-        for paper in papers:
+        logger.info(f"Successfully parsed content for: {title}")
+        if acquisition == "full" and not cached_ref:
+            if paper.get("paper_id"):
+                self._store_text(paper, content)
             try:
-                if not isinstance(paper, dict):
-                    logger.warning(f"Skipping invalid paper format: {paper}")
-                    continue
-                
-                content = None
-                source = ""
-                title = paper.get("title", "Untitled")
-                
-                # Try to get content from local file first
-                if "file_path" in paper and paper["file_path"] and os.path.exists(paper["file_path"]):
-                    content = self._extract_text_from_pdf(paper["file_path"])
-                    source = paper["file_path"]
-                # Fall back to URL if local file doesn't exist or failed
-                elif "pdf_url" in paper and paper["pdf_url"]:
-                    content = self._extract_text_from_url(paper["pdf_url"])
-                    source = paper["pdf_url"]
-                elif "link" in paper and paper["link"] and paper["link"].endswith('.pdf'):
-                    content = self._extract_text_from_url(paper["link"])
-                    source = paper["link"]
-                # Fall back to abstract if available
-                elif "abstract" in paper and paper["abstract"]:
-                    content = paper["abstract"]
-                    source = paper.get("source", "")
-                elif "snippet" in paper and paper["snippet"]:
-                    content = paper["snippet"]
-                    source = paper.get("link", "")
-                
-                if content:
-                    logger.info(f"Successfully parsed content for: {title}")
-                    parsed_content.append({
-                        "title": title,
-                        "content": content,
-                        "source": source
-                    })
-                else:
-                    logger.warning(f"Could not extract content for paper: {title}")
-                    
+                self.search_index.index_paper(title, content, source=source)
             except Exception as e:
-                logger.error(f"Error processing paper {paper.get('title', 'Unknown')}: {str(e)}")
-                continue
-        
+                logger.warning(f"Could not index {title}: {str(e)}")
+        # Full text goes to the artifact store; the state only carries a handle
+        return {
+            "paper_id": paper.get("paper_id"),
+            "title": title,
+            **make_text_handle(content, store=self.store),
+            "source": source,
+            "acquisition": acquisition
+        }
+
+    def _start(self, state: Dict) -> List[Any]:
+        papers = self._papers_from_state(state)
+        if self.acquisition:
+            self.acquisition.plan(papers)
+        return papers
+
+    def _parse_or_skip(self, paper: Any, fetched: Optional[Dict[str, Optional[str]]] = None) -> Optional[Dict[str, Any]]:
+        """_parse_paper for one state entry; None for invalid entries and papers that fail."""
+        if not isinstance(paper, dict):
+            logger.warning(f"Skipping invalid paper format: {paper}")
+            return None
+        try:
+            return self._parse_paper(paper, fetched)
+        except Exception as e:
+            logger.error(f"Error processing paper {paper.get('title', 'Unknown')}: {str(e)}")
+            return None
+
+    def _finish(self, state: Dict, papers: List[Any], parsed_content: List[Dict[str, Any]]) -> Dict:
         if not parsed_content and papers:
             logger.warning("No content could be parsed from any papers. Please check the logs for details.")
         else:
@@ -108,3 +254,24 @@ class PDFParserNode:
         
         state["parsed_content"] = parsed_content
         return state
+
+    def __call__(self, state: Dict) -> Dict:
+        """Process papers and extract text from their PDFs or use available metadata."""
+        papers = self._start(state)
+        results = [self._parse_or_skip(paper) for paper in papers]
+        return self._finish(state, papers, [parsed for parsed in results if parsed])
+
+    async def acall(self, state: Dict) -> Dict:
+        """Async variant of __call__: fetch PDFs concurrently, parse them in worker threads."""
+        import httpx
+        papers = self._start(state)
+        valid = [paper for paper in papers if isinstance(paper, dict)]
+        urls = list(dict.fromkeys(url for url in map(self._remote_pdf_url, valid) if url))
+
+        async with httpx.AsyncClient(follow_redirects=True, limits=httpx.Limits(max_connections=8)) as client:
+            texts = await asyncio.gather(*(self._aextract_text_from_url(client, url) for url in urls))
+        fetched = dict(zip(urls, texts))
+
+        # Local files still need extracting; keep that off the event loop too
+        results = await asyncio.gather(*(asyncio.to_thread(self._parse_or_skip, paper, fetched) for paper in papers))
+        return self._finish(state, papers, [parsed for parsed in results if parsed])
@@ -2,16 +2,24 @@ import os
 import re
 import logging
 import requests
-import PyPDF2
 import io
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 from urllib.parse import urlparse
 
+from research_assistant.utils.section_splitter import default_splitter
+from research_assistant.utils.page_planner import PagePlanner
+from research_assistant.utils.extraction_worker import ExtractionLimits, get_pool
+from research_assistant.utils.pdf_backends import open_document
+from research_assistant.utils.pdf_memory import DEFAULT_DOCUMENT_MEMORY, MemoryGuard
+from research_assistant.utils.artifact_store import get_store
+from research_assistant.utils.acquisition import AcquisitionPolicy
+
 logger = logging.getLogger(__name__)
 
 class PDFProcessor:
-    def __init__(self, download_dir: str = "downloaded_pdfs"):
+    def __init__(self, download_dir: str = "downloaded_pdfs", max_document_memory: Optional[int] = DEFAULT_DOCUMENT_MEMORY,
+                 backend: str = "auto", isolate: bool = True):
         """Initialize the PDF processor with download directory."""
         self.download_dir = Path(download_dir)
         self.download_dir.mkdir(parents=True, exist_ok=True)
@@ -19,6 +27,14 @@ class PDFProcessor:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'Accept': 'application/pdf,text/html,application/xhtml+xml',
         }
+        # No length budget here, but references and appendices are never extracted
+        self.planner = PagePlanner(max_chars=None)
+        # Without a length budget, the memory ceiling is what bounds a huge scanned thesis
+        self.max_document_memory = max_document_memory
+        self.backend = backend
+        # Extract in a supervised worker process; a PDF that hangs or balloons is cut off there
+        self.pool = get_pool() if isolate else None
+        self.limits = ExtractionLimits(memory_bytes=max_document_memory)
 
     def download_pdf(self, url: str, paper_title: str) -> Optional[str]:
         """Download a PDF from a URL and return the local file path."""
@@ -58,13 +74,12 @@ class PDFProcessor:
     def extract_text_from_pdf(self, filepath: str) -> Dict[str, str]:
         """Extract text from a PDF file with section-wise splitting."""
         try:
-            with open(filepath, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                text = ""
-                
-                # Extract text from each page
-                for page in reader.pages:
-                    text += page.extract_text() + "\n\n"
+            opened = (self.pool.open(filepath, self.backend, self.limits) if self.pool
+                      else open_document(filepath, self.backend))
+            with opened as document:
+                guard = MemoryGuard(None if self.pool else self.max_document_memory)
+                plan = self.planner.plan(document.num_pages, guard.wrap(document.page_text), document.outline())
+                text = plan.text
                 
                 # Basic section detection (can be enhanced with more sophisticated parsing)
                 sections = self._split_into_sections(text)
@@ -72,7 +87,8 @@ class PDFProcessor:
                 return {
                     'full_text': text,
                     'sections': sections,
-                    'page_count': len(reader.pages)
+                    'page_count': document.num_pages,
+                    'pages_extracted': plan.pages
                 }
                 
         except Exception as e:
@@ -81,43 +97,7 @@ class PDFProcessor:
 
     def _split_into_sections(self, text: str) -> Dict[str, str]:
         """Split text into sections based on common section headers."""
-        # Common section headers in research papers
-        section_headers = [
-            'abstract', 'introduction', 'related work', 'methodology',
-            'experiments', 'results', 'discussion', 'conclusion',
-            'references', 'acknowledgments'
-        ]
-        
-        sections = {}
-        current_section = 'preamble'
-        current_text = []
-        
-        for line in text.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Check if line matches a section header
-            is_header = False
-            for header in section_headers:
-                if line.lower().startswith(header):
-                    # Save previous section
-                    if current_text:
-                        sections[current_section] = '\n'.join(current_text).strip()
-                    # Start new section
-                    current_section = header.lower()
-                    current_text = []
-                    is_header = True
-                    break
-            
-            if not is_header:
-                current_text.append(line)
-        
-        # Add the last section
-        if current_text:
-            sections[current_section] = '\n'.join(current_text).strip()
-        
-        return sections
+        return default_splitter.split(text)
 
     def process_paper(self, url: str, title: str) -> Dict:
         """Process a paper by downloading and extracting its content."""
@@ -141,8 +121,20 @@ class PDFProcessor:
 class PDFProcessorNode:
     """Node for processing PDFs in the research pipeline."""
     
-    def __init__(self, download_dir: str = "downloaded_pdfs"):
+    def __init__(self, download_dir: str = "downloaded_pdfs", acquisition: Optional[AcquisitionPolicy] = None):
         self.processor = PDFProcessor(download_dir)
+        self.store = get_store()
+        self.acquisition = acquisition
+
+    def _to_handle(self, processed: Dict) -> Dict:
+        """Move full text and sections into the artifact store, keeping only references."""
+        full_text = processed.pop('full_text', '')
+        sections = processed.pop('sections', {})
+        processed['full_text_ref'] = self.store.put_text(full_text)
+        processed['full_text_chars'] = len(full_text)
+        processed['sections_ref'] = self.store.put_json(sections)
+        processed['section_names'] = list(sections)
+        return processed
     
     def __call__(self, state: Dict) -> Dict:
         """Process PDFs from the state."""
@@ -151,11 +143,17 @@ class PDFProcessorNode:
             return state
         
         processed_papers = []
+        if self.acquisition:
+            self.acquisition.plan(state['search_results'])
+        skipped = 0
         
         for paper in state['search_results']:
             try:
                 if not isinstance(paper, dict):
                     continue
+                if not AcquisitionPolicy.is_full(paper):
+                    skipped += 1
+                    continue
                     
                 url = paper.get('pdf_url') or paper.get('link')
                 title = paper.get('title', 'Untitled')
@@ -170,7 +168,7 @@ class PDFProcessorNode:
                 if 'error' not in processed:
                     processed_papers.append({
                         **paper,
-                        'processed_content': processed
+                        'processed_content': self._to_handle(processed)
                     })
                 
             except Exception as e:
@@ -178,5 +176,5 @@ class PDFProcessorNode:
                 continue
         
         state['processed_papers'] = processed_papers
-        logger.info(f"Processed {len(processed_papers)} papers")
+        logger.info(f"Processed {len(processed_papers)} papers ({skipped} left at abstract depth)")
         return state
@@ -1,22 +1,38 @@
 import time
+import asyncio
 import concurrent.futures
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import requests
 import re
-from langchain_community.chat_models import ChatOllama
+
+from research_assistant.utils.artifact_store import get_store, load_text
+from research_assistant.utils.catalog import Catalog, config_version, get_catalog
+from research_assistant.utils.dedup import content_hash
+from research_assistant.utils.token_budget import TokenBudget
+from research_assistant.utils.model_manager import KEEP_ALIVE
+from research_assistant.utils.model_router import ModelRouter, default_router
+from research_assistant.utils.prompts import PAPER_SUMMARY
+from research_assistant.utils.single_flight import SingleFlight, default_flight, llm_key
 
 logger = logging.getLogger(__name__)
 
 class EnhancedResearchSummarizerNode:
-    def __init__(self, model_name: str = "llama3.1:8b"):
+    def __init__(self, model_name: Optional[str] = None, router: Optional[ModelRouter] = None,
+                 flight: Optional[SingleFlight] = None, catalog: Optional[Catalog] = None):
+        # A fixed model overrides routing; otherwise the router picks one on first use
         self.model_name = model_name
+        self.router = router or default_router
+        # Concurrent runs summarizing the same paper share one model call
+        self.flight = flight or default_flight
+        # Summaries of the same text, model and prompt from earlier runs are reused
+        self.catalog = catalog or get_catalog()
+        self.store = get_store()
+        self._llm = None
         
         # FIXED: More conservative Ollama configuration
-        self.llm = ChatOllama(
-            model=model_name,
+        self.llm_options = dict(
             temperature=0.1,
-            num_ctx=2048,        # Increased context window
             num_predict=400,     # Increased output length
             repeat_penalty=1.1,
             top_k=20,
@@ -27,8 +43,12 @@ class EnhancedResearchSummarizerNode:
             # Performance optimizations
             num_thread=4,        # Reduce CPU threads to prevent overload
             num_batch=256,       # Smaller batch size
+            keep_alive=KEEP_ALIVE,  # Stay loaded for the whole run
         )
         
+        # num_ctx is chosen per call; content is trimmed to fit the 2048-token window
+        self.budget = TokenBudget(max_ctx=2048)
+        
         # Connection pool settings for better stability
         self.max_retries = 3
         self.retry_delay = 2  # seconds
@@ -61,6 +81,16 @@ class EnhancedResearchSummarizerNode:
             ]
         }
 
+    @property
+    def llm(self):
+        """Chat model, created on first use so building the graph stays cheap."""
+        if self._llm is None:
+            from langchain_community.chat_models import ChatOllama
+            if not self.model_name:
+                self.model_name = self.router.select("summarizer")
+            self._llm = ChatOllama(model=self.model_name, **self.llm_options)
+        return self._llm
+
     def _check_ollama_health(self) -> bool:
         """Check if Ollama service is responsive."""
         try:
@@ -79,6 +109,33 @@ class EnhancedResearchSummarizerNode:
             time.sleep(1)
         return False
 
+    def _summary_request(self, content: str):
+        """Chat messages for one paper and the num_ctx they need."""
+        num_predict = self.llm_options["num_predict"]
+        # Limit content to the context budget, cutting at a sentence boundary
+        content = self.budget.fit(content, PAPER_SUMMARY.static_parts(), num_predict)
+        messages = PAPER_SUMMARY.messages(("Paper content", content))
+        num_ctx = self.budget.options([m["content"] for m in messages], num_predict, model=self.llm.model)["num_ctx"]
+        return [(m["role"], m["content"]) for m in messages], num_ctx
+
+    def _summary_key(self, lc_messages, num_ctx: int) -> str:
+        return llm_key(self.llm.model, lc_messages, num_ctx=num_ctx, options=self.llm_options)
+
+    def _summary_text(self, lc_messages, response) -> str:
+        """Record a response's token counts and throughput, and return its text."""
+        metadata = getattr(response, "response_metadata", None)
+        self.budget.record([content for _, content in lc_messages], metadata)
+        self.router.record(self.model_name, metadata)
+        return response.content if hasattr(response, 'content') else str(response)
+
+    def _attempt_failed(self, attempt: int, max_retries: int, error: Exception) -> Optional[str]:
+        """Log a failed attempt; the failure text once no retries are left, else None."""
+        logger.warning(f"Ollama processing attempt {attempt + 1} failed: {error}")
+        if attempt < max_retries - 1:
+            return None
+        logger.error(f"All Ollama processing attempts failed: {error}")
+        return f"Processing failed after {max_retries} attempts: {str(error)}"
+
     def _process_with_ollama_retry(self, content: str, max_retries: int = 3) -> str:
         """Process content with Ollama with retry logic."""
         for attempt in range(max_retries):
@@ -92,29 +149,38 @@ class EnhancedResearchSummarizerNode:
                 # Process with timeout
                 logger.info(f"Processing with Ollama (attempt {attempt + 1})")
                 
-                # Use a simple prompt for faster processing
-                prompt = f"""Summarize this research paper content in a structured format:
+                lc_messages, num_ctx = self._summary_request(content)
+                response = self.flight.do(self._summary_key(lc_messages, num_ctx),
+                                          lambda: self.llm.invoke(lc_messages, num_ctx=num_ctx))
+                return self._summary_text(lc_messages, response)
+                
+            except Exception as e:
+                failure = self._attempt_failed(attempt, max_retries, e)
+                if failure:
+                    return failure
+                time.sleep(self.retry_delay * (attempt + 1))  # Exponential backoff
 
-{content[:2000]}  # Limit content to prevent huge context
+    async def _aprocess_with_ollama_retry(self, content: str, max_retries: int = 3) -> str:
+        """Async variant of _process_with_ollama_retry using ChatOllama.ainvoke."""
+        for attempt in range(max_retries):
+            try:
+                # The health check uses blocking requests; keep it off the event loop
+                if not await asyncio.to_thread(self._check_ollama_health):
+                    logger.warning(f"Ollama not responsive, attempt {attempt + 1}")
+                    if not await asyncio.to_thread(self._wait_for_ollama):
+                        raise Exception("Ollama service unavailable")
 
-Please provide:
-1. Main objective
-2. Key methodology
-3. Important results
-4. Contributions
+                logger.info(f"Processing with Ollama (attempt {attempt + 1})")
+                lc_messages, num_ctx = self._summary_request(content)
+                response = await self.flight.ado(self._summary_key(lc_messages, num_ctx),
+                                                 lambda: self.llm.ainvoke(lc_messages, num_ctx=num_ctx))
+                return self._summary_text(lc_messages, response)
 
-Keep it concise and informative."""
-                
-                response = self.llm.invoke(prompt)
-                return response.content if hasattr(response, 'content') else str(response)
-                
             except Exception as e:
-                logger.warning(f"Ollama processing attempt {attempt + 1} failed: {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(self.retry_delay * (attempt + 1))  # Exponential backoff
-                else:
-                    logger.error(f"All Ollama processing attempts failed: {e}")
-                    return f"Processing failed after {max_retries} attempts: {str(e)}"
+                failure = self._attempt_failed(attempt, max_retries, e)
+                if failure:
+                    return failure
+                await asyncio.sleep(self.retry_delay * (attempt + 1))  # Exponential backoff
 
     def _extract_structured_info(self, text: str) -> Dict[str, str]:
         """Extract structured information with complete sentences and better formatting."""
@@ -171,66 +237,153 @@ Keep it concise and informative."""
         
         return '\n'.join(sections) if sections else "No structured information extracted."
 
-    def _process_single_paper_safe(self, paper: Dict[str, Any], paper_num: int) -> Dict[str, Any]:
-        """Process a single paper with enhanced error handling."""
-        title = paper.get("title", f"Paper {paper_num}")
-        content = paper.get("content", "")
-        source = paper.get("source", "")
+    @staticmethod
+    def _skipped_result(title: str, source: str) -> Dict[str, Any]:
+        return {
+            "title": title,
+            "summary": "No content available for processing.",
+            "source": source,
+            "method": "skipped",
+            "status": "skipped"
+        }
+
+    @staticmethod
+    def _error_result(title: str, source: str, paper_num: int, error: Exception) -> Dict[str, Any]:
+        logger.error(f"Error processing paper {paper_num}: {error}")
+        return {
+            "title": title,
+            "summary": f"[Processing error: {str(error)}]",
+            "source": source,
+            "method": "error",
+            "status": "error"
+        }
+
+    def _basic_extraction(self, content: str):
+        """Pattern-based structured info and its formatted text (fast, no Ollama)."""
+        structured_info = self._extract_structured_info(content)
         
-        logger.info(f"Processing paper {paper_num}: {title[:50]}...")
+        # FIXED: Ensure structured_info is always a dictionary
+        if not isinstance(structured_info, dict):
+            structured_info = {}
         
+        return structured_info, self._format_basic_output(structured_info)
+
+    def _completed_result(self, title: str, source: str, structured_info: Dict[str, str], basic_summary: str,
+                          enhanced_summary: Optional[str]) -> Dict[str, Any]:
+        """Combine the Ollama summary (None if it failed) with the pattern extraction."""
+        if enhanced_summary is not None:
+            final_summary = f"{enhanced_summary}\n\n---\n\n{basic_summary}"
+            processing_method = "ollama_enhanced"
+        else:
+            final_summary = basic_summary
+            processing_method = "pattern_extraction_only"
+        
+        # Add source information
+        source_note = self._format_source(source)
+        full_summary = f"{final_summary}\n\n{source_note}"
+        
+        return {
+            "title": title,
+            "summary": full_summary,
+            "structured_info": structured_info,
+            "source": source,
+            "method": processing_method,
+            "status": "completed"
+        }
+
+    def _summary_config(self, content: str) -> str:
+        """Version of a summary: the text summarized, the model, its options and the prompt."""
+        return config_version(stage="summary", content=content_hash(content), model=self.llm.model,
+                              options=self.llm_options, prompt=PAPER_SUMMARY.static_parts())
+
+    def _cached_summary(self, paper: Dict[str, Any], content: str) -> Optional[Dict[str, Any]]:
+        if not paper.get("paper_id"):
+            return None
         try:
-            if not content.strip():
-                return {
-                    "title": title,
-                    "summary": "No content available for processing.",
-                    "source": source,
-                    "method": "skipped",
-                    "status": "skipped"
-                }
-            
-            # Extract basic structured info first (fast, no Ollama)
-            structured_info = self._extract_structured_info(content)
-            
-            # FIXED: Ensure structured_info is always a dictionary
-            if not isinstance(structured_info, dict):
-                structured_info = {}
-            
-            # Format basic output
-            basic_summary = self._format_basic_output(structured_info)
+            ref = self.catalog.get_artifact(paper["paper_id"], "summary", self._summary_config(content))
+            if ref and self.store.exists(ref, kind="json"):
+                logger.info(f"Reusing summary from the catalog for: {paper.get('title', 'Untitled')}")
+                return dict(self.store.get_json(ref), paper_id=paper["paper_id"], reused=True)
+        except Exception as e:
+            logger.warning(f"Catalog lookup failed for {paper.get('title', 'Unknown')}: {str(e)}")
+        return None
+
+    def _store_summary(self, paper: Dict[str, Any], content: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Catalog a model-written summary; pattern-only fallbacks are retried next run instead."""
+        # Lets a later refresh match the summary to its paper
+        result["paper_id"] = paper.get("paper_id")
+        if (paper.get("paper_id") and result.get("method") == "ollama_enhanced"
+                and not result["summary"].startswith("Processing failed")):
+            try:
+                self.catalog.put_artifact(paper["paper_id"], "summary", self._summary_config(content),
+                                          self.store.put_json(result), model=self.model_name)
+            except Exception as e:
+                logger.warning(f"Could not catalog summary of {paper.get('title', 'Unknown')}: {str(e)}")
+        return result
+
+    @staticmethod
+    def _paper_label(paper: Dict[str, Any], paper_num: int):
+        title = paper.get("title", f"Paper {paper_num}")
+        logger.info(f"Processing paper {paper_num}: {title[:50]}...")
+        return title, paper.get("source", "")
+
+    def _prepare_paper(self, paper: Dict[str, Any], title: str, source: str):
+        """
+        Everything before the Ollama call: the paper's text, a finished result if it is
+        empty or was summarized before, otherwise its pattern extraction.
+        """
+        content = load_text(paper)
+        if not content.strip():
+            return content, self._skipped_result(title, source), None
+        cached = self._cached_summary(paper, content)
+        if cached:
+            return content, cached, None
+        return content, None, self._basic_extraction(content)
+
+    def _finish_paper(self, paper: Dict[str, Any], content: str, title: str, source: str,
+                      extraction, enhanced_summary: Optional[str]) -> Dict[str, Any]:
+        result = self._completed_result(title, source, *extraction, enhanced_summary)
+        return self._store_summary(paper, content, result)
+
+    def _process_single_paper_safe(self, paper: Dict[str, Any], paper_num: int) -> Dict[str, Any]:
+        """Process a single paper with enhanced error handling."""
+        title, source = self._paper_label(paper, paper_num)
+        try:
+            content, done, extraction = self._prepare_paper(paper, title, source)
+            if done:
+                return done
             
             # Try Ollama enhancement (with fallback)
             try:
                 enhanced_summary = self._process_with_ollama_retry(content)
-                final_summary = f"{enhanced_summary}\n\n---\n\n{basic_summary}"
-                processing_method = "ollama_enhanced"
             except Exception as e:
                 logger.warning(f"Ollama enhancement failed for {title}: {e}")
-                final_summary = basic_summary
-                processing_method = "pattern_extraction_only"
+                enhanced_summary = None
             
-            # Add source information
-            source_note = self._format_source(source)
-            full_summary = f"{final_summary}\n\n{source_note}"
-            
-            return {
-                "title": title,
-                "summary": full_summary,
-                "structured_info": structured_info,
-                "source": source,
-                "method": processing_method,
-                "status": "completed"
-            }
+            return self._finish_paper(paper, content, title, source, extraction, enhanced_summary)
             
         except Exception as e:
-            logger.error(f"Error processing paper {paper_num}: {e}")
-            return {
-                "title": title,
-                "summary": f"[Processing error: {str(e)}]",
-                "source": source,
-                "method": "error",
-                "status": "error"
-            }
+            return self._error_result(title, source, paper_num, e)
+
+    async def _aprocess_single_paper_safe(self, paper: Dict[str, Any], paper_num: int) -> Dict[str, Any]:
+        """Async variant of _process_single_paper_safe; the blocking steps run in worker threads."""
+        title, source = self._paper_label(paper, paper_num)
+        try:
+            content, done, extraction = await asyncio.to_thread(self._prepare_paper, paper, title, source)
+            if done:
+                return done
+
+            try:
+                enhanced_summary = await self._aprocess_with_ollama_retry(content)
+            except Exception as e:
+                logger.warning(f"Ollama enhancement failed for {title}: {e}")
+                enhanced_summary = None
+
+            return await asyncio.to_thread(self._finish_paper, paper, content, title, source,
+                                           extraction, enhanced_summary)
+
+        except Exception as e:
+            return self._error_result(title, source, paper_num, e)
 
     def _sequential_process_with_delay(self, papers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Process papers sequentially with delays to prevent Ollama overload."""
@@ -284,23 +437,47 @@ Keep it concise and informative."""
         
         return summaries
 
+    def _start(self, state: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """Papers to summarize; None (with the error recorded) when there are none."""
+        state["current_stage"] = "structured_extraction"
+        if not state.get("parsed_content"):
+            logger.warning("No parsed content found in state")
+            state["error"] = "No parsed content available for summarization"
+            return None
+        papers = state["parsed_content"]
+        logger.info(f"Processing {len(papers)} papers with structured extraction...")
+        return papers
+
+    def _finish(self, state: Dict[str, Any], summaries: List[Dict[str, Any]], start_time: float) -> Dict[str, Any]:
+        # Update state
+        state["summaries"] = summaries
+        state["current_stage"] = "structured_extraction_complete"
+        
+        # Log performance
+        elapsed_time = time.time() - start_time
+        completed = sum(1 for s in summaries if s.get("status") == "completed")
+        errors = sum(1 for s in summaries if s.get("status") == "error")
+        
+        logger.info(f"Processing complete: {completed} succeeded, {errors} failed, {elapsed_time:.2f}s total")
+        return state
+
+    @staticmethod
+    def _failed(state: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        logger.error(f"Critical error in structured extractor: {str(error)}")
+        state["error"] = f"Structured extraction failed: {str(error)}"
+        state["current_stage"] = "extraction_failed"
+        return state
+
     def __call__(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Process the state with enhanced error handling and timeouts."""
         start_time = time.time()
         
         try:
-            state["current_stage"] = "structured_extraction"
-            
-            if not state.get("parsed_content"):
-                logger.warning("No parsed content found in state")
-                state["error"] = "No parsed content available for summarization"
+            papers = self._start(state)
+            if papers is None:
                 return state
-
-            papers = state["parsed_content"]
             total_papers = len(papers)
             
-            logger.info(f"Processing {total_papers} papers with structured extraction...")
-            
             # Check Ollama health before starting
             if not self._check_ollama_health():
                 logger.warning("Ollama service not responsive, waiting...")
@@ -323,25 +500,33 @@ Keep it concise and informative."""
                 logger.info("Using sequential processing to prevent Ollama overload")
                 summaries = self._sequential_process_with_delay(papers)
             
-            # Update state
-            state["summaries"] = summaries
-            state["current_stage"] = "structured_extraction_complete"
-            
-            # Log performance
-            elapsed_time = time.time() - start_time
-            completed = sum(1 for s in summaries if s.get("status") == "completed")
-            errors = sum(1 for s in summaries if s.get("status") == "error")
-            
-            logger.info(f"Processing complete: {completed} succeeded, {errors} failed, {elapsed_time:.2f}s total")
-            
-            return state
+            return self._finish(state, summaries, start_time)
             
         except Exception as e:
-            logger.error(f"Critical error in structured extractor: {str(e)}")
-            state["error"] = f"Structured extraction failed: {str(e)}"
-            state["current_stage"] = "extraction_failed"
-            return state
+            return self._failed(state, e)
     
+    async def acall(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of __call__: up to two papers in flight, the event loop stays free."""
+        start_time = time.time()
+
+        try:
+            papers = self._start(state)
+            if papers is None:
+                return state
+
+            # Same limit as the threaded path so one run never overloads Ollama
+            semaphore = asyncio.Semaphore(2)
+
+            async def process(paper: Dict[str, Any], paper_num: int) -> Dict[str, Any]:
+                async with semaphore:
+                    return await self._aprocess_single_paper_safe(paper, paper_num)
+
+            summaries = list(await asyncio.gather(*(process(paper, i) for i, paper in enumerate(papers, 1))))
+            return self._finish(state, summaries, start_time)
+
+        except Exception as e:
+            return self._failed(state, e)
+
     def _format_source(self, source: str) -> str:
         """Format source information."""
         if not source:
@@ -17,6 +17,10 @@ from langchain_community.embeddings import OllamaEmbeddings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 import requests
 
+from research_assistant.utils.token_budget import TokenBudget
+from research_assistant.utils.model_manager import KEEP_ALIVE
+from research_assistant.utils.prompts import FORMAT_CONTENT
+
 logger = logging.getLogger(__name__)
 
 class OllamaEnhancedResearchSummarizer:
@@ -33,6 +37,7 @@ class OllamaEnhancedResearchSummarizer:
             top_k=20,
             top_p=0.9
         )
+        self.budget = TokenBudget(max_ctx=8192)
         
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=1000,
@@ -75,30 +80,24 @@ class OllamaEnhancedResearchSummarizer:
             return content
             
         url = "http://localhost:11434/api/generate"
-        prompt = f"""Please process the following research content and provide a well-structured summary. 
-        - Extract and organize key information into clear sections
-        - Ensure the output is coherent and properly formatted
-        - Remove any truncated text or incomplete sentences
-        - Use markdown formatting with appropriate headers
-        
-        Content to process:
-        {content}"""
+        content = self.budget.fit(content, FORMAT_CONTENT.static_parts(), num_predict=1000)
+        prompt = FORMAT_CONTENT.render(("Content to process", content))
         
         payload = {
             "model": self.model_name,
+            "system": FORMAT_CONTENT.system,
             "prompt": prompt,
             "stream": False,
-            "options": {
-                "temperature": 0.3,
-                "top_p": 0.9,
-                "max_tokens": 4000
-            }
+            "keep_alive": KEEP_ALIVE,
+            "options": self.budget.options([FORMAT_CONTENT.system, prompt], num_predict=1000, model=self.model_name,
+                                          temperature=0.3, top_p=0.9)
         }
         
         try:
             response = requests.post(url, json=payload, timeout=120)
             response.raise_for_status()
             result = response.json()
+            self.budget.record([FORMAT_CONTENT.system, prompt], result)
             return result.get("response", content)
         except Exception as e:
             logger.warning(f"Ollama processing failed: {str(e)}")
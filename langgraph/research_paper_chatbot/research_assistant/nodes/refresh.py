@@ -0,0 +1,80 @@
+import logging
+from typing import Dict, Any, List
+
+from research_assistant.utils.catalog import paper_id
+
+logger = logging.getLogger(__name__)
+
+# Summaries written without the model (it was unreachable) are redone rather than reused
+_FALLBACK_METHODS = {"pattern_extraction_only"}
+
+class RefreshNode:
+    """Limit a refresh run to papers the previous run of the topic did not cover.
+
+    stage="diff" (after search dedup) keeps only new papers in state["search_results"]
+    and sets every completed model-written summary of the previous run aside, whether
+    or not this search found its paper again;
+    stage="merge" (before drafting) adds the known papers and summaries back, so the
+    draft and exports cover the whole set.
+    """
+
+    def __init__(self, stage: str = "diff"):
+        if stage not in ("diff", "merge"):
+            raise ValueError(f"Unknown refresh stage: {stage}")
+        self.stage = stage
+
+    @staticmethod
+    def _previous_summaries(previous: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Stored summaries of the previous run by paper ID; failed and fallback ones are redone."""
+        return {
+            s["paper_id"]: s for s in previous.get("summaries") or []
+            if isinstance(s, dict) and s.get("paper_id") and s.get("status") == "completed"
+            and s.get("method") not in _FALLBACK_METHODS
+        }
+
+    def _diff(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        previous = state.get("previous_run") or {}
+        summaries = self._previous_summaries(previous)
+        new: List[Dict[str, Any]] = []
+        known: List[Dict[str, Any]] = []
+        for paper in state.get("search_results") or []:
+            if not isinstance(paper, dict):
+                continue
+            pid = paper.setdefault("paper_id", paper_id(paper))
+            if pid in summaries:
+                known.append(paper)
+            else:
+                new.append(paper)
+
+        # Papers this search ranked lower or missed keep their place in the results
+        found = {paper["paper_id"] for paper in known}
+        missing = [pid for pid in summaries if pid not in found]
+        for pid in missing:
+            summary = summaries[pid]
+            known.append({"paper_id": pid, "title": summary.get("title", "Untitled"), "link": summary.get("source")})
+        reused = list(summaries.values())
+
+        logger.info(f"Refresh since run {previous.get('run_id')}: {len(new)} new papers, "
+                    f"{len(reused)} reused from the previous run ({len(missing)} not found again)")
+        state["search_results"] = new
+        state["known_papers"] = known
+        state["reused_summaries"] = reused
+        return state
+
+    @staticmethod
+    def _merge(state: Dict[str, Any]) -> Dict[str, Any]:
+        fresh = [s for s in state.get("summaries") or [] if isinstance(s, dict)]
+        reused = state.get("reused_summaries") or []
+        state["summaries"] = fresh + reused
+        state["search_results"] = (state.get("search_results") or []) + (state.get("known_papers") or [])
+        logger.info(f"Merged {len(fresh)} new and {len(reused)} reused summaries")
+        return state
+
+    def __call__(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        if not state.get("previous_run"):
+            return state
+        try:
+            return self._diff(state) if self.stage == "diff" else self._merge(state)
+        except Exception as e:
+            logger.error(f"Error in refresh {self.stage}: {str(e)}", exc_info=True)
+            return state
@@ -1,92 +1,158 @@
 import ollama
+import time
+import asyncio
 import logging
 import json
 from typing import Dict, Any, List, Optional
-import requests
+
+from research_assistant.utils.token_budget import TokenBudget
+from research_assistant.utils.model_manager import KEEP_ALIVE, get_async_client, is_timeout
+from research_assistant.utils.model_router import ModelRouter, default_router
+from research_assistant.utils.prompts import RELATED_TOPICS
+from research_assistant.utils.single_flight import SingleFlight, default_flight, llm_key
 
 logger = logging.getLogger(__name__)
 
 class RelatedTopicsNode:
-    def __init__(self, max_retries: int = 3, timeout: int = 30):
+    def __init__(self, max_retries: int = 3, timeout: int = 30, model: Optional[str] = None,
+                 router: Optional[ModelRouter] = None, flight: Optional[SingleFlight] = None):
+        # A fixed model overrides routing
+        self.model = model
+        self.router = router or default_router
+        # Concurrent runs on the same topic share one call
+        self.flight = flight or default_flight
         self.max_retries = max_retries
         self.timeout = timeout
         self.ollama_client = ollama.Client(
             host="http://localhost:11434",
             timeout=timeout
         )
+        self.budget = TokenBudget(max_ctx=4096)
     
+    def _parse_topics(self, content: str) -> Optional[List[str]]:
+        """Topics from a model response; None if the JSON has an unexpected shape."""
+        # Try to parse the response as JSON
+        try:
+            content = content.strip()
+            # Clean up the response to ensure it's valid JSON
+            if content.startswith('```json'):
+                content = content[content.find('['):content.rfind(']')+1]
+            elif '```' in content:
+                content = content[content.find('['):content.rfind(']')+1]
+            
+            topics = json.loads(content)
+            if isinstance(topics, list) and all(isinstance(t, str) for t in topics):
+                return topics[:8]  # Return max 8 topics
+            logger.warning(f"Unexpected response format: {content}")
+            return None
+                
+        except json.JSONDecodeError as e:
+            logger.warning(f"Failed to parse response as JSON: {e}")
+            # Fallback: Extract topics from text response
+            lines = [line.strip('-*# ') for line in content.split('\n') if line.strip()]
+            return lines[:8] if lines else ["Machine Learning in Security", "Network Security", "Threat Intelligence", "Anomaly Detection", "Cybersecurity Frameworks"]
+
+    def _request(self, topic: str) -> Dict[str, Any]:
+        """Keyword arguments for the related-topics call, shared by the sync and async clients."""
+        messages = RELATED_TOPICS.messages(("Research topic", topic))
+        prompt_parts = [m["content"] for m in messages]
+        model = self.model or self.router.select("related_topics")
+        return dict(
+            model=model,
+            messages=messages,
+            options=self.budget.options(prompt_parts, num_predict=500, model=model, temperature=0.3),
+            format="json",
+            keep_alive=KEEP_ALIVE
+        )
+
+    def _topics(self, request: Dict[str, Any], response: Any) -> Optional[List[str]]:
+        self.budget.record([m["content"] for m in request["messages"]], response)
+        self.router.record(request["model"], response)
+        return self._parse_topics(response['message']['content'])
+
+    def _attempt_failed(self, attempt: int, error: Exception) -> Optional[List[str]]:
+        """Log a failed attempt; the fallback topics once no retries are left, else None."""
+        if is_timeout(error):
+            logger.warning(f"Request to Ollama timed out (attempt {attempt + 1}/{self.max_retries})")
+            fallback = ["Machine Learning in Security", "Network Security", "Threat Intelligence"]
+        else:
+            logger.error(f"Error getting related topics: {str(error)}")
+            fallback = ["Machine Learning in Security", "Network Security"]
+        return fallback if attempt == self.max_retries - 1 else None
+
     def _get_related_topics(self, topic: str) -> List[str]:
         """Get related topics using Ollama with retries and error handling."""
-        system_prompt = """You are an expert research assistant. 
-        Provide a list of 5-8 key related topics or subfields for the given research topic. 
-        Return ONLY a JSON array of topic strings, no additional text or explanation.
-        Example: ["topic1", "topic2", "topic3"]"""
-        
+        request = self._request(topic)
         for attempt in range(self.max_retries):
             try:
-                response = self.ollama_client.chat(
-                    model="mistral",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": f"Provide related topics for: {topic}"}
-                    ],
-                    options={
-                        "temperature": 0.3,
-                        "max_tokens": 500
-                    },
-                    format="json"
-                )
-                
-                # Try to parse the response as JSON
-                try:
-                    content = response['message']['content'].strip()
-                    # Clean up the response to ensure it's valid JSON
-                    if content.startswith('```json'):
-                        content = content[content.find('['):content.rfind(']')+1]
-                    elif '```' in content:
-                        content = content[content.find('['):content.rfind(']')+1]
-                    
-                    topics = json.loads(content)
-                    if isinstance(topics, list) and all(isinstance(t, str) for t in topics):
-                        return topics[:8]  # Return max 8 topics
-                    else:
-                        logger.warning(f"Unexpected response format: {content}")
-                        
-                except (json.JSONDecodeError, KeyError) as e:
-                    logger.warning(f"Failed to parse response as JSON: {e}")
-                    # Fallback: Extract topics from text response
-                    content = response['message']['content'].strip()
-                    lines = [line.strip('-*# ') for line in content.split('\n') if line.strip()]
-                    return lines[:8] if lines else ["Machine Learning in Security", "Network Security", "Threat Intelligence", "Anomaly Detection", "Cybersecurity Frameworks"]
-                
-            except requests.exceptions.Timeout:
-                logger.warning(f"Request to Ollama timed out (attempt {attempt + 1}/{self.max_retries})")
-                if attempt == self.max_retries - 1:
-                    return ["Machine Learning in Security", "Network Security", "Threat Intelligence"]
-                
+                response = self.flight.do(llm_key(**request), lambda: self.ollama_client.chat(**request))
+                topics = self._topics(request, response)
+                if topics is not None:
+                    return topics
+
             except Exception as e:
-                logger.error(f"Error getting related topics: {str(e)}")
-                if attempt == self.max_retries - 1:
-                    return ["Machine Learning in Security", "Network Security"]
-        
+                failure = self._attempt_failed(attempt, e)
+                if failure:
+                    return failure
+                time.sleep(1)
+
         return ["Cybersecurity Fundamentals", "AI Security"]
 
-    def __call__(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate a list of related topics for the given topic."""
+    async def _aget_related_topics(self, topic: str) -> List[str]:
+        """Async variant of _get_related_topics on the shared ollama.AsyncClient."""
+        request = self._request(topic)
+        client = get_async_client("http://localhost:11434", self.timeout)
+        for attempt in range(self.max_retries):
+            try:
+                response = await self.flight.ado(llm_key(**request), lambda: client.chat(**request))
+                topics = self._topics(request, response)
+                if topics is not None:
+                    return topics
+
+            except Exception as e:
+                failure = self._attempt_failed(attempt, e)
+                if failure:
+                    return failure
+                await asyncio.sleep(1)
+
+        return ["Cybersecurity Fundamentals", "AI Security"]
+
+    @staticmethod
+    def _missing_topic(state: Dict[str, Any]) -> bool:
+        """Record default topics and return True when the state has no topic."""
         if not state.get("topic"):
             logger.error("No topic provided in state")
             state["related_topics"] = ["Cybersecurity Fundamentals", "AI Security"]
-            return state
-            
+            return True
         logger.info(f"Generating related topics for: {state['topic']}")
-        
+        return False
+
+    @staticmethod
+    def _finish(state: Dict[str, Any], related_topics: List[str]) -> Dict[str, Any]:
+        state["related_topics"] = related_topics or ["Cybersecurity Fundamentals"]
+        logger.info(f"Generated {len(related_topics)} related topics")
+        return state
+
+    @staticmethod
+    def _failed(state: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        logger.error(f"Unexpected error in RelatedTopicsNode: {str(error)}", exc_info=True)
+        state["related_topics"] = ["Cybersecurity Fundamentals", "AI Security"]
+        return state
+
+    def __call__(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate a list of related topics for the given topic."""
+        if self._missing_topic(state):
+            return state
         try:
-            related_topics = self._get_related_topics(state["topic"])
-            state["related_topics"] = related_topics or ["Cybersecurity Fundamentals"]
-            logger.info(f"Generated {len(related_topics)} related topics")
-            
+            return self._finish(state, self._get_related_topics(state["topic"]))
         except Exception as e:
-            logger.error(f"Unexpected error in RelatedTopicsNode: {str(e)}", exc_info=True)
-            state["related_topics"] = ["Cybersecurity Fundamentals", "AI Security"]
-        
-        return state
+            return self._failed(state, e)
+
+    async def acall(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of __call__ for app.ainvoke."""
+        if self._missing_topic(state):
+            return state
+        try:
+            return self._finish(state, await self._aget_related_topics(state["topic"]))
+        except Exception as e:
+            return self._failed(state, e)
@@ -1,18 +1,61 @@
 import ollama
+import asyncio
 import logging
+import json
+import re
+import concurrent.futures
 from typing import Dict, Any, List, Optional
 import time
 
+from research_assistant.utils.token_budget import TokenBudget
+from research_assistant.utils.model_manager import KEEP_ALIVE, get_async_client
+from research_assistant.utils.model_router import ModelRouter, default_router
+from research_assistant.utils.prompts import DRAFT_OUTLINE, DRAFT_SECTION, RESEARCH_DRAFT
+from research_assistant.utils.single_flight import SingleFlight, default_flight, llm_key
+
 logger = logging.getLogger(__name__)
 
+# Sections of the sectional draft: (name, what to write, keywords used to pick summary excerpts)
+DRAFT_SECTIONS = [
+    ("Abstract", "A brief summary of the research, around 150 words",
+     ["objective", "aim", "finding", "result", "conclude", "propose"]),
+    ("Introduction", "Background, problem statement, and objectives, around 250 words",
+     ["problem", "challenge", "motivation", "objective", "background", "gap"]),
+    ("Literature Review", "Synthesis of existing research with in-text citations, around 400 words",
+     ["study", "research", "prior", "existing", "review", "approach", "framework"]),
+    ("Methodology", "Research approach and methods used across the studies, around 250 words",
+     ["method", "approach", "technique", "dataset", "data", "model", "survey", "experiment"]),
+    ("Results", "Key findings from the research, around 300 words",
+     ["result", "finding", "accuracy", "performance", "improve", "significant", "show"]),
+    ("Discussion", "Interpretation of results and implications, around 250 words",
+     ["implication", "limitation", "interpret", "suggest", "impact", "however"]),
+    ("Conclusion", "Summary and future research directions, around 150 words",
+     ["conclusion", "future", "recommend", "direction", "contribution"]),
+]
+
 class ResearchDraftNode:
-    def __init__(self, max_retries: int = 3, timeout: int = 120):
-        self.max_retries = max_retries
+    def __init__(self, max_retries: int = 3, timeout: int = 120, mode: str = "single",
+                 max_workers: int = 3, excerpt_chars: int = 2500, model: Optional[str] = None,
+                 router: Optional[ModelRouter] = None, flight: Optional[SingleFlight] = None):
+        if mode not in ("single", "sectional"):
+            raise ValueError(f"Unknown draft mode: {mode}")
+        # A fixed model overrides routing for every call of this node
+        self.model = model
+        self.router = router or default_router
+        # Identical prompts from concurrent runs are sent to the model once
+        self.flight = flight or default_flight
+        # Attempts per chat call; there is always at least one, so _chat returns text or raises
+        self.max_retries = max(1, max_retries)
         self.timeout = timeout
+        # "sectional": outline first, then draft each section concurrently
+        self.mode = mode
+        self.max_workers = max_workers
+        self.excerpt_chars = excerpt_chars
         self.ollama_client = ollama.Client(
             host="http://localhost:11434",
             timeout=timeout
         )
+        self.budget = TokenBudget(max_ctx=16384)
     
     def _format_summaries(self, summaries: List[Dict[str, Any]]) -> str:
         """Format the list of summary dictionaries into a readable string."""
@@ -29,123 +72,291 @@ class ResearchDraftNode:
             content = summary.get('summary', 'No summary available')
             source = summary.get('source', 'Source not available')
             
-            formatted.append(f"""
-            --- PAPER {i}: {title} ---
-            Source: {source}
-            
-            {content}
-            
-            -----------------------------
-            """)
+            formatted.append(f"--- PAPER {i}: {title} ---\nSource: {source}\n\n{content}\n\n-----------------------------")
         
-        return "\n".join(formatted) if formatted else "No summaries available."
+        return "\n\n".join(formatted) if formatted else "No summaries available."
     
-    def _generate_research_draft(self, topic: str, summaries: List[Dict[str, Any]]) -> str:
-        """Generate a research draft using the Ollama model."""
+    def _summaries_error(self, summaries: List[Dict[str, Any]]) -> Optional[str]:
+        """Error message if there is nothing to draft from, else None."""
         if not summaries or not isinstance(summaries, list):
             logger.error("No valid summaries provided for research draft")
             return "Error: No valid research summaries available to generate a draft."
-            
-        # Format the summaries for the prompt
-        formatted_summaries = []
-        for i, summary in enumerate(summaries, 1):
-            if not isinstance(summary, dict):
-                logger.warning(f"Skipping invalid summary format at index {i-1}")
-                continue
-                
-            title = summary.get('title', f'Research Paper {i}')
-            content = summary.get('summary', 'No summary content available')
-            source = summary.get('source', 'Source not available')
-            
-            formatted = f"""
-            --- PAPER {i}: {title} ---
-            Source: {source}
-            
-            {content}
-            
-            -----------------------------
-            """
-            formatted_summaries.append(formatted)
-        
-        if not formatted_summaries:
+        if not any(isinstance(summary, dict) for summary in summaries):
             return "Error: No valid summaries could be processed for the research draft."
-            
-        summaries_text = "\n".join(formatted_summaries)
-        
-        system_prompt = """You are an expert academic research writer. Your task is to write a comprehensive 
-        research paper draft based on the provided research summaries. The paper should be well-structured, 
-        coherent, and properly cited where appropriate."""
-        
-        user_prompt = f"""
-        Research Topic: {topic}
-        
-        Please write a comprehensive research paper draft that includes the following sections:
-        1. Abstract: A brief summary of the research
-        2. Introduction: Background, problem statement, and objectives
-        3. Literature Review: Synthesis of existing research
-        4. Methodology: Research approach and methods
-        5. Results: Key findings from the research
-        6. Discussion: Interpretation of results and implications
-        7. Conclusion: Summary and future research directions
-        
-        Here are the research summaries to base your draft on:
-        {summaries}
-        
-        Please ensure that:
-        - The paper is well-organized with clear section headings
-        - You maintain an academic tone throughout
-        - You properly synthesize information from multiple sources
-        - You highlight key findings and their significance
-        - You include in-text citations where appropriate (e.g., [1], [2], etc.)
-        - The paper should be comprehensive but concise, approximately 1500-2000 words
-        - Include relevant examples and evidence from the provided research
-        - Conclude with practical implications and suggestions for future research
-        """.format(summaries=summaries_text)
-        
+        return None
+
+    def _draft_messages(self, topic: str, summaries: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        summaries_text = self._format_summaries(summaries)
+        # Trim the summaries, not the instructions, when everything does not fit
+        summaries_text = self.budget.fit(summaries_text, RESEARCH_DRAFT.static_parts() + [topic], num_predict=4000)
+        return RESEARCH_DRAFT.messages(("Research Topic", topic), ("Research summaries", summaries_text))
+
+    def _generate_research_draft(self, topic: str, summaries: List[Dict[str, Any]]) -> str:
+        """Generate a research draft using the Ollama model."""
+        error = self._summaries_error(summaries)
+        if error:
+            return error
+        return self._chat(self._draft_messages(topic, summaries), temperature=0.3, max_tokens=4000)
+
+    async def _agenerate_research_draft(self, topic: str, summaries: List[Dict[str, Any]]) -> str:
+        """Async variant of _generate_research_draft."""
+        error = self._summaries_error(summaries)
+        if error:
+            return error
+        return await self._achat(self._draft_messages(topic, summaries), temperature=0.3, max_tokens=4000)
+
+    def _chat_request(self, messages: List[Dict[str, str]], temperature: float, max_tokens: int,
+                      format: str, task: str) -> Dict[str, Any]:
+        """Keyword arguments for one chat call, shared by the sync and async clients."""
+        prompt_parts = [m["content"] for m in messages]
+        model = self.model or self.router.select(task)
+        return dict(
+            model=model,
+            messages=messages,
+            options=self.budget.options(prompt_parts, num_predict=max_tokens, model=model, temperature=temperature),
+            format=format,
+            keep_alive=KEEP_ALIVE
+        )
+
+    def _chat_result(self, request: Dict[str, Any], response: Any) -> str:
+        self.budget.record([m["content"] for m in request["messages"]], response)
+        self.router.record(request["model"], response)
+        return response['message']['content'].strip()
+
+    def _attempt_failed(self, attempt: int, error: Exception) -> None:
+        """Log a failed chat attempt; re-raise once no retries are left."""
+        logger.warning(f"Attempt {attempt + 1} failed: {str(error)}")
+        if attempt == self.max_retries - 1:
+            raise error
+
+    def _chat(self, messages: List[Dict[str, str]], temperature: float = 0.3,
+              max_tokens: int = 1000, format: str = "", task: str = "research_draft") -> str:
+        """Single chat call with retries; raises after the last failed attempt."""
+        request = self._chat_request(messages, temperature, max_tokens, format, task)
         for attempt in range(self.max_retries):
             try:
-                response = self.ollama_client.chat(
-                    model="mistral",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    options={
-                        "temperature": 0.3,
-                        "max_tokens": 4000
-                    }
-                )
-                return response['message']['content'].strip()
-                
+                response = self.flight.do(llm_key(**request), lambda: self.ollama_client.chat(**request))
+                return self._chat_result(request, response)
+
             except Exception as e:
-                logger.warning(f"Attempt {attempt + 1} failed: {str(e)}")
-                if attempt == self.max_retries - 1:
-                    raise
+                self._attempt_failed(attempt, e)
                 time.sleep(2)  # Wait before retrying
-        
-        return "Error: Failed to generate research draft after multiple attempts."
 
-    def __call__(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate a research paper draft based on the provided summaries."""
+    async def _achat(self, messages: List[Dict[str, str]], temperature: float = 0.3,
+                     max_tokens: int = 1000, format: str = "", task: str = "research_draft") -> str:
+        """Async variant of _chat on the shared ollama.AsyncClient."""
+        request = self._chat_request(messages, temperature, max_tokens, format, task)
+        client = get_async_client("http://localhost:11434", self.timeout)
+        for attempt in range(self.max_retries):
+            try:
+                response = await self.flight.ado(llm_key(**request), lambda: client.chat(**request))
+                return self._chat_result(request, response)
+
+            except Exception as e:
+                self._attempt_failed(attempt, e)
+                await asyncio.sleep(2)  # Wait before retrying
+
+    def _outline_messages(self, topic: str, summaries: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        overview = "\n".join(
+            f"[{i}] {s.get('title', f'Paper {i}')}: {' '.join(str(s.get('summary', '')).split())[:300]}"
+            for i, s in enumerate(summaries, 1) if isinstance(s, dict)
+        )
+        section_names = [name for name, _, _ in DRAFT_SECTIONS]
+        return DRAFT_OUTLINE.messages(
+            ("Sections", json.dumps(section_names)),
+            ("Research Topic", topic),
+            ("Papers", overview)
+        )
+
+    @staticmethod
+    def _parse_outline(text: Optional[str]) -> Dict[str, List[str]]:
+        """Key points per section from the model's JSON; empty lists when unusable."""
+        section_names = [name for name, _, _ in DRAFT_SECTIONS]
+        try:
+            outline = json.loads(text) if text else None
+            if isinstance(outline, dict):
+                return {name: [str(p) for p in outline.get(name, []) if p] if isinstance(outline.get(name), list) else []
+                        for name in section_names}
+        except Exception as e:
+            logger.warning(f"Could not parse outline, drafting sections without one: {str(e)}")
+        return {name: [] for name in section_names}
+
+    def _generate_outline(self, topic: str, summaries: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+        """Ask for a short outline (key points per section) from titles and summary openings."""
+        try:
+            return self._parse_outline(self._chat(self._outline_messages(topic, summaries), temperature=0.2,
+                                                  max_tokens=600, format="json", task="draft_outline"))
+        except Exception as e:
+            logger.warning(f"Could not generate outline, drafting sections without one: {str(e)}")
+            return self._parse_outline(None)
+
+    async def _agenerate_outline(self, topic: str, summaries: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+        """Async variant of _generate_outline."""
+        try:
+            return self._parse_outline(await self._achat(self._outline_messages(topic, summaries), temperature=0.2,
+                                                         max_tokens=600, format="json", task="draft_outline"))
+        except Exception as e:
+            logger.warning(f"Could not generate outline, drafting sections without one: {str(e)}")
+            return self._parse_outline(None)
+
+    def _select_excerpts(self, keywords: List[str], summaries: List[Dict[str, Any]]) -> str:
+        """Pick the summary paragraphs most relevant to a section, tagged with their citation number."""
+        scored = []
+        for i, summary in enumerate(summaries, 1):
+            if not isinstance(summary, dict):
+                continue
+            for paragraph in re.split(r"\n\s*\n", str(summary.get('summary', ''))):
+                paragraph = " ".join(paragraph.split())
+                if len(paragraph) < 40:
+                    continue
+                lower = paragraph.lower()
+                score = sum(lower.count(k) for k in keywords)
+                if score:
+                    scored.append((score, i, paragraph))
+
+        scored.sort(key=lambda item: item[0], reverse=True)
+        excerpts, used = [], 0
+        for _, i, paragraph in scored:
+            if used + len(paragraph) > self.excerpt_chars:
+                continue
+            excerpts.append(f"[{i}] {paragraph}")
+            used += len(paragraph)
+        if not excerpts:
+            # No keyword hits: fall back to the opening of each summary
+            for i, summary in enumerate(summaries, 1):
+                if isinstance(summary, dict):
+                    excerpts.append(f"[{i}] {' '.join(str(summary.get('summary', '')).split())[:300]}")
+        return "\n\n".join(excerpts)
+
+    @staticmethod
+    def _section_messages(topic: str, section: str, guidance: str, points: List[str], excerpts: str) -> List[Dict[str, str]]:
+        outline = "\n".join(f"- {p}" for p in points) if points else "- (no outline)"
+        # Topic first: every section request of a run shares the prefix up to here
+        return DRAFT_SECTION.messages(
+            ("Research Topic", topic),
+            ("Section", f"{section} ({guidance})"),
+            ("Key points to cover", outline),
+            ("Relevant excerpts from the research summaries", excerpts)
+        )
+
+    def _draft_section(self, topic: str, section: str, guidance: str, points: List[str], excerpts: str) -> str:
+        """Draft one section; retries only this section on failure."""
+        return self._chat(self._section_messages(topic, section, guidance, points, excerpts), max_tokens=1000)
+
+    async def _adraft_section(self, topic: str, section: str, guidance: str, points: List[str], excerpts: str) -> str:
+        """Async variant of _draft_section."""
+        return await self._achat(self._section_messages(topic, section, guidance, points, excerpts), max_tokens=1000)
+
+    @staticmethod
+    def _assemble(topic: str, valid: List[Dict[str, Any]], sections: Dict[str, str]) -> str:
+        """Stitch drafted sections and a reference list into one document."""
+        parts = [f"# {topic}"]
+        for name, _, _ in DRAFT_SECTIONS:
+            parts.append(f"## {name}\n\n{sections[name]}")
+        parts.append("## References\n\n" + "\n".join(
+            f"[{i}] {s.get('title', f'Paper {i}')}" + (f". {s['source']}" if s.get('source') else "")
+            for i, s in enumerate(valid, 1)
+        ))
+        return "\n\n".join(parts)
+
+    def _section_failed(self, name: str, error: BaseException) -> str:
+        logger.error(f"Section '{name}' failed after {self.max_retries} attempts: {str(error)}")
+        return f"*[This section could not be generated: {str(error)}]*"
+
+    def _generate_sectional_draft(self, topic: str, summaries: List[Dict[str, Any]]) -> str:
+        """Outline first, then draft every section concurrently and stitch them together."""
+        valid = [s for s in summaries if isinstance(s, dict)]
+        if not valid:
+            return "Error: No valid summaries could be processed for the research draft."
+
+        outline = self._generate_outline(topic, valid)
+        sections: Dict[str, str] = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self._draft_section, topic, name, guidance, outline.get(name, []),
+                                self._select_excerpts(keywords, valid)): name
+                for name, guidance, keywords in DRAFT_SECTIONS
+            }
+            for future in concurrent.futures.as_completed(futures):
+                name = futures[future]
+                try:
+                    sections[name] = future.result()
+                except Exception as e:
+                    sections[name] = self._section_failed(name, e)
+
+        return self._assemble(topic, valid, sections)
+
+    async def _agenerate_sectional_draft(self, topic: str, summaries: List[Dict[str, Any]]) -> str:
+        """Async variant of _generate_sectional_draft; max_workers sections are in flight at once."""
+        valid = [s for s in summaries if isinstance(s, dict)]
+        if not valid:
+            return "Error: No valid summaries could be processed for the research draft."
+
+        outline = await self._agenerate_outline(topic, valid)
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def draft(name: str, guidance: str, keywords: List[str]) -> str:
+            async with semaphore:
+                return await self._adraft_section(topic, name, guidance, outline.get(name, []),
+                                                  self._select_excerpts(keywords, valid))
+
+        results = await asyncio.gather(*(draft(*section) for section in DRAFT_SECTIONS), return_exceptions=True)
+        sections = {
+            name: self._section_failed(name, result) if isinstance(result, BaseException) else result
+            for (name, _, _), result in zip(DRAFT_SECTIONS, results)
+        }
+        return self._assemble(topic, valid, sections)
+
+    @staticmethod
+    def _missing_input(state: Dict[str, Any]) -> bool:
+        """Record an error draft and return True when the state has nothing to draft from."""
         if "summaries" not in state or not state["summaries"]:
             logger.error("No summaries found in state")
             state["research_draft"] = "Error: No research summaries available to generate a draft."
-            return state
+            return True
             
         if not state.get("topic"):
             logger.error("No topic found in state")
             state["research_draft"] = "Error: No research topic specified."
-            return state
+            return True
             
         logger.info("Generating research draft...")
-        
+        return False
+
+    @staticmethod
+    def _finish(state: Dict[str, Any], draft: str) -> Dict[str, Any]:
+        state["research_draft"] = draft
+        logger.info("Successfully generated research draft")
+        return state
+
+    @staticmethod
+    def _failed(state: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        logger.error(f"Error generating research draft: {str(error)}", exc_info=True)
+        state["research_draft"] = f"Error: Failed to generate research draft. {str(error)}"
+        return state
+
+    def __call__(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate a research paper draft based on the provided summaries."""
+        if self._missing_input(state):
+            return state
         try:
-            draft = self._generate_research_draft(state["topic"], state["summaries"])
-            state["research_draft"] = draft
-            logger.info("Successfully generated research draft")
-            
+            if self.mode == "sectional":
+                draft = self._generate_sectional_draft(state["topic"], state["summaries"])
+            else:
+                draft = self._generate_research_draft(state["topic"], state["summaries"])
+            return self._finish(state, draft)
         except Exception as e:
-            logger.error(f"Error generating research draft: {str(e)}", exc_info=True)
-            state["research_draft"] = f"Error: Failed to generate research draft. {str(e)}"
-        
-        return state
+            return self._failed(state, e)
+
+    async def acall(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of __call__ for app.ainvoke."""
+        if self._missing_input(state):
+            return state
+        try:
+            if self.mode == "sectional":
+                draft = await self._agenerate_sectional_draft(state["topic"], state["summaries"])
+            else:
+                draft = await self._agenerate_research_draft(state["topic"], state["summaries"])
+            return self._finish(state, draft)
+        except Exception as e:
+            return self._failed(state, e)
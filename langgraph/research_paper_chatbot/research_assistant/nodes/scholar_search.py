@@ -1,28 +1,48 @@
 import os
-import time
+import asyncio
 import logging
+import concurrent.futures
 from serpapi.google_search import GoogleSearch
 from dotenv import load_dotenv
 from typing import Dict, List, Any, Optional
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+from research_assistant.utils.search_cache import SearchCache
+from research_assistant.utils.rank_fusion import reciprocal_rank_fusion
+
 logger = logging.getLogger(__name__)
 
-load_dotenv()
+# Google Scholar returns at most 20 results per page
+RESULTS_PER_PAGE = 20
 
 class ScholarSearchNode:
-    def __init__(self, max_results: int = 10, year_min: Optional[int] = None):
+    def __init__(self, max_results: int = 10, year_min: Optional[int] = None,
+                 cache_dir: Optional[str] = None, cache_ttl: int = 7 * 24 * 3600,
+                 max_workers: int = 4, expand_queries: bool = False,
+                 max_expansions: int = 8, max_downloads: Optional[int] = None):
         self.max_results = max_results
         self.year_min = year_min
+        self.max_workers = max_workers
+        # Multi-query mode: also search each related topic and fuse the rankings
+        self.expand_queries = expand_queries
+        self.max_expansions = max_expansions
+        self.max_downloads = max_downloads or max_results
+        load_dotenv()
         self.api_key = os.getenv("SERPAPI_API_KEY")
         if not self.api_key:
             logger.error("SERPAPI_API_KEY not found in environment variables")
+        self.cache = SearchCache(
+            cache_dir=cache_dir or os.getenv("SCHOLAR_CACHE_DIR", ".search_cache"),
+            ttl=cache_ttl
+        )
 
-    def _build_search_query(self, topic: str) -> str:
+    def _build_search_query(self, topic: str, context: Optional[str] = None) -> str:
         """Create a focused search query for the given topic."""
         # Use the exact topic as the main query
         query = f'"{topic}"'
+
+        # Keep expanded queries anchored to the main topic
+        if context:
+            query += f" {context}"
         
         # Add year filter if specified
         if self.year_min:
@@ -31,35 +51,128 @@ class ScholarSearchNode:
         logger.info(f"Search query: {query}")
         return query
 
-    def _search_scholar(self, query: str) -> Optional[Dict]:
-        """Execute the search with error handling and retries."""
-        if not self.api_key:
-            logger.error("API key not available")
-            return None
-            
+    def _page_params(self, query: str, start: int, num: int) -> Dict[str, Any]:
+        """Build SerpAPI parameters for a single result page."""
         params = {
             "q": query,
             "engine": "google_scholar",
             "api_key": self.api_key,
-            "num": min(self.max_results, 20),  # Max 20 results per page
+            "num": num,
+            "start": start,
             "as_ylo": self.year_min,
             "hl": "en",
             "as_vis": "1"  # Include both citations and versions
         }
+        return params
+
+    def _fetch_page(self, params: Dict[str, Any]) -> Optional[Dict]:
+        """Fetch one result page, serving it from the cache when possible."""
+        cached = self.cache.get(params)
+        if cached is not None:
+            logger.debug(f"Cache hit for page start={params['start']}")
+            return cached
 
         try:
             search = GoogleSearch(params)
             results = search.get_dict()
-            
+
             if "error" in results:
                 logger.error(f"API Error: {results.get('error')}")
                 return None
-                
+
+            self.cache.set(params, results)
             return results
-            
+
         except Exception as e:
-            logger.error(f"Search failed: {str(e)}")
+            logger.error(f"Search failed (start={params['start']}): {str(e)}")
+            return None
+
+    def _search_scholar(self, query: str) -> Optional[Dict]:
+        """Fetch all result pages needed for max_results concurrently and merge them."""
+        if not self.api_key:
+            logger.error("API key not available")
             return None
+        if self.max_results <= 0:
+            # Nothing requested: no pages to fetch, and no search error either
+            return {"organic_results": []}
+
+        pages = []
+        for start in range(0, self.max_results, RESULTS_PER_PAGE):
+            num = min(RESULTS_PER_PAGE, self.max_results - start)
+            pages.append(self._page_params(query, start, num))
+
+        workers = max(1, min(self.max_workers, len(pages)))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            responses = list(executor.map(self._fetch_page, pages))
+
+        if responses[0] is None:
+            return None
+
+        # Merge pages in offset order, stopping at the first short or failed page
+        organic_results = []
+        for params, response in zip(pages, responses):
+            if response is None:
+                logger.warning(f"Page start={params['start']} failed, returning partial results")
+                break
+            page_results = response.get("organic_results", [])
+            organic_results.extend(page_results)
+            if len(page_results) < params["num"]:
+                break
+
+        merged = dict(responses[0])
+        merged["organic_results"] = organic_results
+        return merged
+
+    def _to_papers(self, results: Dict, query: str) -> List[Dict[str, Any]]:
+        """Convert raw organic results into paper records."""
+        papers = []
+        for i, result in enumerate(results.get("organic_results", [])[:self.max_results], 1):
+            paper = {
+                "title": result.get("title", "No title"),
+                "link": result.get("link"),
+                "snippet": result.get("snippet", ""),
+                "publication_info": result.get("publication_info", {}).get("summary"),
+                "year": next((y for y in range(2025, 1900, -1) if str(y) in result.get("snippet", "")), None),
+                # PDF copies Scholar lists beside the main link (arXiv, repositories, author pages)
+                "pdf_links": [r["link"] for r in result.get("resources", [])
+                              if r.get("link") and r.get("file_format") == "PDF"],
+                "result_id": i,  # Add a sequential ID for reference
+                "matched_queries": [query]
+            }
+            logger.debug(f"Found paper {i}: {paper.get('title', 'Untitled')}")
+            if paper["link"]:
+                logger.debug(f"  - Has direct link: {paper['link']}")
+            else:
+                logger.debug("  - No direct link available")
+            papers.append(paper)
+        return papers
+
+    def _search_many(self, queries: List[str]) -> List[List[Dict[str, Any]]]:
+        """Run several searches concurrently and return one ranked paper list per query."""
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(queries)))) as executor:
+            responses = list(executor.map(self._search_scholar, queries))
+
+        rankings = []
+        for query, results in zip(queries, responses):
+            if results:
+                rankings.append(self._to_papers(results, query))
+            else:
+                logger.warning(f"No results for expanded query: {query}")
+        return rankings
+
+    def _expanded_search(self, topic: str, related_topics: List[str]) -> List[Dict[str, Any]]:
+        """Search the topic plus its related topics and merge with reciprocal-rank fusion."""
+        queries = [self._build_search_query(topic)]
+        for related in related_topics[:self.max_expansions]:
+            if isinstance(related, str) and related.strip() and related.strip().lower() != topic.lower():
+                queries.append(self._build_search_query(related.strip(), context=topic))
+
+        logger.info(f"Running {len(queries)} searches concurrently")
+        rankings = self._search_many(queries)
+        papers = reciprocal_rank_fusion(rankings, limit=self.max_downloads)
+        for i, paper in enumerate(papers, 1):
+            paper["result_id"] = i
+        return papers
 
     def __call__(self, state: Dict) -> Dict:
         if not self.api_key:
@@ -74,37 +187,32 @@ class ScholarSearchNode:
             return state
 
         logger.info(f"Searching for papers on: {topic}")
-        
-        # Build enhanced query
-        query = self._build_search_query(topic)
-        logger.debug(f"Search query: {query}")
-
-        # Execute search
-        results = self._search_scholar(query)
-        if not results:
-            state["search_error"] = "No results found or search failed"
-            return state
 
-        # Process results
-        papers = []
-        if "organic_results" in results:
-            for i, result in enumerate(results["organic_results"][:self.max_results], 1):
-                paper = {
-                    "title": result.get("title", "No title"),
-                    "link": result.get("link"),
-                    "snippet": result.get("snippet", ""),
-                    "publication_info": result.get("publication_info", {}).get("summary"),
-                    "year": next((y for y in range(2025, 1900, -1) if str(y) in result.get("snippet", "")), None),
-                    "result_id": i  # Add a sequential ID for reference
-                }
-                logger.debug(f"Found paper {i}: {paper.get('title', 'Untitled')}")
-                if paper["link"]:
-                    logger.debug(f"  - Has direct link: {paper['link']}")
-                else:
-                    logger.debug("  - No direct link available")
-                papers.append(paper)
+        related_topics = state.get("related_topics") or []
+        if self.expand_queries and related_topics:
+            papers = self._expanded_search(topic, related_topics)
+            if not papers:
+                state["search_error"] = "No results found or search failed"
+                return state
+        else:
+            # Build enhanced query
+            query = self._build_search_query(topic)
+            logger.debug(f"Search query: {query}")
+
+            # Execute search
+            results = self._search_scholar(query)
+            if not results:
+                state["search_error"] = "No results found or search failed"
+                return state
+
+            # Process results
+            papers = self._to_papers(results, query)[:self.max_downloads]
 
         logger.info(f"Found {len(papers)} papers")
         state["search_results"] = papers
         state["papers"] = papers  # Keep for backward compatibility
         return state
+
+    async def acall(self, state: Dict) -> Dict:
+        """Async entry point; the SerpAPI client is blocking, so the search runs in a worker thread."""
+        return await asyncio.to_thread(self.__call__, state)
@@ -1,19 +1,29 @@
 import ollama
+import asyncio
 import logging
 import time
 from typing import List, Dict, Any, Optional, Tuple
 import re
 from pathlib import Path
 
+from research_assistant.utils.artifact_store import load_sections, load_text
+from research_assistant.utils.token_budget import TokenBudget
+from research_assistant.utils.model_manager import KEEP_ALIVE
+from research_assistant.utils.model_router import ModelRouter, default_router
+from research_assistant.utils.prompts import KEY_POINTS, OVERALL_SUMMARY, SECTION_SUMMARY, section_focus
+
 logger = logging.getLogger(__name__)
 
 class SummarizerNode:
-    def __init__(self, model: str = "mistral", max_chars: int = 32000):
+    def __init__(self, model: Optional[str] = None, max_chars: int = 32000, router: Optional[ModelRouter] = None):
+        # A fixed model overrides routing
         self.model = model
+        self.router = router or default_router
         self.max_chars = max_chars  # Increased for handling full papers
         self.ollama_client = ollama.Client(host="http://localhost:11434")
         self.max_retries = 3
         self.retry_delay = 2
+        self.budget = TokenBudget(max_ctx=8192)
 
     def _chunk_text(self, text: str, max_chars: int) -> List[Dict[str, Any]]:
         """
@@ -99,97 +109,37 @@ class SummarizerNode:
     def _generate_section_summary(self, section_name: str, section_text: str, paper_title: str = "", context: str = "") -> str:
         """Generate a summary for a specific section of a paper."""
         try:
-            # Prepare the prompt based on section type
-            if section_name.lower() == 'abstract':
-                prompt = f"""
-                You are summarizing the ABSTRACT of a research paper titled: {paper_title}
-                
-                Please provide a concise summary that captures:
-                1. The main research question or objective
-                2. The approach or methodology used
-                3. Key findings or results
-                4. The significance or implications
-                
-                Abstract:
-                {section_text}
-                """
-            elif section_name.lower() in ['introduction', 'background']:
-                prompt = f"""
-                You are summarizing the INTRODUCTION/BACKGROUND section of a research paper titled: {paper_title}
-                
-                Focus on:
-                1. The research problem and its context
-                2. Gaps in current knowledge
-                3. Research objectives or hypotheses
-                
-                Introduction/Background:
-                {section_text}
-                """
-            elif section_name.lower() in ['method', 'methodology', 'methods']:
-                prompt = f"""
-                You are summarizing the METHODOLOGY section of a research paper titled: {paper_title}
-                
-                Focus on:
-                1. Research design and approach
-                2. Data collection methods
-                3. Analysis techniques
-                4. Any tools or frameworks used
-                
-                Methodology:
-                {section_text}
-                """
-            elif section_name.lower() in ['results', 'findings']:
-                prompt = f"""
-                You are summarizing the RESULTS/FINDINGS section of a research paper titled: {paper_title}
-                
-                Focus on:
-                1. Key results and findings
-                2. Important data points or statistics
-                3. Any patterns or trends observed
-                
-                Results/Findings:
-                {section_text}
-                """
-            elif section_name.lower() in ['discussion', 'conclusion']:
-                prompt = f"""
-                You are summarizing the DISCUSSION/CONCLUSION section of a research paper titled: {paper_title}
-                
-                Focus on:
-                1. Interpretation of results
-                2. Implications for the field
-                3. Limitations of the study
-                4. Suggestions for future research
-                
-                Discussion/Conclusion:
-                {section_text}
-                """
-            else:
-                prompt = f"""
-                You are summarizing the '{section_name.upper()}' section of a research paper titled: {paper_title}
-                
-                Please provide a concise summary of the key points from this section.
-                
-                {section_name}:
-                {section_text}
-                """
-            
-            # Add context if available
+            focus = section_focus(section_name)
+            section_text = self.budget.fit(
+                section_text,
+                SECTION_SUMMARY.static_parts() + [context, paper_title, focus],
+                num_predict=1000
+            )
+
+            # Title and the append-only context precede the section-specific parts, so
+            # successive sections of one paper share everything up to the focus points
+            blocks = [("Paper title", paper_title)]
             if context:
-                prompt = f"Context from other sections:\n{context}\n\n" + prompt
-            
+                blocks.append(("Context from other sections", context.strip()))
+            blocks += [focus, ("Section text", section_text)]
+            messages = SECTION_SUMMARY.messages(*blocks)
+            prompt_parts = [m["content"] for m in messages]
+
+            model = self.model or self.router.select("summarizer")
             response = self.ollama_client.chat(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful research assistant that provides accurate and concise summaries of academic papers."},
-                    {"role": "user", "content": prompt}
-                ],
-                options={
-                    "temperature": 0.2,  # Low temperature for factual accuracy
-                    "top_p": 0.9,
-                    "max_tokens": 1000,
-                    "num_ctx": 8000  # Larger context window for full papers
-                }
+                model=model,
+                messages=messages,
+                options=self.budget.options(
+                    prompt_parts,
+                    num_predict=1000,
+                    model=model,
+                    temperature=0.2,  # Low temperature for factual accuracy
+                    top_p=0.9
+                ),
+                keep_alive=KEEP_ALIVE
             )
+            self.budget.record(prompt_parts, response)
+            self.router.record(model, response)
             
             return response['message']['content'].strip()
             
@@ -201,7 +151,7 @@ class SummarizerNode:
         """Generate a comprehensive summary of a full research paper."""
         try:
             title = paper_data.get('title', 'Untitled Paper')
-            sections = paper_data.get('sections', {})
+            sections = load_sections(paper_data)
             
             # Initialize summary sections
             summary = {
@@ -212,10 +162,10 @@ class SummarizerNode:
                 'full_summary': ''
             }
             
-            # Process each section
+            # Process each section; references and acknowledgments never go to the LLM
             section_order = [
                 'abstract', 'introduction', 'related work', 'methodology',
-                'results', 'discussion', 'conclusion', 'references'
+                'results', 'discussion', 'conclusion'
             ]
             
             # Build context as we go through sections
@@ -233,54 +183,29 @@ class SummarizerNode:
                     context += f"\n\n{section_name.upper()}:\n{section_summary}"
             
             # Generate overall key points
-            key_points_prompt = f"""
-            Based on the following paper summary, extract 3-5 key points:
-            
-            {context}
-            
-            Format as a bulleted list of the most important findings or contributions.
-            """
-            
+            context = self.budget.fit(context.strip(), OVERALL_SUMMARY.static_parts(), num_predict=1000)
+            messages = KEY_POINTS.messages(("Paper summary", context))
+            model = self.model or self.router.select("key_points")
             response = self.ollama_client.chat(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a research assistant that extracts key points from academic papers."},
-                    {"role": "user", "content": key_points_prompt}
-                ],
-                options={
-                    "temperature": 0.1,
-                    "max_tokens": 500
-                }
+                model=model,
+                messages=messages,
+                options=self.budget.options([m["content"] for m in messages], num_predict=500, model=model, temperature=0.1),
+                keep_alive=KEEP_ALIVE
             )
+            self.router.record(model, response)
             
             summary['key_points'] = response['message']['content'].strip().split('\n')
             
             # Generate a concise overall summary
-            overall_summary_prompt = f"""
-            Write a comprehensive but concise summary of this research paper based on the following sections:
-            
-            {context}
-            
-            Your summary should be structured as follows:
-            1. Introduction to the research problem
-            2. Methodology overview
-            3. Key findings
-            4. Implications and conclusions
-            
-            Keep it under 500 words.
-            """
-            
+            messages = OVERALL_SUMMARY.messages(("Section summaries", context))
+            model = self.model or self.router.select("summarizer")
             response = self.ollama_client.chat(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a research assistant that writes clear, concise summaries of academic papers."},
-                    {"role": "user", "content": overall_summary_prompt}
-                ],
-                options={
-                    "temperature": 0.2,
-                    "max_tokens": 1000
-                }
+                model=model,
+                messages=messages,
+                options=self.budget.options([m["content"] for m in messages], num_predict=1000, model=model, temperature=0.2),
+                keep_alive=KEEP_ALIVE
             )
+            self.router.record(model, response)
             
             summary['full_summary'] = response['message']['content'].strip()
             
@@ -326,7 +251,8 @@ class SummarizerNode:
             
             try:
                 # Check if we have processed content with sections
-                if 'sections' in paper and paper['sections']:
+                sections = load_sections(paper)
+                if sections:
                     # Generate comprehensive summary for full paper
                     summary = self._generate_comprehensive_summary(paper)
                     
@@ -361,7 +287,8 @@ class SummarizerNode:
                                 formatted_summary += f"### {section_name.title()}\n{section_summary}\n\n"
                     
                     # Add source information to the summary
-                    content_source = 'full text' if len(paper.get('sections', {}).get('full_text', '')) > 100 else 'abstract only'
+                    full_text_chars = (paper.get('processed_content') or {}).get('full_text_chars', 0)
+                    content_source = 'full text' if full_text_chars > 100 or len(sections) > 1 else 'abstract only'
                     formatted_summary += f"\n\n*[Summary based on {content_source}]*"
                     
                     summaries.append({
@@ -373,7 +300,7 @@ class SummarizerNode:
                     })
                 else:
                     # Fallback to simple summarization if no sections
-                    text = paper.get('text', '')
+                    text = paper.get('text', '') or load_text(paper, 'content')
                     if not text.strip():
                         text = str(paper)  # Last resort
                         
@@ -409,3 +336,7 @@ class SummarizerNode:
         logger.info(f"Generated {len(summaries)} summaries from {len(state.get('processed_papers', []))} papers")
         state["summaries"] = summaries
         return state
+
+    async def acall(self, state: Dict) -> Dict:
+        """Async entry point; sections of a paper build on each other, so the sequential path runs in a worker thread."""
+        return await asyncio.to_thread(self.__call__, state)
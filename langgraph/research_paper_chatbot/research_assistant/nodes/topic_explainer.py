@@ -1,74 +1,128 @@
 import ollama
 import time
+import asyncio
 import logging
 from typing import Dict, Any, Optional
-import requests
+
+from research_assistant.utils.token_budget import TokenBudget
+from research_assistant.utils.model_manager import KEEP_ALIVE, get_async_client, is_timeout
+from research_assistant.utils.model_router import ModelRouter, default_router
+from research_assistant.utils.prompts import TOPIC_EXPLAINER
+from research_assistant.utils.single_flight import SingleFlight, default_flight, llm_key
 
 logger = logging.getLogger(__name__)
 
 class TopicExplainerNode:
-    def __init__(self, max_retries: int = 3, timeout: int = 120):
+    def __init__(self, max_retries: int = 3, timeout: int = 120, model: Optional[str] = None,
+                 router: Optional[ModelRouter] = None, flight: Optional[SingleFlight] = None):
+        # A fixed model overrides routing
+        self.model = model
+        self.router = router or default_router
+        # Concurrent runs on the same topic share one explanation call
+        self.flight = flight or default_flight
         self.max_retries = max_retries
         self.timeout = timeout
         self.ollama_client = ollama.Client(
             host="http://localhost:11434",
             timeout=timeout
         )
+        self.budget = TokenBudget(max_ctx=4096)
     
+    def _request(self, topic: str) -> Dict[str, Any]:
+        """Keyword arguments for the explanation call, shared by the sync and async clients."""
+        messages = TOPIC_EXPLAINER.messages(("Topic", topic))
+        prompt_parts = [m["content"] for m in messages]
+        model = self.model or self.router.select("topic_explainer")
+        return dict(
+            model=model,
+            messages=messages,
+            options=self.budget.options(prompt_parts, num_predict=500, model=model, temperature=0.3),
+            keep_alive=KEEP_ALIVE
+        )
+
+    def _explanation(self, request: Dict[str, Any], response: Any) -> str:
+        self.budget.record([m["content"] for m in request["messages"]], response)
+        self.router.record(request["model"], response)
+        return response['message']['content'].strip()
+
+    def _attempt_failed(self, attempt: int, error: Exception) -> Optional[str]:
+        """Log a failed attempt; the fallback explanation once no retries are left, else None."""
+        if is_timeout(error):
+            logger.warning(f"Request to Ollama timed out (attempt {attempt + 1}/{self.max_retries})")
+            fallback = "Explanation could not be generated at this time (timeout)."
+        else:
+            logger.error(f"Error generating explanation: {str(error)}")
+            fallback = f"Error: Could not generate explanation. {str(error)}"
+        return fallback if attempt == self.max_retries - 1 else None
+
     def _get_explanation(self, topic: str) -> Optional[str]:
         """Get explanation from Ollama with retries and error handling."""
+        request = self._request(topic)
         for attempt in range(self.max_retries):
             try:
-                response = self.ollama_client.chat(
-                    model="mistral",
-                    messages=[
-                        {
-                            "role": "system", 
-                            "content": """You are an expert research tutor. Provide a clear, concise explanation 
-                            of the given topic suitable for a beginner. Structure your response with an introduction, 
-                            key concepts, and a brief conclusion. Keep it under 300 words."""
-                        },
-                        {
-                            "role": "user", 
-                            "content": f"Explain the topic '{topic}' in a way that's easy to understand."
-                        }
-                    ],
-                    options={
-                        "temperature": 0.3,
-                        "max_tokens": 500
-                    }
-                )
-                return response['message']['content'].strip()
-                
-            except requests.exceptions.Timeout:
-                logger.warning(f"Request to Ollama timed out (attempt {attempt + 1}/{self.max_retries})")
-                if attempt == self.max_retries - 1:
-                    return "Explanation could not be generated at this time (timeout)."
-                time.sleep(1)  # Wait before retrying
-                
+                response = self.flight.do(llm_key(**request), lambda: self.ollama_client.chat(**request))
+                return self._explanation(request, response)
+
             except Exception as e:
-                logger.error(f"Error generating explanation: {str(e)}")
-                if attempt == self.max_retries - 1:
-                    return f"Error: Could not generate explanation. {str(e)}"
+                failure = self._attempt_failed(attempt, e)
+                if failure:
+                    return failure
                 time.sleep(1)  # Wait before retrying
-        
+
         return "Error: Failed to generate explanation after multiple attempts."
 
-    def __call__(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate an explanation for the given topic."""
+    async def _aget_explanation(self, topic: str) -> Optional[str]:
+        """Async variant of _get_explanation on the shared ollama.AsyncClient."""
+        request = self._request(topic)
+        client = get_async_client("http://localhost:11434", self.timeout)
+        for attempt in range(self.max_retries):
+            try:
+                response = await self.flight.ado(llm_key(**request), lambda: client.chat(**request))
+                return self._explanation(request, response)
+
+            except Exception as e:
+                failure = self._attempt_failed(attempt, e)
+                if failure:
+                    return failure
+                await asyncio.sleep(1)  # Wait before retrying
+
+        return "Error: Failed to generate explanation after multiple attempts."
+
+    @staticmethod
+    def _missing_topic(state: Dict[str, Any]) -> bool:
+        """Record an error explanation and return True when the state has no topic."""
         if not state.get("topic"):
             logger.error("No topic provided in state")
             state["explanation"] = "Error: No topic provided for explanation."
-            return state
-            
+            return True
         logger.info(f"Generating explanation for topic: {state['topic']}")
-        
+        return False
+
+    @staticmethod
+    def _finish(state: Dict[str, Any], explanation: Optional[str]) -> Dict[str, Any]:
+        state["explanation"] = explanation or "No explanation was generated."
+        return state
+
+    @staticmethod
+    def _failed(state: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        logger.error(f"Unexpected error in TopicExplainerNode: {str(error)}", exc_info=True)
+        state["explanation"] = "An error occurred while generating the explanation."
+        return state
+
+    def __call__(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate an explanation for the given topic."""
+        if self._missing_topic(state):
+            return state
         try:
-            explanation = self._get_explanation(state["topic"])
-            state["explanation"] = explanation or "No explanation was generated."
-            
+            return self._finish(state, self._get_explanation(state["topic"]))
         except Exception as e:
-            logger.error(f"Unexpected error in TopicExplainerNode: {str(e)}", exc_info=True)
-            state["explanation"] = "An error occurred while generating the explanation."
-        
-        return state
+            return self._failed(state, e)
+
+    async def acall(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of __call__ for app.ainvoke."""
+        if self._missing_topic(state):
+            return state
+        try:
+            return self._finish(state, await self._aget_explanation(state["topic"]))
+        except Exception as e:
+            return self._failed(state, e)
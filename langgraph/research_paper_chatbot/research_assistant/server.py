@@ -0,0 +1,380 @@
+import json
+import time
+import uuid
+import logging
+import argparse
+import threading
+import concurrent.futures
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from research_assistant.agent_graph import LLM_TASKS, NOTES_DIR, finish_run, get_app, required_models, start_run
+
+logger = logging.getLogger(__name__)
+
+# Request fields a client may set per job; everything else is fixed when the server starts
+JOB_OPTIONS = {
+    "max_papers": int,
+    "min_year": int,
+    "expand_queries": bool,
+    "draft_mode": str,
+    "depth": str,
+    "models": dict,
+    "refresh": bool,
+}
+CHOICES = {
+    "draft_mode": ("single", "sectional"),
+    "depth": ("abstract", "auto", "full"),
+}
+# Inclusive bounds for numeric options
+RANGES = {
+    "max_papers": (1, 100),
+    "min_year": (1900, 2100),
+}
+# Tasks a job may pin a model for
+MODEL_TASKS = tuple(LLM_TASKS) + ("draft_outline",)
+
+# Seconds between SSE keep-alive comments while a job is quiet (long LLM calls)
+HEARTBEAT = 15.0
+
+
+def _to_json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def _progress(node: str, update: Dict[str, Any]) -> Dict[str, Any]:
+    """Small per-node summary of what a node produced, for progress events."""
+    info: Dict[str, Any] = {"node": node}
+    for key in ("search_results", "downloaded_files", "parsed_content", "summaries"):
+        if update.get(key) is not None:
+            info[key] = len(update[key])
+    for key in ("explanation", "related_topics", "cleaning_report", "export_paths", "search_error", "error"):
+        if update.get(key):
+            info[key] = update[key]
+    return info
+
+
+class Job:
+    """One research run: its configuration, event log and final state."""
+
+    def __init__(self, topic: str, config: Dict[str, Any]):
+        self.id = uuid.uuid4().hex[:12]
+        self.topic = topic
+        self.config = config
+        self.status = "queued"
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.state: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+        self._events: List[Tuple[str, Dict[str, Any]]] = []
+        self._changed = threading.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def emit(self, event: str, data: Dict[str, Any]) -> None:
+        with self._changed:
+            self._events.append((event, data))
+            self._changed.notify_all()
+
+    def set_status(self, status: str) -> None:
+        """Change status and emit it in one step, so streams never see a finished job without its last event."""
+        with self._changed:
+            self.status = status
+            self.emit("status", {"status": status, "error": self.error})
+
+    def events(self, since: int = 0, heartbeat: float = HEARTBEAT) -> Iterator[Tuple[int, str, Dict[str, Any]]]:
+        """Yield (id, event, data) from event number since on, blocking until the job ends.
+
+        Yields (-1, "heartbeat", {}) when nothing happened for heartbeat seconds.
+        """
+        position = since
+        while True:
+            with self._changed:
+                if position >= len(self._events) and not self.done:
+                    self._changed.wait(heartbeat)
+                pending = self._events[position:]
+                finished = self.done
+            if not pending and not finished:
+                yield -1, "heartbeat", {}
+            for event, data in pending:
+                yield position, event, data
+                position += 1
+            if finished and position >= len(self._events):
+                return
+
+    def describe(self, include_result: bool = False) -> Dict[str, Any]:
+        info = {
+            "id": self.id,
+            "topic": self.topic,
+            "config": self.config,
+            "status": self.status,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "events": len(self._events),
+            "error": self.error,
+        }
+        if include_result and self.done:
+            info["result"] = {key: self.state.get(key) for key in (
+                "explanation", "related_topics", "summaries", "research_draft",
+                "cleaning_report", "export_paths", "run_id", "error"
+            )}
+        return info
+
+
+class JobManager:
+    """
+    Run research jobs on a shared pool of worker threads.
+
+    Every job uses the compiled graphs cached by get_app(), and with them the node
+    instances, model router, search cache and artifact store of this process, so only
+    the first job of a configuration pays for imports and graph compilation.
+    """
+
+    def __init__(self, max_jobs: int = 2, output_dir: str = NOTES_DIR, keep_jobs: int = 100):
+        self.output_dir = output_dir
+        self.keep_jobs = keep_jobs
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix="job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def _graph_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        # refresh only changes the initial state, so refresh and full runs share a compiled graph
+        return {key: value for key, value in dict(config, output_dir=self.output_dir).items() if key != "refresh"}
+
+    @staticmethod
+    def validate(request: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Topic and graph options from a job request; ValueError if they are unusable."""
+        topic = request.get("topic")
+        if not isinstance(topic, str) or not topic.strip():
+            raise ValueError("'topic' must be a non-empty string")
+        config = {}
+        for key, value in request.items():
+            if key == "topic":
+                continue
+            if key not in JOB_OPTIONS:
+                raise ValueError(f"Unknown option '{key}'")
+            # bool is a subclass of int; true/false is not a paper count or a year
+            if not isinstance(value, JOB_OPTIONS[key]) or (isinstance(value, bool) and JOB_OPTIONS[key] is not bool):
+                raise ValueError(f"'{key}' must be of type {JOB_OPTIONS[key].__name__}")
+            if key in CHOICES and value not in CHOICES[key]:
+                raise ValueError(f"'{key}' must be one of {', '.join(CHOICES[key])}")
+            if key in RANGES and not RANGES[key][0] <= value <= RANGES[key][1]:
+                raise ValueError(f"'{key}' must be between {RANGES[key][0]} and {RANGES[key][1]}")
+            if key == "models":
+                for task, model in value.items():
+                    if task not in MODEL_TASKS:
+                        raise ValueError(f"'models' keys must be one of {', '.join(MODEL_TASKS)}")
+                    if not isinstance(model, str) or not model.strip():
+                        raise ValueError(f"'models.{task}' must be a non-empty string")
+            config[key] = value
+        return topic.strip(), config
+
+    def warm_up(self, config: Optional[Dict[str, Any]] = None) -> None:
+        """Compile the default graph and start loading its models before the first request."""
+        from research_assistant.utils.model_manager import ModelLifecycleManager
+        config = self._graph_config(config or {})
+        get_app(**config)
+        # Models stay loaded for KEEP_ALIVE after every call, so a busy server keeps them warm
+        ModelLifecycleManager().start(required_models(**config))
+
+    def submit(self, topic: str, config: Dict[str, Any]) -> Job:
+        job = Job(topic, config)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        job.set_status("queued")
+        self._executor.submit(self._run, job)
+        logger.info(f"Queued job {job.id} for topic: {topic}")
+        return job
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond keep_jobs."""
+        finished = sorted((job for job in self._jobs.values() if job.done), key=lambda job: job.created)
+        for job in finished[:max(0, len(self._jobs) - self.keep_jobs)]:
+            del self._jobs[job.id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[Job]:
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.created)
+
+    def _run(self, job: Job) -> None:
+        job.started = time.time()
+        job.set_status("running")
+        status = "completed"
+        state: Dict[str, Any] = {}
+        try:
+            config = self._graph_config(job.config)
+            app = get_app(**config)
+            state = start_run(job.topic, refresh=job.config.get("refresh", False), **config)
+            # "updates" yields {node: returned state} as each node finishes
+            for chunk in app.stream(state, stream_mode="updates"):
+                for node, update in chunk.items():
+                    if not isinstance(update, dict):
+                        continue
+                    # Nodes return the whole state; report only what this node changed
+                    changed = {key: value for key, value in update.items() if state.get(key) != value}
+                    state.update(update)
+                    job.emit("node", _progress(node, changed))
+                    if "summaries" in changed:
+                        # Partial results: each summary as soon as the summarizer is done
+                        for summary in changed["summaries"] or []:
+                            job.emit("summary", {"title": summary.get("title"), "summary": summary.get("summary")})
+            job.state = state
+            # Exports are written in the background; the job is done once its own files are on disk
+            from research_assistant.nodes.exporter import wait_for_exports
+            wait_for_exports(state.get("export_id"))
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {str(e)}", exc_info=True)
+            job.error = str(e)
+            status = "failed"
+        finally:
+            finish_run(state, status)
+            job.finished = time.time()
+            logger.info(f"Job {job.id} {status} in {job.finished - job.started:.1f}s")
+            job.set_status(status)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ResearchRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /jobs                  start a job: {"topic": ..., "max_papers": ..., ...}
+    GET  /jobs                  list jobs
+    GET  /jobs/<id>             job status, with the result once finished
+    GET  /jobs/<id>/events      server-sent events: status, node progress, summaries
+    GET  /health                liveness check
+    """
+
+    server_version = "ResearchAssistant/1.0"
+    protocol_version = "HTTP/1.1"
+    jobs: JobManager  # set by make_server()
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def _send_json(self, status: int, body: Any) -> None:
+        data = _to_json(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status: int, message: str) -> None:
+        self._send_json(status, {"error": message})
+
+    def _route(self) -> Tuple[List[str], Optional[Job]]:
+        parts = [part for part in self.path.split("?", 1)[0].split("/") if part]
+        job = self.jobs.get(parts[1]) if len(parts) >= 2 and parts[0] == "jobs" else None
+        return parts, job
+
+    def do_GET(self) -> None:
+        parts, job = self._route()
+        if parts == ["health"]:
+            self._send_json(HTTPStatus.OK, {"status": "ok"})
+        elif parts == ["jobs"]:
+            self._send_json(HTTPStatus.OK, [j.describe() for j in self.jobs.list_jobs()])
+        elif len(parts) in (2, 3) and parts[0] == "jobs" and job is None:
+            self._error(HTTPStatus.NOT_FOUND, f"No job {parts[1]}")
+        elif len(parts) == 2 and parts[0] == "jobs":
+            self._send_json(HTTPStatus.OK, job.describe(include_result=True))
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "events":
+            self._stream_events(job)
+        else:
+            self._error(HTTPStatus.NOT_FOUND, "Not found")
+
+    def do_POST(self) -> None:
+        parts, _ = self._route()
+        if parts != ["jobs"]:
+            self._error(HTTPStatus.NOT_FOUND, "Not found")
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(request, dict):
+                raise ValueError("Request body must be a JSON object")
+            topic, config = self.jobs.validate(request)
+        except ValueError as e:
+            self._error(HTTPStatus.BAD_REQUEST, str(e))
+            return
+        job = self.jobs.submit(topic, config)
+        self.send_response(HTTPStatus.ACCEPTED)
+        data = _to_json(job.describe()).encode("utf-8")
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Location", f"/jobs/{job.id}")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream_events(self, job: Job) -> None:
+        """Send the job's events as text/event-stream; Last-Event-ID resumes after a reconnect."""
+        try:
+            since = int(self.headers.get("Last-Event-ID", -1)) + 1
+        except ValueError:
+            since = 0
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            for event_id, event, data in job.events(since):
+                if event == "heartbeat":
+                    self.wfile.write(b": keep-alive\n\n")
+                else:
+                    self.wfile.write(f"id: {event_id}\nevent: {event}\ndata: {_to_json(data)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            logger.debug(f"Event stream for job {job.id} closed by client")
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8000, jobs: Optional[JobManager] = None) -> ThreadingHTTPServer:
+    """HTTP server whose handlers share one JobManager."""
+    handler = type("Handler", (ResearchRequestHandler,), {"jobs": jobs or JobManager()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve the research assistant over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument("--max_jobs", type=int, default=2, help="Jobs that run at the same time; others queue")
+    parser.add_argument("--output_dir", default=NOTES_DIR, help="Directory to save outputs")
+    parser.add_argument("--no_warm_up", action="store_true",
+                        help="Skip compiling the graph and loading models at startup")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    jobs = JobManager(max_jobs=args.max_jobs, output_dir=args.output_dir)
+    if not args.no_warm_up:
+        jobs.warm_up()
+    server = make_server(args.host, args.port, jobs)
+    logger.info(f"Research assistant listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down")
+    finally:
+        server.server_close()
+        jobs.shutdown()
+
+
+if __name__ == "__main__":
+    main()
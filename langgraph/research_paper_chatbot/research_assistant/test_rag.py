@@ -1,7 +1,6 @@
 import os
 import sys
 import time
-import PyPDF2
 import re
 from typing import List, Dict, Tuple
 from collections import Counter
@@ -9,6 +8,9 @@ from collections import Counter
 # Add the parent directory to the path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from research_assistant.utils.pdf_backends import open_document
+from research_assistant.utils.pdf_memory import MemoryGuard, iter_page_text
+
 # Try to import the original summarizer, fallback to simple implementation
 try:
     from research_assistant.nodes.rag_summarizer import HybridSummarizerNode
@@ -251,28 +253,27 @@ def extract_all_pages_optimized(pdf_path: str) -> List[Tuple[str, int]]:
     """Extract text from all pages with optimization"""
     pages_text = []
     
+    def page_text(page_num: int) -> str:
+        try:
+            return document.page_text(page_num)
+        except Exception as e:
+            print(f"⚠️ Error processing page {page_num + 1}: {str(e)}")
+            return ""
+    
     try:
-        with open(pdf_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            total_pages = len(reader.pages)
+        # Memory-mapped, one page at a time, stopping at the per-document memory ceiling
+        with open_document(pdf_path) as document:
+            total_pages = document.num_pages
             
-            print(f"📖 Processing {total_pages} pages...")
+            print(f"📖 Processing {total_pages} pages using {document.backend}...")
             
-            for page_num in range(total_pages):
-                try:
-                    page = reader.pages[page_num]
-                    page_text = page.extract_text()
+            for page_num, text in iter_page_text(page_text, range(total_pages), MemoryGuard()):
+                if text.strip():
+                    pages_text.append((text, page_num + 1))
                     
-                    if page_text.strip():
-                        pages_text.append((page_text, page_num + 1))
-                        
-                        # Progress indicator for large documents
-                        if (page_num + 1) % 5 == 0:
-                            print(f"  ✓ Processed {page_num + 1}/{total_pages} pages")
-                            
-                except Exception as e:
-                    print(f"⚠️ Error processing page {page_num + 1}: {str(e)}")
-                    continue
+                    # Progress indicator for large documents
+                    if (page_num + 1) % 5 == 0:
+                        print(f"  ✓ Processed {page_num + 1}/{total_pages} pages")
         
         print(f"✅ Successfully extracted text from {len(pages_text)} pages")
         return pages_text
@@ -284,19 +285,18 @@ def extract_all_pages_optimized(pdf_path: str) -> List[Tuple[str, int]]:
 def get_pdf_metadata_detailed(pdf_path: str) -> Dict[str, str]:
     """Extract detailed metadata"""
     try:
-        with open(pdf_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            metadata = reader.metadata or {}
+        with open_document(pdf_path) as document:
+            metadata = document.metadata()
             
             return {
-                'title': metadata.get('/Title', 'Unknown'),
-                'author': metadata.get('/Author', 'Unknown'),
-                'creator': metadata.get('/Creator', 'Unknown'),
-                'producer': metadata.get('/Producer', 'Unknown'),
-                'pages': str(len(reader.pages)),
+                'title': metadata.get('title', 'Unknown'),
+                'author': metadata.get('author', 'Unknown'),
+                'creator': metadata.get('creator', 'Unknown'),
+                'producer': metadata.get('producer', 'Unknown'),
+                'pages': str(document.num_pages),
                 'size': f"{os.path.getsize(pdf_path) / 1024:.1f} KB",
-                'created': str(metadata.get('/CreationDate', 'Unknown')),
-                'modified': str(metadata.get('/ModDate', 'Unknown'))
+                'created': metadata.get('creationdate', 'Unknown'),
+                'modified': metadata.get('moddate', 'Unknown')
             }
     except Exception as e:
         return {'error': str(e)}
@@ -0,0 +1,64 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# "abstract": never fetch PDFs; "full": always fetch; "auto": fetch only when the abstract is thin
+DEPTHS = ("abstract", "auto", "full")
+
+ABSTRACT = "abstract"
+FULL = "full"
+
+
+def abstract_text(paper: Dict[str, Any]) -> str:
+    """Best metadata-only text for a paper: its abstract, else the search snippet."""
+    return (paper.get("abstract") or paper.get("snippet") or "").strip()
+
+
+class AcquisitionPolicy:
+    """
+    Decide per paper whether the abstract is enough or the full PDF must be fetched.
+
+    The decision is stored on the paper as paper["acquisition"] ("abstract" or "full")
+    by the first node that plans it, so the downloader, processor and parser agree.
+    """
+
+    def __init__(self, depth: str = "auto", min_abstract_words: int = 20, max_full_text: Optional[int] = None):
+        if depth not in DEPTHS:
+            raise ValueError(f"Unknown acquisition depth: {depth}")
+        self.depth = depth
+        # Scholar snippets are cut at about 24-35 words, so a full-length snippet must pass
+        self.min_abstract_words = min_abstract_words
+        # In "auto" mode, escalate at most this many papers (in ranked order) to full text
+        self.max_full_text = max_full_text
+
+    def needs_full_text(self, paper: Dict[str, Any]) -> bool:
+        """True if the paper should be escalated to a full-PDF fetch and parse."""
+        if self.depth == ABSTRACT:
+            return False
+        if not paper.get("pdf_url") and not paper.get("link"):
+            return False
+        if self.depth == FULL:
+            return True
+        return len(abstract_text(paper).split()) < self.min_abstract_words
+
+    def plan(self, papers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Annotate papers that have no decision yet; earlier decisions are kept."""
+        escalated = sum(1 for p in papers if isinstance(p, dict) and p.get("acquisition") == FULL)
+        for paper in papers:
+            if not isinstance(paper, dict) or paper.get("acquisition"):
+                continue
+            full = self.needs_full_text(paper)
+            if full and self.depth == "auto" and self.max_full_text is not None and escalated >= self.max_full_text:
+                full = False
+            paper["acquisition"] = FULL if full else ABSTRACT
+            escalated += full
+
+        planned = [p for p in papers if isinstance(p, dict)]
+        logger.info(f"Acquisition ({self.depth}): {escalated} of {len(planned)} papers need full text")
+        return papers
+
+    @staticmethod
+    def is_full(paper: Dict[str, Any]) -> bool:
+        """Whether a planned paper was escalated; unplanned papers are treated as full."""
+        return paper.get("acquisition", FULL) == FULL
@@ -0,0 +1,117 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Text shorter than this stays inline in the state; longer text is stored as a blob
+INLINE_LIMIT = 2048
+
+
+class ArtifactStore:
+    """
+    Content-addressed blob store on disk.
+
+    Paper text is written once and referenced from the graph state by its sha256
+    ("ref"), so LangGraph only copies small handles between steps and each consumer
+    loads the text it needs when it needs it.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or os.getenv("RESEARCH_ARTIFACT_DIR", "artifacts"))
+
+    def _path(self, ref: str, suffix: str) -> Path:
+        return self.root / ref[:2] / f"{ref}{suffix}"
+
+    def _put(self, data: bytes, suffix: str) -> str:
+        ref = hashlib.sha256(data).hexdigest()
+        path = self._path(ref, suffix)
+        if path.exists():
+            return ref
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f"{suffix}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return ref
+
+    def put_text(self, text: str) -> str:
+        """Store text and return its reference."""
+        return self._put(text.encode("utf-8"), ".txt")
+
+    def get_text(self, ref: str) -> str:
+        """Load text by reference."""
+        with open(self._path(ref, ".txt"), "r", encoding="utf-8") as f:
+            return f.read()
+
+    def put_json(self, obj: Any) -> str:
+        """Store a JSON-serializable object and return its reference."""
+        return self._put(json.dumps(obj, sort_keys=True, ensure_ascii=False).encode("utf-8"), ".json")
+
+    def get_json(self, ref: str) -> Any:
+        """Load a JSON object by reference."""
+        with open(self._path(ref, ".json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def exists(self, ref: str, kind: str = "text") -> bool:
+        return self._path(ref, ".txt" if kind == "text" else ".json").exists()
+
+
+_default_store: Optional[ArtifactStore] = None
+_default_lock = threading.Lock()
+
+
+def get_store() -> ArtifactStore:
+    """Return the process-wide artifact store."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = ArtifactStore()
+        return _default_store
+
+
+def make_text_handle(text: str, field: str = "content", store: Optional[ArtifactStore] = None) -> Dict[str, Any]:
+    """
+    Return the state fields for a piece of text: the text itself when it is short,
+    otherwise a "<field>_ref" into the store. "<field>_chars" is always set.
+    """
+    if len(text) <= INLINE_LIMIT:
+        return {field: text, f"{field}_chars": len(text)}
+    ref = (store or get_store()).put_text(text)
+    return {f"{field}_ref": ref, f"{field}_chars": len(text)}
+
+
+def load_text(record: Dict[str, Any], field: str = "content", store: Optional[ArtifactStore] = None) -> str:
+    """Return a record's text whether it is inline or stored by reference."""
+    value = record.get(field)
+    if isinstance(value, str):
+        return value
+    ref = record.get(f"{field}_ref")
+    if not ref:
+        return ""
+    try:
+        return (store or get_store()).get_text(ref)
+    except OSError as e:
+        logger.error(f"Missing artifact {ref} for {record.get('title', 'Untitled')}: {str(e)}")
+        return ""
+
+
+def load_sections(record: Dict[str, Any], store: Optional[ArtifactStore] = None) -> Dict[str, str]:
+    """Return a paper's section texts from the record or its processed_content handle."""
+    if isinstance(record.get("sections"), dict):
+        return record["sections"]
+    processed = record.get("processed_content") or {}
+    if isinstance(processed.get("sections"), dict):
+        return processed["sections"]
+    ref = record.get("sections_ref") or processed.get("sections_ref")
+    if not ref:
+        return {}
+    try:
+        return (store or get_store()).get_json(ref)
+    except OSError as e:
+        logger.error(f"Missing sections artifact {ref}: {str(e)}")
+        return {}
@@ -0,0 +1,262 @@
+import os
+import re
+import json
+import time
+import uuid
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from research_assistant.utils.dedup import normalize_title
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    paper_id TEXT PRIMARY KEY,
+    title TEXT,
+    norm_title TEXT,
+    year INTEGER,
+    link TEXT,
+    pdf_path TEXT,
+    pdf_sha256 TEXT,
+    first_seen REAL,
+    last_seen REAL
+);
+CREATE INDEX IF NOT EXISTS papers_norm_title ON papers(norm_title);
+CREATE TABLE IF NOT EXISTS paper_urls (
+    url TEXT PRIMARY KEY,
+    paper_id TEXT NOT NULL REFERENCES papers(paper_id)
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    paper_id TEXT NOT NULL REFERENCES papers(paper_id),
+    kind TEXT NOT NULL,
+    config TEXT NOT NULL,
+    ref TEXT NOT NULL,
+    model TEXT,
+    created REAL,
+    PRIMARY KEY (paper_id, kind, config)
+);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    topic TEXT,
+    norm_topic TEXT,
+    config TEXT,
+    started REAL,
+    finished REAL,
+    status TEXT,
+    result_ref TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_topic ON runs(norm_topic, started);
+CREATE TABLE IF NOT EXISTS run_nodes (
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    node TEXT NOT NULL,
+    seconds REAL,
+    outcome TEXT,
+    finished REAL
+);
+CREATE TABLE IF NOT EXISTS run_papers (
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    paper_id TEXT NOT NULL REFERENCES papers(paper_id),
+    PRIMARY KEY (run_id, paper_id)
+);
+"""
+
+_DOI = re.compile(r"\b(10\.\d{4,9}/[^\s?#]+)", re.IGNORECASE)
+_ARXIV = re.compile(r"arxiv\.org/(?:abs|pdf)/([^\s?#/]+?)(?:v\d+)?(?:\.pdf)?$", re.IGNORECASE)
+
+
+def paper_id(paper: Dict[str, Any]) -> Optional[str]:
+    """Canonical ID: DOI or arXiv ID from the paper's URLs, else a hash of the normalized title."""
+    for url in (paper.get("link"), paper.get("pdf_url")):
+        if not url:
+            continue
+        match = _ARXIV.search(url)
+        if match:
+            return f"arxiv:{match.group(1).lower()}"
+        match = _DOI.search(url)
+        if match:
+            return f"doi:{match.group(1).lower().rstrip('.').removesuffix('.pdf')}"
+    title = normalize_title(paper.get("title", ""))
+    if not title or title == "untitled":
+        return None
+    return "title:" + hashlib.sha1(title.encode("utf-8")).hexdigest()[:16]
+
+
+def config_version(**config: Any) -> str:
+    """Short stable hash of the settings an artifact was produced with."""
+    payload = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Catalog:
+    """
+    SQLite record of every paper seen, what was produced from it, and every run.
+
+    papers: canonical ID, title, links, the downloaded PDF and its hash.
+    artifacts: artifact-store refs (parsed text, summaries, ...) per paper, kind and
+    config version, so a changed model or page budget never reuses a stale artifact.
+    runs / run_nodes / run_papers: timing and outcome of each run and node, and which
+    papers a run covered.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or os.getenv("RESEARCH_CATALOG", ".catalog.db"))
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            # Catalogs created before runs stored their outputs
+            if "result_ref" not in {row[1] for row in conn.execute("PRAGMA table_info(runs)")}:
+                conn.execute("ALTER TABLE runs ADD COLUMN result_ref TEXT")
+            self._conn = conn
+        return self._conn
+
+    def _execute(self, sql: str, params: Iterable[Any] = ()) -> List[tuple]:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                return conn.execute(sql, tuple(params)).fetchall()
+
+    # Papers
+
+    def register(self, paper: Dict[str, Any]) -> Optional[str]:
+        """Insert or refresh a paper and its URLs; returns its canonical ID (None if it has no identity)."""
+        pid = paper.get("paper_id") or paper_id(paper)
+        if not pid:
+            return None
+        now = time.time()
+        title = paper.get("title", "")
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT INTO papers (paper_id, title, norm_title, year, link, first_seen, last_seen)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT(paper_id) DO UPDATE SET last_seen = excluded.last_seen,"
+                    " link = COALESCE(papers.link, excluded.link), year = COALESCE(papers.year, excluded.year)",
+                    (pid, title, normalize_title(title), paper.get("year"), paper.get("link"), now, now)
+                )
+                for url in {paper.get("link"), paper.get("pdf_url")} - {None, ""}:
+                    conn.execute("INSERT OR IGNORE INTO paper_urls (url, paper_id) VALUES (?, ?)", (url, pid))
+        paper["paper_id"] = pid
+        return pid
+
+    def lookup(self, url: Optional[str] = None, title: Optional[str] = None) -> Optional[str]:
+        """Paper ID for a URL or title seen before."""
+        if url:
+            rows = self._execute("SELECT paper_id FROM paper_urls WHERE url = ?", (url,))
+            if rows:
+                return rows[0][0]
+        if title:
+            rows = self._execute("SELECT paper_id FROM papers WHERE norm_title = ?", (normalize_title(title),))
+            if rows:
+                return rows[0][0]
+        return None
+
+    def record_download(self, pid: str, path: str) -> None:
+        try:
+            sha = file_sha256(path)
+        except OSError as e:
+            logger.warning(f"Could not hash {path}: {str(e)}")
+            sha = None
+        self._execute("UPDATE papers SET pdf_path = ?, pdf_sha256 = ? WHERE paper_id = ?", (path, sha, pid))
+
+    def find_download(self, pid: str) -> Optional[str]:
+        """Path of this paper's downloaded PDF if the file is still there."""
+        rows = self._execute("SELECT pdf_path FROM papers WHERE paper_id = ?", (pid,))
+        path = rows[0][0] if rows else None
+        return path if path and os.path.exists(path) else None
+
+    # Artifacts
+
+    def put_artifact(self, pid: str, kind: str, config: str, ref: str, model: Optional[str] = None) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO artifacts (paper_id, kind, config, ref, model, created) VALUES (?, ?, ?, ?, ?, ?)",
+            (pid, kind, config, ref, model, time.time())
+        )
+
+    def get_artifact(self, pid: str, kind: str, config: str) -> Optional[str]:
+        rows = self._execute("SELECT ref FROM artifacts WHERE paper_id = ? AND kind = ? AND config = ?",
+                             (pid, kind, config))
+        return rows[0][0] if rows else None
+
+    # Runs
+
+    def start_run(self, topic: str, config: Optional[Dict[str, Any]] = None) -> str:
+        run_id = uuid.uuid4().hex[:16]
+        self._execute(
+            "INSERT INTO runs (run_id, topic, norm_topic, config, started, status) VALUES (?, ?, ?, ?, ?, 'running')",
+            (run_id, topic, " ".join(topic.lower().split()), json.dumps(config or {}, sort_keys=True, default=str),
+             time.time())
+        )
+        return run_id
+
+    def record_node(self, run_id: str, node: str, seconds: float, outcome: str = "ok") -> None:
+        self._execute("INSERT INTO run_nodes (run_id, node, seconds, outcome, finished) VALUES (?, ?, ?, ?, ?)",
+                      (run_id, node, seconds, outcome, time.time()))
+
+    def add_run_papers(self, run_id: str, pids: Iterable[str]) -> None:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany("INSERT OR IGNORE INTO run_papers (run_id, paper_id) VALUES (?, ?)",
+                                 [(run_id, pid) for pid in pids if pid])
+
+    def finish_run(self, run_id: str, status: str = "completed", result_ref: Optional[str] = None) -> None:
+        """Close a run; result_ref points at its outputs (explanation, summaries) for later refreshes."""
+        self._execute("UPDATE runs SET finished = ?, status = ?, result_ref = ? WHERE run_id = ?",
+                      (time.time(), status, result_ref, run_id))
+
+    def last_run(self, topic: str) -> Optional[Dict[str, Any]]:
+        """Latest completed run of a topic that stored its outputs, or None."""
+        rows = self._execute(
+            "SELECT run_id, started, result_ref FROM runs WHERE norm_topic = ? AND status = 'completed'"
+            " AND result_ref IS NOT NULL ORDER BY started DESC LIMIT 1",
+            (" ".join(topic.lower().split()),)
+        )
+        if not rows:
+            return None
+        run_id, started, result_ref = rows[0]
+        return {"run_id": run_id, "started": started, "result_ref": result_ref}
+
+    def run_paper_ids(self, run_id: str) -> List[str]:
+        return [row[0] for row in self._execute("SELECT paper_id FROM run_papers WHERE run_id = ?", (run_id,))]
+
+    def run_timings(self, run_id: str) -> Dict[str, float]:
+        return dict(self._execute("SELECT node, SUM(seconds) FROM run_nodes WHERE run_id = ? GROUP BY node", (run_id,)))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_default_catalog: Optional[Catalog] = None
+_default_lock = threading.Lock()
+
+
+def get_catalog() -> Catalog:
+    """Return the process-wide catalog."""
+    global _default_catalog
+    with _default_lock:
+        if _default_catalog is None:
+            _default_catalog = Catalog()
+        return _default_catalog
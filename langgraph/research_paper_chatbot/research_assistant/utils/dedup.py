@@ -0,0 +1,240 @@
+import re
+import random
+import hashlib
+import logging
+from typing import Dict, List, Any, NamedTuple, Optional, Callable, Iterable, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Mersenne prime used for the universal hash family behind MinHash permutations
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Scholar prefixes titles with markers like "[PDF]" or "[HTML]"
+_TITLE_TAGS = re.compile(r"^\s*(\[[a-z]+\]\s*)+", re.IGNORECASE)
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_NUMBER = re.compile(r"\d+")
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase a title and strip tags, punctuation and repeated whitespace."""
+    if not title:
+        return ""
+    title = _TITLE_TAGS.sub("", title.lower())
+    return _NON_ALNUM.sub(" ", title).strip()
+
+
+class TitleKey(NamedTuple):
+    """What a search result says about identity when there is no text to compare."""
+    title: str  # normalized
+    numbers: Tuple[str, ...]  # "part 1" vs "part 2", "gpt 3" vs "gpt 4"
+    year: Optional[int]
+    first_author: str
+
+
+def first_author(record: Dict[str, Any]) -> str:
+    """Lowercased first author from Scholar's "A Smith, B Jones - Venue, 2020 - host" summary."""
+    info = record.get("publication_info") or ""
+    if isinstance(info, dict):
+        info = info.get("summary") or ""
+    return info.split(" - ")[0].split(",")[0].strip().lower()
+
+
+def title_key(record: Dict[str, Any]) -> TitleKey:
+    title = normalize_title(record.get("title", ""))
+    return TitleKey(title, tuple(_NUMBER.findall(title)), record.get("year"), first_author(record))
+
+
+def title_shingles(title: str, k: int = 3) -> Set[str]:
+    """Character k-grams of the normalized title."""
+    normalized = normalize_title(title).replace(" ", "")
+    if len(normalized) <= k:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + k] for i in range(len(normalized) - k + 1)}
+
+
+def text_shingles(text: str, k: int = 5, max_words: int = 3000) -> Set[str]:
+    """Word k-grams over the first max_words words of the text."""
+    words = _NON_ALNUM.sub(" ", (text or "").lower()).split()[:max_words]
+    if len(words) <= k:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    """Exact Jaccard similarity of two shingle sets."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def content_hash(text: str) -> str:
+    """Hash of whitespace-normalized text, used to catch byte-identical copies."""
+    return hashlib.sha1(" ".join((text or "").split()).encode("utf-8")).hexdigest()
+
+
+class MinHasher:
+    """MinHash signatures over string shingles."""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._coeffs = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+    def signature(self, shingles: Iterable[str]) -> List[int]:
+        hashes = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+                  for s in shingles]
+        if not hashes:
+            return [_MAX_HASH] * self.num_perm
+        return [min(((a * h + b) % _PRIME) & _MAX_HASH for h in hashes) for a, b in self._coeffs]
+
+
+class LSHIndex:
+    """Banded locality-sensitive hashing over MinHash signatures."""
+
+    def __init__(self, bands: int = 16, rows: int = 4):
+        self.bands = bands
+        self.rows = rows
+        self._buckets: Dict[tuple, List[int]] = {}
+
+    def add(self, item_id: int, signature: List[int]) -> Set[int]:
+        """Index a signature and return the ids that share at least one band with it."""
+        candidates = set()
+        for band in range(self.bands):
+            key = (band, tuple(signature[band * self.rows:(band + 1) * self.rows]))
+            bucket = self._buckets.setdefault(key, [])
+            candidates.update(bucket)
+            bucket.append(item_id)
+        return candidates
+
+
+class NearDuplicateDetector:
+    """Cluster paper records that are the same work under different titles or URLs."""
+
+    def __init__(self, title_threshold: float = 0.8, text_threshold: float = 0.7,
+                 text_veto: float = 0.3, min_text_shingles: int = 200,
+                 num_perm: int = 64, bands: int = 16):
+        self.title_threshold = title_threshold
+        self.text_threshold = text_threshold
+        # Matching titles are overruled only when both full texts are long and clearly differ
+        self.text_veto = text_veto
+        self.min_text_shingles = min_text_shingles
+        self.hasher = MinHasher(num_perm=num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+
+    def find_clusters(self, records: List[Dict[str, Any]],
+                      text_fn: Optional[Callable[[Dict[str, Any]], str]] = None) -> List[List[int]]:
+        """
+        Return clusters of record indices, each sorted, in order of first appearance.
+
+        Candidates come from LSH over title shingles (and text shingles when text_fn is
+        given); each candidate pair is then confirmed with exact Jaccard similarity.
+        Pairs without text on both sides are confirmed strictly (see _same_record).
+        """
+        parent = list(range(len(records)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def union(i: int, j: int) -> None:
+            ri, rj = find(i), find(j)
+            if ri != rj:
+                parent[max(ri, rj)] = min(ri, rj)
+
+        titles = [title_shingles(r.get("title", "")) for r in records]
+        keys = [title_key(r) for r in records]
+        texts: List[Set[str]] = []
+        digests: List[Optional[str]] = []
+        for record in records:
+            # Load one text at a time and keep only its bounded shingle set
+            text = (text_fn(record) or "") if text_fn else ""
+            texts.append(text_shingles(text) if text else set())
+            digests.append(content_hash(text) if text else None)
+        hashes: Dict[str, int] = {}
+
+        title_index = LSHIndex(self.bands, self.rows)
+        text_index = LSHIndex(self.bands, self.rows)
+        for i in range(len(records)):
+            candidates = set()
+            if titles[i]:
+                candidates |= title_index.add(i, self.hasher.signature(titles[i]))
+            if texts[i]:
+                candidates |= text_index.add(i, self.hasher.signature(texts[i]))
+                digest = digests[i]
+                if digest in hashes:
+                    candidates.add(hashes[digest])
+                hashes.setdefault(digest, i)
+
+            for j in candidates:
+                if find(i) != find(j) and self._is_duplicate(titles[i], titles[j], texts[i], texts[j],
+                                                                 keys[i], keys[j]):
+                    union(i, j)
+
+        clusters: Dict[int, List[int]] = {}
+        for i in range(len(records)):
+            clusters.setdefault(find(i), []).append(i)
+        return sorted(clusters.values(), key=lambda c: c[0])
+
+    def _is_duplicate(self, title_a: Set[str], title_b: Set[str],
+                      text_a: Set[str], text_b: Set[str], key_a: TitleKey, key_b: TitleKey) -> bool:
+        text_similarity = jaccard(text_a, text_b) if text_a and text_b else None
+        if text_similarity is None:
+            return self._same_record(title_a, title_b, key_a, key_b)
+        if text_similarity >= self.text_threshold:
+            return True
+        if jaccard(title_a, title_b) < self.title_threshold:
+            return False
+        if min(len(text_a), len(text_b)) >= self.min_text_shingles:
+            return text_similarity >= self.text_veto
+        return True
+
+    def _same_record(self, title_a: Set[str], title_b: Set[str], key_a: TitleKey, key_b: TitleKey) -> bool:
+        """
+        Title-only evidence: a similar title alone is not enough ("...: part 1" and
+        "...: part 2" share almost every trigram). Titles must match exactly, or be
+        similar with the same year and first author; differing numbers never match.
+        """
+        if key_a.numbers != key_b.numbers:
+            return False
+        if key_a.title and key_a.title == key_b.title:
+            return True
+        return (jaccard(title_a, title_b) >= self.title_threshold
+                and key_a.year is not None and key_a.year == key_b.year
+                and bool(key_a.first_author) and key_a.first_author == key_b.first_author)
+
+
+def merge_duplicates(records: List[Dict[str, Any]], clusters: List[List[int]],
+                     score_fn: Optional[Callable[[Dict[str, Any]], float]] = None) -> List[Dict[str, Any]]:
+    """
+    Collapse each cluster into one canonical record.
+
+    The canonical record is the highest scoring one (ties go to the earliest); the
+    others are kept under "duplicates" and their links under "alternate_links".
+    """
+    merged = []
+    for cluster in clusters:
+        members = [records[i] for i in cluster]
+        if score_fn:
+            best = max(range(len(members)), key=lambda k: (score_fn(members[k]), -k))
+        else:
+            best = 0
+        canonical = dict(members[best])
+        others = [m for k, m in enumerate(members) if k != best]
+        if others:
+            links = list(canonical.get("alternate_links", []))
+            for other in others:
+                for link in [other.get("link"), other.get("source"), *other.get("pdf_links", []),
+                             *other.get("alternate_links", [])]:
+                    if link and link != canonical.get("link") and link not in links:
+                        links.append(link)
+            canonical["alternate_links"] = links
+            canonical["duplicates"] = canonical.get("duplicates", []) + [
+                {"title": o.get("title"), "link": o.get("link") or o.get("source")} for o in others
+            ]
+            logger.info(f"Collapsed {len(others)} duplicate(s) into: {canonical.get('title', 'Untitled')}")
+        merged.append(canonical)
+    return merged
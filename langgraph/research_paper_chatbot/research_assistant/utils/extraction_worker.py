@@ -0,0 +1,259 @@
+import os
+import time
+import logging
+import threading
+import contextlib
+import multiprocessing
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from research_assistant.utils.pdf_backends import PdfDocument
+from research_assistant.utils.pdf_memory import (
+    DEFAULT_DOCUMENT_MEMORY, ExtractionLimitExceeded, MemoryCeilingExceeded, current_rss
+)
+
+logger = logging.getLogger(__name__)
+
+# How often a waiting parent checks the worker's memory and liveness
+_POLL_SECONDS = 0.1
+
+
+class ExtractionTimeout(ExtractionLimitExceeded):
+    """A page or the whole document took longer than its limit."""
+
+
+class WorkerDied(ExtractionLimitExceeded):
+    """The worker exited mid-request (segfault, OOM kill, ...)."""
+
+
+class ExtractionLimits(NamedTuple):
+    """Limits on one document; None disables a limit."""
+    document_seconds: Optional[float] = float(os.getenv("RESEARCH_PDF_DOCUMENT_SECONDS", "120"))
+    page_seconds: Optional[float] = float(os.getenv("RESEARCH_PDF_PAGE_SECONDS", "20"))
+    memory_bytes: Optional[int] = DEFAULT_DOCUMENT_MEMORY
+
+
+def _worker_main(conn) -> None:
+    """Worker loop: open one document at a time and return page text on request."""
+    from research_assistant.utils.pdf_backends import open_document
+    stack = contextlib.ExitStack()
+    document: Optional[PdfDocument] = None
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        op = request[0]
+        try:
+            if op == "open":
+                stack.close()
+                document = stack.enter_context(open_document(request[1], request[2]))
+                conn.send(("ok", (document.backend, document.num_pages, document.outline(), document.metadata())))
+            elif op == "page":
+                conn.send(("ok", document.page_text(request[1]) or ""))
+            elif op == "close":
+                stack.close()
+                document = None
+                conn.send(("ok", None))
+            elif op == "exit":
+                break
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {str(e)}"))
+    stack.close()
+
+
+class _Worker:
+    """One extraction process and the parent's end of its pipe."""
+
+    def __init__(self, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child,), daemon=True, name="pdf-extraction")
+        self.process.start()
+        child.close()
+        self.documents = 0
+        self.alive = True
+
+    def rss(self) -> Optional[int]:
+        return current_rss(self.process.pid)
+
+    def request(self, message: Tuple, timeout: Optional[float], memory_limit: Optional[int],
+                baseline: Optional[int]) -> Any:
+        """Send one request and wait for its reply, enforcing the time and memory limits."""
+        try:
+            self.conn.send(message)
+        except OSError as e:
+            raise WorkerDied(f"worker is gone: {str(e)}")
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            wait = _POLL_SECONDS if deadline is None else min(_POLL_SECONDS, deadline - time.monotonic())
+            if wait <= 0:
+                raise ExtractionTimeout(f"{message[0]} took longer than {timeout:g}s")
+            if self.conn.poll(wait):
+                try:
+                    status, value = self.conn.recv()
+                except (EOFError, OSError):
+                    raise WorkerDied(f"worker exited with code {self.process.exitcode}")
+                if status == "error":
+                    raise RuntimeError(value)
+                return value
+            if not self.process.is_alive():
+                raise WorkerDied(f"worker exited with code {self.process.exitcode}")
+            if memory_limit and baseline is not None:
+                rss = self.rss()
+                if rss is not None and rss - baseline > memory_limit:
+                    raise MemoryCeilingExceeded(f"worker used {(rss - baseline) >> 20} MB, "
+                                                f"limit {memory_limit >> 20} MB")
+
+    def kill(self) -> None:
+        self.alive = False
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+    def stop(self) -> None:
+        """Ask an idle worker to exit, killing it if it does not."""
+        try:
+            self.conn.send(("exit",))
+            self.process.join(timeout=2)
+        except (OSError, BrokenPipeError):
+            pass
+        self.kill()
+
+
+class IsolatedDocument(PdfDocument):
+    """A PDF open in a worker process; every call is bounded by the document's limits."""
+
+    def __init__(self, worker: _Worker, path: str, backend: str, limits: ExtractionLimits, on_limit):
+        self.worker = worker
+        self.path = path
+        self.limits = limits
+        self.on_limit = on_limit
+        self.started = time.monotonic()
+        self.baseline = worker.rss()
+        self.failed: Optional[ExtractionLimitExceeded] = None
+        self.backend, self._num_pages, self._outline, self._metadata = self._request(("open", path, backend))
+
+    def _timeout(self) -> Optional[float]:
+        """The page limit, cut short by whatever is left of the document limit."""
+        limits = [self.limits.page_seconds]
+        if self.limits.document_seconds is not None:
+            limits.append(self.limits.document_seconds - (time.monotonic() - self.started))
+        limits = [limit for limit in limits if limit is not None]
+        return max(min(limits), 0.0) if limits else None
+
+    def _request(self, message: Tuple) -> Any:
+        if self.failed is not None:
+            raise self.failed
+        try:
+            return self.worker.request(message, self._timeout(), self.limits.memory_bytes, self.baseline)
+        except ExtractionLimitExceeded as e:
+            # The worker may be stuck inside the library; it cannot be trusted with another request
+            self.failed = e
+            logger.warning(f"Killing extraction worker for {os.path.basename(self.path)}: {str(e)}")
+            self.on_limit(self.worker)
+            raise
+
+    @property
+    def num_pages(self) -> int:
+        return self._num_pages
+
+    def page_text(self, page: int) -> str:
+        return self._request(("page", page))
+
+    def outline(self) -> List[Tuple[str, int]]:
+        return [tuple(entry) for entry in self._outline]
+
+    def metadata(self) -> Dict[str, str]:
+        return self._metadata
+
+
+class ExtractionPool:
+    """
+    Supervised worker processes for PDF extraction.
+
+    Each document is extracted in a worker, so a PDF that makes the library spin or
+    balloon only costs that worker: the parent waits with the page and document time
+    limits, watches the worker's RSS, and kills it when a limit is exceeded. The
+    caller gets ExtractionLimitExceeded and keeps the pages already returned; a fresh
+    worker replaces the killed one. Workers are also recycled after max_documents to
+    bound slow leaks in the extraction libraries.
+    """
+
+    def __init__(self, size: Optional[int] = None, limits: Optional[ExtractionLimits] = None,
+                 max_documents: int = 50):
+        self.size = size or int(os.getenv("RESEARCH_PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self.limits = limits or ExtractionLimits()
+        self.max_documents = max_documents
+        # spawn: the parser runs in threads, and forking a threaded process is unsafe
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: List[_Worker] = []
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self.killed = 0
+
+    def _acquire(self) -> _Worker:
+        self._slots.acquire()
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.process.is_alive():
+                    return worker
+                worker.kill()
+        try:
+            return _Worker(self._context)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, worker: _Worker) -> None:
+        try:
+            if worker.alive and worker.documents >= self.max_documents:
+                worker.stop()
+            if worker.alive:
+                with self._lock:
+                    self._idle.append(worker)
+        finally:
+            self._slots.release()
+
+    def _discard(self, worker: _Worker) -> None:
+        self.killed += 1
+        worker.kill()
+
+    @contextlib.contextmanager
+    def open(self, path: str, backend: str = "auto", limits: Optional[ExtractionLimits] = None) -> Iterator[PdfDocument]:
+        """Open a PDF in a worker; the worker returns to the pool (or is replaced) on exit."""
+        limits = limits or self.limits
+        worker = self._acquire()
+        try:
+            worker.documents += 1
+            document = IsolatedDocument(worker, path, backend, limits, self._discard)
+            try:
+                yield document
+            finally:
+                if worker.alive:
+                    try:
+                        worker.request(("close",), limits.page_seconds, None, None)
+                    except Exception as e:
+                        logger.warning(f"Extraction worker did not close {path} cleanly: {str(e)}")
+                        self._discard(worker)
+        finally:
+            self._release(worker)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
+
+
+_default_pool: Optional[ExtractionPool] = None
+_default_lock = threading.Lock()
+
+
+def get_pool() -> ExtractionPool:
+    """Return the process-wide extraction pool."""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = ExtractionPool()
+        return _default_pool
@@ -0,0 +1,77 @@
+"""
+Import-time regression check.
+
+Runs ``python -X importtime`` on a module in a fresh interpreter and fails if it pulls
+in any heavy dependency or exceeds a cumulative time budget:
+
+    python -m research_assistant.utils.import_time
+    python -m research_assistant.utils.import_time --module research_assistant.agent_graph --budget-ms 150
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+# Dependencies that must only be imported when the graph is built or a node runs
+HEAVY_MODULES = ["langgraph", "langchain", "langchain_core", "langchain_community",
+                 "ollama", "serpapi", "PyPDF2", "pypdf", "pdfminer", "pypdfium2", "dotenv",
+                 "requests", "httpx"]
+
+DEFAULT_MODULES = ["research_assistant.agent_graph"]
+
+
+def measure_import(module: str) -> Tuple[Dict[str, int], int]:
+    """Import a module in a fresh interpreter; return ({module: cumulative_us}, total_us)."""
+    package_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [package_root, os.environ.get("PYTHONPATH")])))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, cwd=package_root
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+            timings[name] = int(cumulative)
+        except ValueError:
+            continue  # header line
+    return timings, timings.get(module, 0)
+
+
+def check(modules: List[str], budget_ms: float, heavy: List[str] = HEAVY_MODULES) -> List[str]:
+    """Return a list of regression messages; empty when every module is within budget."""
+    problems = []
+    for module in modules:
+        timings, total_us = measure_import(module)
+        loaded = sorted({name.split(".")[0] for name in timings} & set(heavy))
+        if loaded:
+            problems.append(f"{module} imports heavy dependencies at import time: {', '.join(loaded)}")
+        if total_us / 1000 > budget_ms:
+            slowest = sorted(timings.items(), key=lambda item: item[1], reverse=True)[1:6]
+            details = ", ".join(f"{name} {us / 1000:.1f}ms" for name, us in slowest)
+            problems.append(f"{module} took {total_us / 1000:.1f}ms to import (budget {budget_ms}ms); slowest: {details}")
+        print(f"{module}: {total_us / 1000:.1f}ms")
+    return problems
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Fail if importing the package gets slow or heavy.")
+    parser.add_argument("--module", action="append", dest="modules", help="Module to check (repeatable)")
+    parser.add_argument("--budget-ms", type=float, default=150.0, help="Cumulative import time budget per module")
+    args = parser.parse_args(argv)
+
+    problems = check(args.modules or DEFAULT_MODULES, args.budget_ms)
+    for problem in problems:
+        print(f"REGRESSION: {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,417 @@
+import os
+import re
+import time
+import asyncio
+import logging
+import argparse
+import threading
+import concurrent.futures
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from research_assistant.utils.pdf_memory import DEFAULT_MAX_DOWNLOAD, DownloadTooLarge
+
+logger = logging.getLogger(__name__)
+
+_ARXIV_ID = re.compile(r"arxiv\.org/(?:abs|pdf)/([^\s?#]+?)(?:\.pdf)?$", re.IGNORECASE)
+_CHUNK_SIZE = 1 << 16
+# Size used to turn a host's throughput into an expected download time
+_TYPICAL_PDF_BYTES = 2 << 20
+
+
+class NotAPdf(Exception):
+    """A mirror answered with something other than a PDF (usually an HTML landing page)."""
+
+
+class _Cancelled(Exception):
+    """A losing attempt noticed it was cancelled."""
+
+
+def _remove(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+def is_pdf_url(url: str) -> bool:
+    """A URL that serves a PDF directly: a .pdf path, or an arXiv /pdf/ link."""
+    parsed = urlparse(url)
+    return parsed.path.lower().endswith(".pdf") or (
+        parsed.netloc.lower().endswith("arxiv.org") and parsed.path.startswith("/pdf/"))
+
+
+def candidate_urls(paper: Dict[str, Any]) -> List[str]:
+    """
+    PDF URLs that may serve this paper, de-duplicated, in source order.
+
+    Uses the direct PDF link, the main link, PDF resources from the search result,
+    links of duplicates merged into this paper, and arXiv's export mirror. Links the
+    source labels as PDF are kept whatever their path looks like (the fetcher rejects
+    bodies that are not PDFs); other links only when their URL points at a PDF.
+    """
+    labelled = {url for url in [paper.get("pdf_url"), *paper.get("pdf_links", [])] if url}
+    urls = [paper.get("pdf_url"), paper.get("link"), *paper.get("pdf_links", []),
+            *paper.get("alternate_links", [])]
+    candidates: List[str] = []
+    for url in filter(None, urls):
+        match = _ARXIV_ID.search(url)
+        if match:
+            candidates += [f"https://arxiv.org/pdf/{match.group(1)}", f"https://export.arxiv.org/pdf/{match.group(1)}"]
+        elif url in labelled or is_pdf_url(url):
+            candidates.append(url)
+    return list(dict.fromkeys(candidates))
+
+
+class HostStats:
+    """
+    Per-host download speed: time to first byte and throughput (moving averages), and
+    recent failures. Latency samples from all hosts also set the hedging delay.
+    """
+
+    def __init__(self, alpha: float = 0.3, window: int = 200):
+        self.alpha = alpha
+        self._hosts: Dict[str, Dict[str, float]] = {}
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def _update(self, host: str, key: str, value: float) -> None:
+        stats = self._hosts.setdefault(host, {})
+        stats[key] = value if key not in stats else (1 - self.alpha) * stats[key] + self.alpha * value
+
+    def record_latency(self, host: str, seconds: float) -> None:
+        with self._lock:
+            self._update(host, "latency", seconds)
+            self._latencies.append(seconds)
+
+    def record_transfer(self, host: str, size: int, seconds: float) -> None:
+        with self._lock:
+            if seconds > 0 and size > 0:
+                self._update(host, "throughput", size / seconds)
+            stats = self._hosts.setdefault(host, {})
+            stats["failures"] = max(0.0, stats.get("failures", 0.0) - 1)
+
+    def record_failure(self, host: str) -> None:
+        with self._lock:
+            stats = self._hosts.setdefault(host, {})
+            stats["failures"] = stats.get("failures", 0.0) + 1
+
+    def record_unanswered(self, host: str, seconds: float) -> None:
+        """A cancelled attempt that had no response yet took at least this long."""
+        with self._lock:
+            stats = self._hosts.setdefault(host, {})
+            if seconds > stats.get("latency", 0.0):
+                self._update(host, "latency", seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency percentile over recent requests to every host; None until there are a few."""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < 5:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def expected_seconds(self, host: str, default: float) -> float:
+        """Expected time to download a typical PDF from a host; unknown hosts get the default."""
+        with self._lock:
+            stats = dict(self._hosts.get(host, {}))
+        if "latency" not in stats:
+            estimate = default
+        else:
+            estimate = stats["latency"] + (_TYPICAL_PDF_BYTES / stats["throughput"] if stats.get("throughput") else 0.0)
+        return estimate * (1 + stats.get("failures", 0.0))
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {host: dict(stats) for host, stats in self._hosts.items()}
+
+
+class HedgedFetcher:
+    """
+    Download a PDF from the fastest of several mirrors.
+
+    Candidates are tried in order of their hosts' expected speed. If the first has not
+    responded within the hedge delay (the hedge_percentile of recent response latencies,
+    or default_hedge_delay until enough are seen) a second request goes to the next
+    mirror; whichever completes first wins and the other is cancelled. An attempt that
+    is already streaming is never hedged, however long the file takes. A failed attempt
+    is replaced by the next candidate straight away. Each attempt writes its own part
+    file; only the winner's is moved to the destination.
+    """
+
+    def __init__(self, stats: Optional["HostStats"] = None, hedge_percentile: float = 0.9,
+                 default_hedge_delay: float = 3.0, min_hedge_delay: float = 0.2, max_in_flight: int = 2,
+                 timeout: float = 30, max_bytes: Optional[int] = DEFAULT_MAX_DOWNLOAD):
+        self.stats = stats or get_host_stats()
+        self.hedge_percentile = hedge_percentile
+        self.default_hedge_delay = default_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.hedged = 0  # hedge requests issued
+
+    def hedge_delay(self) -> float:
+        observed = self.stats.percentile(self.hedge_percentile)
+        delay = self.default_hedge_delay if observed is None else observed
+        return min(max(delay, self.min_hedge_delay), self.timeout)
+
+    def order(self, urls: List[str]) -> List[str]:
+        """Fastest expected host first; ties keep the source order."""
+        return sorted(urls, key=lambda url: self.stats.expected_seconds(host_of(url), self.default_hedge_delay))
+
+    def _can_hedge(self, queue: List[str], responded: List[Any]) -> bool:
+        """A hedge needs a spare mirror, a free slot, and no attempt that has started responding."""
+        return bool(queue) and len(responded) < self.max_in_flight and not any(e.is_set() for e in responded)
+
+    def _check_chunk(self, url: str, size: int, chunk: bytes) -> None:
+        if size == 0 and chunk and not chunk.startswith(b"%PDF"):
+            raise NotAPdf(f"{url} did not return a PDF")
+        if self.max_bytes is not None and size + len(chunk) > self.max_bytes:
+            raise DownloadTooLarge(f"{url} is larger than {self.max_bytes >> 20} MB")
+
+    def _finish(self, url: str, part: str, dest: str, size: int, started: float, first_byte: float) -> Dict[str, Any]:
+        self.stats.record_transfer(host_of(url), size, time.monotonic() - first_byte)
+        os.replace(part, dest)
+        logger.info(f"Downloaded PDF: {dest} from {host_of(url)} in {time.monotonic() - started:.1f}s")
+        return {"path": dest, "url": url, "status": "downloaded"}
+
+    def _attempt(self, url: str, part: str, cancel: threading.Event,
+                 responded: threading.Event) -> Tuple[int, float]:
+        """Download url into part; returns (bytes, time of first byte). Removes part on failure."""
+        import requests
+        started = time.monotonic()
+        first_byte = None
+        try:
+            with requests.get(url, stream=True, timeout=self.timeout) as response:
+                response.raise_for_status()
+                first_byte = time.monotonic()
+                responded.set()
+                self.stats.record_latency(host_of(url), first_byte - started)
+                size = 0
+                with open(part, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=_CHUNK_SIZE):
+                        if cancel.is_set():
+                            raise _Cancelled()
+                        self._check_chunk(url, size, chunk)
+                        size += len(chunk)
+                        f.write(chunk)
+            return size, first_byte
+        except BaseException:
+            if first_byte is None and cancel.is_set():
+                self.stats.record_unanswered(host_of(url), time.monotonic() - started)
+            _remove(part)
+            raise
+
+    def fetch(self, urls: List[str], dest: str) -> Optional[Dict[str, Any]]:
+        """Download dest from the first mirror to deliver it; None if every candidate fails."""
+        queue = self.order(urls)
+        cancel = threading.Event()
+        pending: Dict[concurrent.futures.Future, Tuple[str, str]] = {}
+        responded: Dict[concurrent.futures.Future, threading.Event] = {}
+        started = time.monotonic()
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="hedged")
+
+        def launch() -> None:
+            url = queue.pop(0)
+            part = f"{dest}.{len(queue)}.part"
+            event = threading.Event()
+            future = executor.submit(self._attempt, url, part, cancel, event)
+            pending[future] = (url, part)
+            responded[future] = event
+
+        try:
+            while queue or pending:
+                if not pending:
+                    launch()
+                can_hedge = self._can_hedge(queue, [responded[future] for future in pending])
+                done, _ = concurrent.futures.wait(pending, timeout=self.hedge_delay() if can_hedge else None,
+                                                  return_when=concurrent.futures.FIRST_COMPLETED)
+                if not done:
+                    if not self._can_hedge(queue, [responded[future] for future in pending]):
+                        continue  # a response arrived while waiting; let it stream
+                    self.hedged += 1
+                    logger.info(f"Hedging {os.path.basename(dest)}: no response after {self.hedge_delay():.1f}s, "
+                                f"also trying {host_of(queue[0])}")
+                    launch()
+                    continue
+                for future in done:
+                    url, part = pending.pop(future)
+                    try:
+                        size, first_byte = future.result()
+                    except Exception as e:
+                        self.stats.record_failure(host_of(url))
+                        logger.warning(f"Failed to download PDF from {url}: {str(e)}")
+                        continue
+                    return self._finish(url, part, dest, size, started, first_byte)
+            return None
+        finally:
+            # Losers stop at their next chunk; one that completed anyway leaves its part file
+            cancel.set()
+            for future, (_, part) in pending.items():
+                future.add_done_callback(lambda _, part=part: _remove(part))
+            executor.shutdown(wait=False)
+
+    async def _aattempt(self, client, url: str, part: str, responded: asyncio.Event) -> Tuple[int, float]:
+        """Async variant of _attempt on an httpx.AsyncClient; cancellation is task cancellation."""
+        started = time.monotonic()
+        first_byte = None
+        try:
+            async with client.stream("GET", url, timeout=self.timeout) as response:
+                response.raise_for_status()
+                first_byte = time.monotonic()
+                responded.set()
+                self.stats.record_latency(host_of(url), first_byte - started)
+                size = 0
+                with open(part, "wb") as f:
+                    async for chunk in response.aiter_bytes(chunk_size=_CHUNK_SIZE):
+                        self._check_chunk(url, size, chunk)
+                        size += len(chunk)
+                        f.write(chunk)
+            return size, first_byte
+        except BaseException as e:
+            if first_byte is None and isinstance(e, asyncio.CancelledError):
+                self.stats.record_unanswered(host_of(url), time.monotonic() - started)
+            _remove(part)
+            raise
+
+    async def afetch(self, client, urls: List[str], dest: str) -> Optional[Dict[str, Any]]:
+        """Async variant of fetch."""
+        queue = self.order(urls)
+        pending: Dict[asyncio.Task, Tuple[str, str]] = {}
+        responded: Dict[asyncio.Task, asyncio.Event] = {}
+        started = time.monotonic()
+
+        def launch() -> None:
+            url = queue.pop(0)
+            part = f"{dest}.{len(queue)}.part"
+            event = asyncio.Event()
+            task = asyncio.ensure_future(self._aattempt(client, url, part, event))
+            pending[task] = (url, part)
+            responded[task] = event
+
+        try:
+            while queue or pending:
+                if not pending:
+                    launch()
+                can_hedge = self._can_hedge(queue, [responded[task] for task in pending])
+                done, _ = await asyncio.wait(pending, timeout=self.hedge_delay() if can_hedge else None,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if not self._can_hedge(queue, [responded[task] for task in pending]):
+                        continue  # a response arrived while waiting; let it stream
+                    self.hedged += 1
+                    logger.info(f"Hedging {os.path.basename(dest)}: no response after {self.hedge_delay():.1f}s, "
+                                f"also trying {host_of(queue[0])}")
+                    launch()
+                    continue
+                for task in done:
+                    url, part = pending.pop(task)
+                    try:
+                        size, first_byte = task.result()
+                    except Exception as e:
+                        self.stats.record_failure(host_of(url))
+                        logger.warning(f"Failed to download PDF from {url}: {str(e)}")
+                        continue
+                    return self._finish(url, part, dest, size, started, first_byte)
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            for _, part in pending.values():
+                _remove(part)
+
+
+_default_stats: Optional[HostStats] = None
+_default_lock = threading.Lock()
+
+
+def get_host_stats() -> HostStats:
+    """Return the process-wide host statistics, shared by every fetcher."""
+    global _default_stats
+    with _default_lock:
+        if _default_stats is None:
+            _default_stats = HostStats()
+        return _default_stats
+
+
+def serve_stand_in(delay: float = 0.0, body: bytes = b"%PDF-1.4\n" + b"0" * 100000, status: int = 200,
+                   stream_seconds: float = 0.0):
+    """
+    Local HTTP host that answers every GET after an injected delay, then sends the body
+    spread over stream_seconds; for exercising hedging without the network. Returns
+    (server, base_url); call server.shutdown().
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            try:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/pdf")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                pieces = 10 if stream_seconds else 1
+                step = -(-len(body) // pieces)
+                for i in range(0, len(body), step):
+                    self.wfile.write(body[i:i + step])
+                    self.wfile.flush()
+                    time.sleep(stream_seconds / pieces)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the fetcher cancelled this attempt
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import tempfile
+    parser = argparse.ArgumentParser(description="Hedged download demo against local stand-in hosts.")
+    parser.add_argument("--delays", type=float, nargs="+", default=[5.0, 0.1],
+                        help="Injected response delay of each stand-in host, in candidate order")
+    parser.add_argument("--rounds", type=int, default=8, help="Downloads to run")
+    parser.add_argument("--use_async", action="store_true", help="Use the httpx-based async fetcher")
+    args = parser.parse_args(argv)
+
+    hosts = [serve_stand_in(delay) for delay in args.delays]
+    urls = [f"{base}/paper.pdf" for _, base in hosts]
+    fetcher = HedgedFetcher(stats=HostStats(), default_hedge_delay=0.5)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for i in range(args.rounds):
+                start = time.monotonic()
+                dest = os.path.join(tmp, f"paper{i}.pdf")
+                if args.use_async:
+                    import httpx
+
+                    async def run():
+                        async with httpx.AsyncClient() as client:
+                            return await fetcher.afetch(client, urls, dest)
+                    result = asyncio.run(run())
+                else:
+                    result = fetcher.fetch(urls, dest)
+                print(f"round {i + 1}: {host_of(result['url']) if result else 'failed'} "
+                      f"in {time.monotonic() - start:.2f}s (hedge delay {fetcher.hedge_delay():.2f}s)")
+        print(f"{fetcher.hedged} hedged requests")
+        for host, stats in fetcher.stats.snapshot().items():
+            print(f"{host}: " + ", ".join(f"{key} {value:.3g}" for key, value in sorted(stats.items())))
+    finally:
+        for server, _ in hosts:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
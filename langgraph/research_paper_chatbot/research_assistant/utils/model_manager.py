@@ -0,0 +1,143 @@
+import os
+import asyncio
+import logging
+import threading
+import weakref
+import concurrent.futures
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from research_assistant.utils.token_budget import pin_context
+
+logger = logging.getLogger(__name__)
+
+OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+
+# How long Ollama keeps a model loaded after a request; long enough to span a whole run
+KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+
+# One ollama.AsyncClient per event loop and settings: its connection pool is bound to the loop
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, Any], Any]]" = weakref.WeakKeyDictionary()
+_async_clients_lock = threading.Lock()
+
+
+def get_async_client(host: str = OLLAMA_HOST, timeout: Optional[float] = None):
+    """Shared ollama.AsyncClient for the running event loop."""
+    import ollama
+    loop = asyncio.get_running_loop()
+    with _async_clients_lock:
+        clients = _async_clients.setdefault(loop, {})
+        key = (host, timeout)
+        if key not in clients:
+            clients[key] = ollama.AsyncClient(host=host, timeout=timeout)
+        return clients[key]
+
+
+def is_timeout(error: BaseException) -> bool:
+    """Whether an ollama.Client or AsyncClient call failed by timing out; both raise httpx's exceptions."""
+    import httpx
+    return isinstance(error, (httpx.TimeoutException, asyncio.TimeoutError, TimeoutError))
+
+
+class ModelLifecycleManager:
+    """
+    Preload the models a pipeline needs and unload them when it is done.
+
+    Loading a 7B model takes many seconds on CPU. start() loads every model in the
+    background while the first nodes (topic explanation, Scholar search) run, so no
+    user-facing call pays the cold load. Each model is loaded with the num_ctx its
+    tasks will request and that size is pinned for the nodes, since Ollama reloads a
+    model whose num_ctx changes. release() unloads only the models this manager
+    loaded; models that were already resident are left alone.
+    """
+
+    def __init__(self, host: str = OLLAMA_HOST, keep_alive: str = KEEP_ALIVE, timeout: int = 300):
+        self.host = host.rstrip("/")
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._futures: List[concurrent.futures.Future] = []
+        self._loaded: List[str] = []
+
+    def loaded_models(self) -> Dict[str, Optional[int]]:
+        """Models Ollama currently holds in memory, with the context they were loaded with if reported."""
+        import requests
+        try:
+            response = requests.get(f"{self.host}/api/ps", timeout=10)
+            response.raise_for_status()
+            return {m.get("name"): m.get("context_length") for m in response.json().get("models", [])}
+        except Exception as e:
+            logger.warning(f"Could not list loaded models: {str(e)}")
+            return {}
+
+    def _load(self, model: str, num_ctx: Optional[int] = None) -> bool:
+        """Load one model; a generate request without a prompt only loads it."""
+        import requests
+        payload: Dict[str, Any] = {"model": model, "keep_alive": self.keep_alive}
+        if num_ctx:
+            payload["options"] = {"num_ctx": num_ctx}
+        try:
+            response = requests.post(f"{self.host}/api/generate", json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            logger.info(f"Model warmed up: {model} (num_ctx={num_ctx})")
+            return True
+        except Exception as e:
+            logger.warning(f"Could not warm up model {model}: {str(e)}")
+            return False
+
+    def start(self, models: Union[Dict[str, int], Iterable[str]]) -> None:
+        """
+        Begin loading models in the background and return immediately.
+        models maps each model to the num_ctx to load it with; a plain list loads with Ollama's default.
+        """
+        contexts = dict(models) if isinstance(models, dict) else {m: None for m in models}
+        contexts = {m: ctx for m, ctx in contexts.items() if m}
+        for model, num_ctx in contexts.items():
+            if num_ctx:
+                pin_context(model, num_ctx)
+        loaded = self.loaded_models()
+
+        def resident(model: str) -> bool:
+            for name in (model, f"{model}:latest"):
+                if name in loaded:
+                    # An unknown context is trusted; a different one means the first request reloads it
+                    return not contexts[model] or loaded[name] in (None, contexts[model])
+            return False
+
+        pending = [m for m in sorted(contexts) if not resident(m)]
+        if not pending:
+            logger.info("All required models already loaded")
+            return
+        # Only models that were not resident before are ours to release
+        self._loaded.extend(m for m in pending if m not in loaded and f"{m}:latest" not in loaded)
+        logger.info(f"Warming up models: {', '.join(pending)}")
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(pending), thread_name_prefix="warmup")
+        self._futures = [self._executor.submit(self._load, m, contexts[m]) for m in pending]
+        self._executor.shutdown(wait=False)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until warm-up finishes; True if every model loaded."""
+        done, not_done = concurrent.futures.wait(self._futures, timeout=timeout)
+        return not not_done and all(f.result() for f in done)
+
+    def warm_up(self, models: Union[Dict[str, int], Iterable[str]]) -> bool:
+        """Load models in parallel and wait for them."""
+        self.start(models)
+        return self.wait()
+
+    def release(self, models: Optional[Iterable[str]] = None) -> None:
+        """Unload models now instead of waiting for keep_alive to expire; by default the ones start() loaded."""
+        import requests
+        for model in models if models is not None else self._loaded:
+            try:
+                requests.post(f"{self.host}/api/generate", json={"model": model, "keep_alive": 0}, timeout=30)
+                logger.info(f"Released model: {model}")
+            except Exception as e:
+                logger.warning(f"Could not release model {model}: {str(e)}")
+        if models is None:
+            self._loaded = []
+
+    def __enter__(self) -> "ModelLifecycleManager":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
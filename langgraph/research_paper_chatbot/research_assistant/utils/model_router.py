@@ -0,0 +1,223 @@
+import os
+import json
+import time
+import atexit
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from research_assistant.utils.model_manager import OLLAMA_HOST
+
+logger = logging.getLogger(__name__)
+
+# Candidate models per tier, most preferred first. The first installed one is used.
+MODEL_TIERS = {
+    "small": ["llama3.2:3b", "qwen2.5:3b", "phi3:mini", "llama3.2:1b"],
+    "medium": ["mistral", "llama3.1:8b", "llama2"],
+    "large": ["llama3.1:8b", "mistral", "llama2"],
+}
+TIER_ORDER = ["large", "medium", "small"]
+
+# Per-task route: (tier, latency target in seconds, expected output tokens)
+TASK_ROUTES = {
+    "related_topics": ("small", 10.0, 150),
+    "draft_outline": ("small", 20.0, 400),
+    "key_points": ("small", 20.0, 300),
+    "topic_explainer": ("medium", 30.0, 400),
+    "summarizer": ("medium", 90.0, 400),
+    "research_draft": ("large", 600.0, 3000),
+}
+
+# Largest num_ctx each task's node asks for (its TokenBudget max_ctx). A model is
+# warmed up with the largest context of the tasks routed to it.
+TASK_CONTEXT = {
+    "related_topics": 4096,
+    "draft_outline": 16384,
+    "key_points": 8192,
+    "topic_explainer": 4096,
+    "summarizer": 2048,
+    "research_draft": 16384,
+}
+
+# Used when Ollama cannot be reached to list installed models
+FALLBACK_MODEL = "mistral"
+
+
+class ThroughputStats:
+    """
+    Smoothed prompt and generation tokens/sec per model, persisted between runs.
+
+    Updates are saved at most every save_interval seconds, and once more at exit.
+    Each save writes its own temporary file before replacing the stats file, so
+    concurrent jobs and processes never write through the same temporary path.
+    """
+
+    def __init__(self, path: Optional[str] = None, smoothing: float = 0.3, save_interval: float = 10.0):
+        self.path = Path(path or os.getenv("RESEARCH_MODEL_STATS", ".model_stats.json"))
+        self.smoothing = smoothing
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self._stats: Dict[str, Dict[str, float]] = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._stats = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable model stats {self.path}: {str(e)}")
+        # Updates since the last periodic save
+        atexit.register(self.flush)
+
+    def get(self, model: str) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._stats.get(model, {}))
+
+    def update(self, model: str, eval_tps: Optional[float], prompt_tps: Optional[float]) -> None:
+        """Fold one observation into the averages; saved once save_interval has passed."""
+        with self._lock:
+            entry = self._stats.setdefault(model, {})
+            for key, value in (("eval_tps", eval_tps), ("prompt_tps", prompt_tps)):
+                if not value:
+                    continue
+                old = entry.get(key)
+                entry[key] = value if old is None else old + self.smoothing * (value - old)
+            entry["samples"] = entry.get("samples", 0) + 1
+            self._dirty = True
+            due = time.monotonic() - self._last_save >= self.save_interval
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """Save pending updates now."""
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                snapshot = json.dumps(self._stats, indent=2)
+                self._dirty = False
+                self._last_save = time.monotonic()
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=str(self.path.parent), prefix=f"{self.path.name}.", suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "w", encoding="utf-8") as f:
+                        f.write(snapshot)
+                    os.replace(tmp_path, self.path)
+                except BaseException:
+                    os.unlink(tmp_path)
+                    raise
+            except OSError as e:
+                logger.debug(f"Could not save model stats: {str(e)}")
+
+
+class ModelRouter:
+    """
+    Pick the Ollama model for each task.
+
+    Every task has a tier (small for list/JSON tasks, large for drafting) and a latency
+    target. The router takes the first installed model of the task's tier; if measured
+    throughput says it would miss the target, it steps down to faster tiers.
+    """
+
+    def __init__(self, host: str = OLLAMA_HOST, routes: Optional[Dict[str, tuple]] = None,
+                 tiers: Optional[Dict[str, List[str]]] = None, stats: Optional[ThroughputStats] = None):
+        self.host = host.rstrip("/")
+        self.routes = {**TASK_ROUTES, **(routes or {})}
+        self.tiers = {**MODEL_TIERS, **(tiers or {})}
+        self.stats = stats or ThroughputStats()
+        self._installed: Optional[List[str]] = None
+        self._lock = threading.Lock()
+
+    def installed_models(self) -> List[str]:
+        """Models Ollama has pulled, fetched once per router; empty if Ollama is unreachable."""
+        with self._lock:
+            if self._installed is None:
+                import requests
+                try:
+                    response = requests.get(f"{self.host}/api/tags", timeout=10)
+                    response.raise_for_status()
+                    self._installed = [m.get("name", "") for m in response.json().get("models", [])]
+                except Exception as e:
+                    logger.warning(f"Could not list installed models: {str(e)}")
+                    self._installed = []
+            return self._installed
+
+    def _is_installed(self, model: str) -> bool:
+        installed = self.installed_models()
+        return model in installed or f"{model}:latest" in installed
+
+    def estimate_latency(self, model: str, output_tokens: int, prompt_tokens: int = 0) -> Optional[float]:
+        """Seconds a call should take from measured throughput; None if never measured."""
+        stats = self.stats.get(model)
+        if not stats.get("eval_tps"):
+            return None
+        seconds = output_tokens / stats["eval_tps"]
+        if prompt_tokens and stats.get("prompt_tps"):
+            seconds += prompt_tokens / stats["prompt_tps"]
+        return seconds
+
+    def _candidates(self, tier: str) -> List[str]:
+        """Installed models of the tier, then of every faster tier."""
+        start = TIER_ORDER.index(tier) if tier in TIER_ORDER else 0
+        candidates = []
+        for name in TIER_ORDER[start:]:
+            candidates += [m for m in self.tiers.get(name, []) if m not in candidates and self._is_installed(m)]
+        if not candidates:
+            # Nothing small enough is installed: use whatever larger model is there
+            for name in reversed(TIER_ORDER[:start]):
+                candidates += [m for m in self.tiers.get(name, []) if m not in candidates and self._is_installed(m)]
+        return candidates
+
+    def select(self, task: str, prompt_tokens: int = 0) -> str:
+        """Model for a task: the preferred one that meets its latency target, else the fastest."""
+        tier, target, output_tokens = self.routes.get(task, ("medium", 60.0, 500))
+        candidates = self._candidates(tier)
+        if not candidates:
+            return FALLBACK_MODEL
+
+        fastest, fastest_latency = None, None
+        for model in candidates:
+            latency = self.estimate_latency(model, output_tokens, prompt_tokens)
+            if latency is None or latency <= target:
+                logger.debug(f"Routing {task} to {model} (estimated {latency or 0:.1f}s, target {target:.0f}s)")
+                return model
+            if fastest_latency is None or latency < fastest_latency:
+                fastest, fastest_latency = model, latency
+        logger.info(f"No model meets the {target:.0f}s target for {task}; using fastest: {fastest}")
+        return fastest
+
+    def record(self, model: str, response: Any) -> None:
+        """Update throughput from an Ollama response's eval_count/eval_duration (nanoseconds)."""
+        try:
+            data = response if hasattr(response, "get") else {}
+            eval_tps = prompt_tps = None
+            if data.get("eval_count") and data.get("eval_duration"):
+                eval_tps = data["eval_count"] / (data["eval_duration"] / 1e9)
+            if data.get("prompt_eval_count") and data.get("prompt_eval_duration"):
+                prompt_tps = data["prompt_eval_count"] / (data["prompt_eval_duration"] / 1e9)
+        except Exception:
+            return
+        if eval_tps or prompt_tps:
+            self.stats.update(model, eval_tps, prompt_tps)
+
+    def plan(self, tasks: List[str], pinned: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """Model per task, with pinned models taking precedence over routing."""
+        pinned = pinned or {}
+        return {task: pinned.get(task) or self.select(task) for task in tasks}
+
+    @staticmethod
+    def contexts(plan: Dict[str, str]) -> Dict[str, int]:
+        """num_ctx per model for a plan: the largest context of the tasks it serves."""
+        contexts: Dict[str, int] = {}
+        for task, model in plan.items():
+            contexts[model] = max(contexts.get(model, 0), TASK_CONTEXT.get(task, 2048))
+        return contexts
+
+
+# Shared so throughput measured by one node informs routing for every other node
+default_router = ModelRouter()
@@ -2,8 +2,14 @@ import requests
 import logging
 from typing import Optional
 
+from research_assistant.utils.token_budget import TokenBudget
+from research_assistant.utils.model_manager import KEEP_ALIVE
+from research_assistant.utils.prompts import FORMAT_CONTENT
+
 logger = logging.getLogger(__name__)
 
+_budget = TokenBudget(max_ctx=8192)
+
 def process_with_ollama(content: str, model: str = "llama3") -> str:
     """
     Send content to Ollama for better formatting and summarization.
@@ -19,33 +25,26 @@ def process_with_ollama(content: str, model: str = "llama3") -> str:
         return content
         
     url = "http://localhost:11434/api/generate"
+    content = _budget.fit(content, FORMAT_CONTENT.static_parts(), num_predict=1000)
     
-    # Create a prompt that asks for better formatting and summarization
-    prompt = f"""Please process the following research content and provide a well-structured summary. 
-    - Extract and organize key information into clear sections
-    - Ensure the output is coherent and properly formatted
-    - Remove any truncated text or incomplete sentences
-    - Use markdown formatting with appropriate headers
-    
-    Content to process:
-    {content}
-    """
+    # Static instructions first so repeated calls reuse Ollama's prompt cache
+    prompt = FORMAT_CONTENT.render(("Content to process", content))
     
     payload = {
         "model": model,
+        "system": FORMAT_CONTENT.system,
         "prompt": prompt,
         "stream": False,
-        "options": {
-            "temperature": 0.3,
-            "top_p": 0.9,
-            "max_tokens": 4000
-        }
+        "keep_alive": KEEP_ALIVE,
+        "options": _budget.options([FORMAT_CONTENT.system, prompt], num_predict=1000, model=model,
+                                  temperature=0.3, top_p=0.9)
     }
     
     try:
         response = requests.post(url, json=payload, timeout=120)
         response.raise_for_status()
         result = response.json()
+        _budget.record([FORMAT_CONTENT.system, prompt], result)
         return result.get("response", content)  # Return original if no response
     except Exception as e:
         logger.warning(f"Ollama processing failed: {str(e)}")
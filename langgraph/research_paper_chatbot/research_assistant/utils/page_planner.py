@@ -0,0 +1,189 @@
+import logging
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from research_assistant.utils.section_splitter import SectionSplitter, default_splitter
+from research_assistant.utils.text_cleaner import PAGE_BREAK
+from research_assistant.utils.pdf_memory import ExtractionLimitExceeded
+
+logger = logging.getLogger(__name__)
+
+# Sections worth summarizing, in the order pages are extracted until the budget is spent
+SECTION_PRIORITY = ["abstract", "introduction", "conclusion", "discussion", "results",
+                    "experiments", "methodology", "body", "related work"]
+# Sections whose pages are never extracted; everything after the first one is back matter
+BACK_MATTER = {"references", "acknowledgments", "appendix"}
+# Sections that can precede the body; back matter only ends the paper once past them
+FRONT_MATTER = {"preamble", "abstract"}
+
+
+class PagePlan(NamedTuple):
+    """Pages chosen for extraction, their text in document order, and how they were chosen."""
+    pages: List[int]
+    text: str
+    method: str  # "outline" or "heuristic"
+
+
+def pypdf_outline(reader) -> List[Tuple[str, int]]:
+    """Flatten a PyPDF2 reader's outline into (title, page index) entries; [] if it has none."""
+    entries: List[Tuple[str, int]] = []
+
+    def walk(items) -> None:
+        for item in items:
+            if isinstance(item, list):
+                walk(item)
+                continue
+            try:
+                entries.append((str(item.title), reader.get_destination_page_number(item)))
+            except Exception:
+                continue
+
+    try:
+        walk(reader.outline or [])
+    except Exception as e:
+        logger.debug(f"Could not read PDF outline: {str(e)}")
+    return entries
+
+
+class PagePlanner:
+    """
+    Choose which pages of a paper to extract instead of a fixed prefix.
+
+    With a PDF outline, pages are mapped to sections directly. Without one, a cheap
+    pass reads the first pages (abstract, introduction), scans backwards from the end
+    for the references heading to find the conclusion, then fills the middle (methods,
+    results) front to back. Extraction stops once max_chars of text is collected.
+    """
+
+    def __init__(self, max_chars: Optional[int] = 40000, max_pages: Optional[int] = None,
+                 head_pages: int = 2, splitter: Optional[SectionSplitter] = None):
+        self.max_chars = max_chars
+        self.max_pages = max_pages
+        self.head_pages = head_pages
+        self.splitter = splitter or default_splitter
+
+    def _outline_sections(self, outline: Sequence[Tuple[str, int]], num_pages: int) -> Tuple[Dict[int, str], int]:
+        """
+        Map each page to a section from outline (title, start page) entries; {} if unusable.
+        Also returns the page the body starts on.
+        """
+        entries = sorted(
+            (page, self.splitter.canonical(title) or "body")
+            for title, page in outline if page is not None and 0 <= page < num_pages
+        )
+        if not any(name != "body" for _, name in entries):
+            return {}, 0
+
+        page_sections: Dict[int, str] = {}
+        body_start: Optional[int] = None
+        for i, (start, name) in enumerate(entries):
+            if name in BACK_MATTER:
+                if body_start is not None:
+                    # Only the part of the start page before this heading can still matter
+                    page_sections.setdefault(start, "conclusion")
+                    break
+                # Acknowledgments or an appendix note ahead of the body: its pages get no section
+                continue
+            # An unrecognised entry on the first page is the paper title, not a body section
+            if body_start is None and name not in FRONT_MATTER and (name != "body" or start > 0):
+                body_start = start
+            end = entries[i + 1][0] if i + 1 < len(entries) else num_pages - 1
+            for page in range(start, end + 1):
+                page_sections.setdefault(page, name)
+        # Title page: abstract even when the outline starts at the introduction
+        page_sections.setdefault(0, "abstract")
+        return page_sections, body_start if body_start is not None else num_pages
+
+    def _ordered(self, page_sections: Dict[int, str]) -> List[int]:
+        """Pages sorted by the priority of their section, then by position."""
+        rank = {name: i for i, name in enumerate(SECTION_PRIORITY)}
+        return sorted(page_sections, key=lambda p: (rank.get(page_sections[p], len(rank)), p))
+
+    def _cut_back_matter(self, text: str, body_seen: bool = True) -> Tuple[str, bool]:
+        """
+        Text before the first back-matter heading on a page, and whether one was found.
+        Before the body (body_seen False) a back-matter heading only counts after a body heading.
+        """
+        for span in self.splitter.spans(text):
+            if span.name in BACK_MATTER:
+                if body_seen:
+                    return text[:span.heading_start], True
+            elif span.name not in FRONT_MATTER:
+                body_seen = True
+        return text, False
+
+    def plan(self, num_pages: int, page_text: Callable[[int], str],
+             outline: Optional[Sequence[Tuple[str, int]]] = None) -> PagePlan:
+        """Extract the planned pages with page_text(i) and return them in document order."""
+        texts: Dict[int, str] = {}
+        total = 0
+        page_sections, body_start = self._outline_sections(outline or [], num_pages)
+        if not page_sections:
+            # Without an outline only the title page is assumed to be front matter
+            body_start = 0
+
+        def take(page: int, raw: Optional[str] = None) -> bool:
+            """Keep one page, extracting it unless already read; False once the budget is spent."""
+            nonlocal total
+            if self.max_chars is not None and total >= self.max_chars:
+                return False
+            if self.max_pages is not None and len(texts) >= self.max_pages:
+                return False
+            if page not in texts:
+                raw = raw if raw is not None else page_text(page) or ""
+                text, _ = self._cut_back_matter(raw, body_seen=page > body_start)
+                texts[page] = text
+                total += len(text)
+            return True
+
+        method = "outline" if page_sections else "heuristic"
+        try:
+            if page_sections:
+                for page in self._ordered(page_sections):
+                    if not take(page):
+                        break
+            else:
+                self._plan_without_outline(num_pages, page_text, texts, take)
+        except ExtractionLimitExceeded as e:
+            # A guarded page_text stops the plan; the pages read so far are still returned
+            logger.warning(f"Stopped extraction after {len(texts)} pages: {str(e)}")
+
+        pages = sorted(texts)
+        logger.debug(f"Planned {len(pages)} of {num_pages} pages by {method}: {pages}")
+        # Page breaks are kept so the cleaning stage can find running headers and footers
+        return PagePlan(pages, PAGE_BREAK.join(texts[p] for p in pages if texts[p].strip()), method)
+
+    def _plan_without_outline(self, num_pages: int, page_text: Callable[[int], str],
+                              texts: Dict[int, str], take: Callable[..., bool]) -> None:
+        """Head pages, then the conclusion found by scanning back from the end, then the middle."""
+        head = min(self.head_pages, num_pages)
+        for page in range(head):
+            take(page)
+
+        # Back matter usually fills the last few pages; look at most a third of the paper
+        body_end = num_pages
+        scan_floor = max(head, num_pages - max(3, num_pages // 3))
+        scanned: Dict[int, str] = {}
+        for page in range(num_pages - 1, scan_floor - 1, -1):
+            raw = page_text(page) or ""
+            scanned[page] = raw
+            before, found = self._cut_back_matter(raw)
+            if found:
+                body_end = page + 1 if before.strip() else page
+                break
+
+        # The conclusion: the last body pages, back to its heading (two pages at most)
+        tail = []
+        for page in range(body_end - 1, max(head, body_end - 3) - 1, -1):
+            tail.append(page)
+            text = scanned.get(page)
+            if text is not None and any(span.name in ("conclusion", "discussion")
+                                        for span in self.splitter.spans(text)):
+                break
+        for page in tail:
+            # Pages read during the scan are not extracted twice
+            if not take(page, scanned.get(page)):
+                return
+
+        for page in range(head, body_end):
+            if page not in texts and not take(page):
+                return
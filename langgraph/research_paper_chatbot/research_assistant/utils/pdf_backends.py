@@ -0,0 +1,402 @@
+import os
+import re
+import time
+import logging
+import argparse
+import contextlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Type
+
+from research_assistant.utils.pdf_memory import open_mapped
+
+logger = logging.getLogger(__name__)
+
+_TEXT_CHARS = re.compile(r"\w")
+
+
+class PdfDocument:
+    """An open PDF as the pipeline sees it: page count, per-page text, outline, metadata."""
+
+    backend = "base"
+
+    @property
+    def num_pages(self) -> int:
+        raise NotImplementedError
+
+    def page_text(self, page: int) -> str:
+        raise NotImplementedError
+
+    def outline(self) -> List[Tuple[str, int]]:
+        """(title, page index) entries; [] when the PDF has none or the backend cannot read it."""
+        return []
+
+    def metadata(self) -> Dict[str, str]:
+        return {}
+
+
+class ExtractionBackend:
+    """A PDF text-extraction library. Subclasses register themselves with @register_backend."""
+
+    name = "base"
+    module = ""  # import name that must be installed for the backend to be usable
+
+    @classmethod
+    def available(cls) -> bool:
+        import importlib.util
+        return importlib.util.find_spec(cls.module) is not None
+
+    def open(self, path: str) -> "contextlib.AbstractContextManager[PdfDocument]":
+        raise NotImplementedError
+
+
+BACKENDS: Dict[str, Type[ExtractionBackend]] = {}
+
+
+def register_backend(cls: Type[ExtractionBackend]) -> Type[ExtractionBackend]:
+    BACKENDS[cls.name] = cls
+    return cls
+
+
+def available_backends() -> List[str]:
+    """Registered backends whose library is installed, in registration order."""
+    return [name for name, cls in BACKENDS.items() if cls.available()]
+
+
+# pypdf / PyPDF2
+
+class _PyPdfDocument(PdfDocument):
+    backend = "pypdf"
+
+    def __init__(self, reader):
+        self.reader = reader
+
+    @property
+    def num_pages(self) -> int:
+        return len(self.reader.pages)
+
+    def page_text(self, page: int) -> str:
+        return self.reader.pages[page].extract_text() or ""
+
+    def outline(self) -> List[Tuple[str, int]]:
+        from research_assistant.utils.page_planner import pypdf_outline
+        return pypdf_outline(self.reader)
+
+    def metadata(self) -> Dict[str, str]:
+        info = self.reader.metadata or {}
+        return {key.lstrip("/").lower(): str(value) for key, value in info.items()}
+
+
+@register_backend
+class PyPdfBackend(ExtractionBackend):
+    """pypdf, or its predecessor PyPDF2 when only that is installed."""
+
+    name = "pypdf"
+    module = "pypdf"
+
+    @classmethod
+    def available(cls) -> bool:
+        import importlib.util
+        return any(importlib.util.find_spec(m) is not None for m in ("pypdf", "PyPDF2"))
+
+    @contextlib.contextmanager
+    def open(self, path: str) -> Iterator[PdfDocument]:
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            from PyPDF2 import PdfReader
+        with open_mapped(path) as data:
+            yield _PyPdfDocument(PdfReader(data))
+
+
+# pdfminer.six
+
+class _PdfMinerDocument(PdfDocument):
+    backend = "pdfminer"
+
+    def __init__(self, file):
+        from pdfminer.pdfpage import PDFPage
+        from pdfminer.pdfparser import PDFParser
+        from pdfminer.pdfdocument import PDFDocument
+        self.document = PDFDocument(PDFParser(file))
+        self.pages = list(PDFPage.create_pages(self.document))
+
+    @property
+    def num_pages(self) -> int:
+        return len(self.pages)
+
+    def page_text(self, page: int) -> str:
+        import io
+        from pdfminer.layout import LAParams
+        from pdfminer.converter import TextConverter
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        manager = PDFResourceManager()
+        with io.StringIO() as out:
+            device = TextConverter(manager, out, laparams=LAParams())
+            try:
+                PDFPageInterpreter(manager, device).process_page(self.pages[page])
+            finally:
+                device.close()
+            return out.getvalue()
+
+    def metadata(self) -> Dict[str, str]:
+        info = self.document.info[0] if self.document.info else {}
+        return {key.lower(): value.decode("utf-8", "replace") if isinstance(value, bytes) else str(value)
+                for key, value in info.items()}
+
+
+@register_backend
+class PdfMinerBackend(ExtractionBackend):
+    """pdfminer.six: slower, but follows reading order on multi-column layouts."""
+
+    name = "pdfminer"
+    module = "pdfminer"
+
+    @contextlib.contextmanager
+    def open(self, path: str) -> Iterator[PdfDocument]:
+        with open(path, "rb") as f:
+            yield _PdfMinerDocument(f)
+
+
+# pypdfium2
+
+class _PdfiumDocument(PdfDocument):
+    backend = "pypdfium2"
+
+    def __init__(self, pdf):
+        self.pdf = pdf
+
+    @property
+    def num_pages(self) -> int:
+        return len(self.pdf)
+
+    def page_text(self, page: int) -> str:
+        pdf_page = self.pdf[page]
+        try:
+            textpage = pdf_page.get_textpage()
+            try:
+                return textpage.get_text_range()
+            finally:
+                textpage.close()
+        finally:
+            pdf_page.close()
+
+    def outline(self) -> List[Tuple[str, int]]:
+        try:
+            return [(item.title, item.page_index) for item in self.pdf.get_toc() if item.page_index is not None]
+        except Exception as e:
+            logger.debug(f"Could not read PDF outline: {str(e)}")
+            return []
+
+    def metadata(self) -> Dict[str, str]:
+        try:
+            return {key.lower(): str(value) for key, value in self.pdf.get_metadata_dict().items()}
+        except Exception:
+            return {}
+
+
+@register_backend
+class PdfiumBackend(ExtractionBackend):
+    """pypdfium2: PDFium bindings, usually the fastest by a wide margin."""
+
+    name = "pypdfium2"
+    module = "pypdfium2"
+
+    @contextlib.contextmanager
+    def open(self, path: str) -> Iterator[PdfDocument]:
+        import pypdfium2
+        pdf = pypdfium2.PdfDocument(path)
+        try:
+            yield _PdfiumDocument(pdf)
+        finally:
+            pdf.close()
+
+
+# Selection
+
+class Probe(NamedTuple):
+    backend: str
+    seconds: float
+    chars: int  # word characters extracted from the probed pages
+
+    @property
+    def speed(self) -> float:
+        return self.chars / self.seconds if self.seconds > 0 else float("inf")
+
+
+def _text_chars(text: str) -> int:
+    return len(_TEXT_CHARS.findall(text or ""))
+
+
+def _probe_pages(num_pages: int, count: int) -> List[int]:
+    """First pages plus one from the middle, where body text and layouts are typical."""
+    pages = list(range(min(count, num_pages)))
+    if num_pages > count:
+        pages.append(num_pages // 2)
+    return pages
+
+
+class _FallbackDocument(PdfDocument):
+    """The selected backend's document, retrying pages it returns empty on the others."""
+
+    def __init__(self, primary: PdfDocument, others: List[PdfDocument]):
+        self.primary = primary
+        self.others = others
+        self.backend = primary.backend
+
+    @property
+    def num_pages(self) -> int:
+        return self.primary.num_pages
+
+    def page_text(self, page: int) -> str:
+        try:
+            text = self.primary.page_text(page)
+        except Exception as e:
+            logger.debug(f"{self.primary.backend} failed on page {page + 1}: {str(e)}")
+            text = ""
+        if text.strip():
+            return text
+        for other in self.others:
+            try:
+                text = other.page_text(page)
+            except Exception:
+                continue
+            if text.strip():
+                logger.debug(f"Page {page + 1} extracted by fallback backend {other.backend}")
+                return text
+        return ""
+
+    def outline(self) -> List[Tuple[str, int]]:
+        for document in [self.primary] + self.others:
+            entries = document.outline()
+            if entries:
+                return entries
+        return []
+
+    def metadata(self) -> Dict[str, str]:
+        for document in [self.primary] + self.others:
+            info = document.metadata()
+            if info:
+                return info
+        return {}
+
+
+class BackendSelector:
+    """
+    Pick an extraction backend per document.
+
+    Every available backend extracts a few probe pages; the fastest one whose text
+    yield is within min_yield of the best wins. Backends that fail or return no text
+    are dropped. Pages the winner returns empty are retried on the other backends.
+    """
+
+    def __init__(self, backends: Optional[Sequence[str]] = None, probe_pages: int = 2, min_yield: float = 0.9):
+        self.backends = [b for b in (backends or list(BACKENDS)) if b in BACKENDS and BACKENDS[b].available()]
+        self.probe_pages = probe_pages
+        self.min_yield = min_yield
+
+    def probe(self, document: PdfDocument) -> Probe:
+        pages = _probe_pages(document.num_pages, self.probe_pages)
+        start = time.perf_counter()
+        chars = sum(_text_chars(document.page_text(page)) for page in pages)
+        return Probe(document.backend, time.perf_counter() - start, chars)
+
+    def choose(self, probes: List[Probe]) -> Optional[Probe]:
+        useful = [p for p in probes if p.chars > 0]
+        if not useful:
+            return None
+        best_yield = max(p.chars for p in useful)
+        return max((p for p in useful if p.chars >= best_yield * self.min_yield), key=lambda p: p.speed)
+
+    @contextlib.contextmanager
+    def open(self, path: str, backend: str = "auto") -> Iterator[PdfDocument]:
+        """Open with one named backend, or with backend="auto" select per document."""
+        if backend != "auto":
+            with BACKENDS[backend]().open(path) as document:
+                yield document
+            return
+
+        if not self.backends:
+            raise RuntimeError("No PDF extraction backend installed (pypdf, PyPDF2, pdfminer.six or pypdfium2)")
+        if len(self.backends) == 1:
+            # Nothing to choose between or fall back to
+            with BACKENDS[self.backends[0]]().open(path) as document:
+                yield document
+            return
+        with contextlib.ExitStack() as stack:
+            documents: Dict[str, PdfDocument] = {}
+            probes = []
+            for name in self.backends:
+                try:
+                    document = stack.enter_context(BACKENDS[name]().open(path))
+                    probes.append(self.probe(document))
+                    documents[name] = document
+                except Exception as e:
+                    logger.debug(f"Backend {name} failed on {path}: {str(e)}")
+            if not documents:
+                raise RuntimeError(f"No extraction backend could open {path}")
+            chosen = self.choose(probes)
+            # Scanned PDFs yield nothing anywhere; keep the first backend that opened them
+            primary = chosen.backend if chosen else next(iter(documents))
+            logger.debug(f"Selected {primary} for {path}: " +
+                         ", ".join(f"{p.backend} {p.chars} chars/{p.seconds * 1000:.0f}ms" for p in probes))
+            yield _FallbackDocument(documents[primary], [d for n, d in documents.items() if n != primary])
+
+
+# Shared selector over every installed backend
+default_selector = BackendSelector()
+
+
+def open_document(path: str, backend: str = "auto") -> "contextlib.AbstractContextManager[PdfDocument]":
+    """Open a PDF with the named backend, or the best one for this document."""
+    return default_selector.open(path, backend)
+
+
+def benchmark(paths: Sequence[str], backends: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """Extract every page of every file with each backend; totals of time, pages, chars and failures."""
+    results: Dict[str, Dict[str, Any]] = {}
+    for name in backends or available_backends():
+        totals = {"seconds": 0.0, "pages": 0, "chars": 0, "empty_pages": 0, "failures": 0}
+        for path in paths:
+            start = time.perf_counter()
+            try:
+                with BACKENDS[name]().open(path) as document:
+                    for page in range(document.num_pages):
+                        chars = _text_chars(document.page_text(page))
+                        totals["pages"] += 1
+                        totals["chars"] += chars
+                        totals["empty_pages"] += chars == 0
+            except Exception as e:
+                logger.warning(f"{name} failed on {path}: {str(e)}")
+                totals["failures"] += 1
+            totals["seconds"] += time.perf_counter() - start
+        results[name] = totals
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare PDF extraction backends on a local corpus.")
+    parser.add_argument("corpus", help="PDF file or directory of PDFs")
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS), help="Backends to compare (default: installed)")
+    parser.add_argument("--limit", type=int, default=None, help="Use at most this many files")
+    args = parser.parse_args(argv)
+
+    corpus = Path(args.corpus)
+    paths = [str(corpus)] if corpus.is_file() else sorted(str(p) for p in corpus.rglob("*.pdf"))[:args.limit]
+    if not paths:
+        parser.error(f"No PDFs found in {corpus}")
+    backends = [b for b in (args.backends or available_backends()) if BACKENDS[b].available()]
+    print(f"Benchmarking {', '.join(backends) or 'no installed backends'} on {len(paths)} PDFs")
+
+    results = benchmark(paths, backends)
+    print(f"{'backend':<12}{'seconds':>10}{'pages/s':>10}{'chars':>12}{'empty':>8}{'failed':>8}")
+    for name, totals in sorted(results.items(), key=lambda item: item[1]["seconds"]):
+        rate = totals["pages"] / totals["seconds"] if totals["seconds"] else 0.0
+        print(f"{name:<12}{totals['seconds']:>10.2f}{rate:>10.1f}{totals['chars']:>12}"
+              f"{totals['empty_pages']:>8}{totals['failures']:>8}")
+    with open_document(paths[0]) as document:
+        print(f"Auto selection for {os.path.basename(paths[0])}: {document.backend}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,142 @@
+import os
+import mmap
+import logging
+import tempfile
+import contextlib
+from typing import AsyncIterator, Callable, Iterable, Iterator, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Extra resident memory one document may add while its pages are extracted
+DEFAULT_DOCUMENT_MEMORY = int(os.getenv("RESEARCH_PDF_MEMORY_MB", "512")) << 20
+# Largest PDF that is downloaded at all; scanned theses beyond this are left at abstract depth
+DEFAULT_MAX_DOWNLOAD = int(os.getenv("RESEARCH_PDF_MAX_MB", "200")) << 20
+
+_CHUNK_SIZE = 1 << 16
+
+
+class ExtractionLimitExceeded(Exception):
+    """A document hit one of its extraction limits; the pages read so far are still usable."""
+
+
+class MemoryCeilingExceeded(ExtractionLimitExceeded):
+    """Raised between pages once a document has used more memory than it is allowed."""
+
+
+class DownloadTooLarge(Exception):
+    """Raised while streaming a PDF that is larger than the download limit."""
+
+
+def current_rss(pid: Optional[int] = None) -> Optional[int]:
+    """Resident set size of this process (or pid) in bytes; None where it cannot be read cheaply."""
+    try:
+        with open(f"/proc/{pid or 'self'}/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss
+    except Exception:
+        return None
+
+
+class MemoryGuard:
+    """
+    Per-document memory ceiling, checked between pages.
+
+    The limit applies to growth of the process RSS since the guard was created. RSS is
+    process-wide, so documents parsed at the same time count against each other's
+    ceiling; that errs on the side of stopping early. Where RSS is unavailable the
+    guard never trips.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = DEFAULT_DOCUMENT_MEMORY):
+        self.max_bytes = max_bytes
+        self.baseline = current_rss() if max_bytes else None
+
+    def used(self) -> int:
+        rss = current_rss()
+        return rss - self.baseline if rss is not None and self.baseline is not None else 0
+
+    def check(self) -> None:
+        if self.baseline is not None and self.used() > self.max_bytes:
+            raise MemoryCeilingExceeded(f"document used {self.used() >> 20} MB, limit {self.max_bytes >> 20} MB")
+
+    def wrap(self, fn: Callable[[int], T]) -> Callable[[int], T]:
+        """fn(page) that checks the ceiling before each page is extracted."""
+        def guarded(page: int) -> T:
+            self.check()
+            return fn(page)
+        return guarded
+
+
+def _check_size(size: int, max_bytes: Optional[int], url: str) -> None:
+    if max_bytes is not None and size > max_bytes:
+        raise DownloadTooLarge(f"{url} is larger than {max_bytes >> 20} MB")
+
+
+@contextlib.contextmanager
+def spool_url(url: str, max_bytes: Optional[int] = DEFAULT_MAX_DOWNLOAD, timeout: int = 30,
+              **request_kwargs) -> Iterator[str]:
+    """Stream a URL into a temporary file chunk by chunk and yield its path; the file is removed afterwards."""
+    import requests
+    with requests.get(url, stream=True, timeout=timeout, **request_kwargs) as response:
+        response.raise_for_status()
+        _check_size(int(response.headers.get("content-length") or 0), max_bytes, url)
+        fd, path = tempfile.mkstemp(suffix=".pdf")
+        try:
+            size = 0
+            with os.fdopen(fd, "wb") as f:
+                for chunk in response.iter_content(chunk_size=_CHUNK_SIZE):
+                    size += len(chunk)
+                    _check_size(size, max_bytes, url)
+                    f.write(chunk)
+            yield path
+        finally:
+            os.unlink(path)
+
+
+@contextlib.asynccontextmanager
+async def aspool_url(client, url: str, max_bytes: Optional[int] = DEFAULT_MAX_DOWNLOAD,
+                     timeout: int = 30) -> AsyncIterator[str]:
+    """Async variant of spool_url on an httpx.AsyncClient."""
+    async with client.stream("GET", url, timeout=timeout) as response:
+        response.raise_for_status()
+        _check_size(int(response.headers.get("content-length") or 0), max_bytes, url)
+        fd, path = tempfile.mkstemp(suffix=".pdf")
+        try:
+            size = 0
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in response.aiter_bytes(chunk_size=_CHUNK_SIZE):
+                    size += len(chunk)
+                    _check_size(size, max_bytes, url)
+                    f.write(chunk)
+            yield path
+        finally:
+            os.unlink(path)
+
+
+@contextlib.contextmanager
+def open_mapped(path: str) -> Iterator[mmap.mmap]:
+    """Memory-map a file read-only; the OS pages it in on demand instead of the heap holding it."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"{path} is empty")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def iter_page_text(page_text: Callable[[int], str], pages: Iterable[int],
+                   guard: Optional[MemoryGuard] = None) -> Iterator[Tuple[int, str]]:
+    """Yield (page, text) one page at a time, stopping early if the memory ceiling is reached."""
+    for page in pages:
+        if guard is not None:
+            try:
+                guard.check()
+            except ExtractionLimitExceeded as e:
+                logger.warning(f"Stopped before page {page + 1}: {str(e)}")
+                return
+        yield page, page_text(page) or ""
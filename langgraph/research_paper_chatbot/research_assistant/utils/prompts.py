@@ -0,0 +1,204 @@
+"""
+Prompt templates laid out for Ollama's prompt (KV) prefix cache.
+
+Ollama reuses the evaluated prefix of the previous prompt for the same model, so every
+template puts its byte-identical parts first (system prompt, then fixed instructions)
+and the per-call content last. Indentation from triple-quoted source strings is
+stripped once, at import, so it never costs tokens.
+"""
+
+from typing import Dict, List, Tuple, Union
+
+Block = Union[str, Tuple[str, str]]
+
+
+def clean_prompt(text: str) -> str:
+    """Strip per-line indentation and collapse runs of blank lines."""
+    lines = [line.strip() for line in text.strip().splitlines()]
+    cleaned = []
+    for line in lines:
+        if line or (cleaned and cleaned[-1]):
+            cleaned.append(line)
+    return "\n".join(cleaned).strip()
+
+
+class PromptTemplate:
+    """A system prompt plus fixed instructions; variable blocks are always appended last."""
+
+    def __init__(self, system: str, instructions: str = ""):
+        self.system = clean_prompt(system)
+        self.instructions = clean_prompt(instructions)
+
+    def render(self, *blocks: Block) -> str:
+        """User message: the fixed instructions, then each block as "Label:\\nvalue" or raw text."""
+        parts = [self.instructions] if self.instructions else []
+        for block in blocks:
+            if isinstance(block, tuple):
+                label, value = block
+                parts.append(f"{label}:\n{value}")
+            elif block:
+                parts.append(block)
+        return "\n\n".join(parts)
+
+    def messages(self, *blocks: Block) -> List[Dict[str, str]]:
+        """Chat messages with the static system prompt first."""
+        return [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": self.render(*blocks)},
+        ]
+
+    def static_parts(self) -> List[str]:
+        """The fixed text, for token budgeting."""
+        return [self.system, self.instructions]
+
+
+TOPIC_EXPLAINER = PromptTemplate(
+    system="""You are an expert research tutor. Provide a clear, concise explanation
+        of the given topic suitable for a beginner. Structure your response with an introduction,
+        key concepts, and a brief conclusion. Keep it under 300 words.""",
+    instructions="Explain the topic below in a way that's easy to understand.",
+)
+
+RELATED_TOPICS = PromptTemplate(
+    system="""You are an expert research assistant.
+        Provide a list of 5-8 key related topics or subfields for the given research topic.
+        Return ONLY a JSON array of topic strings, no additional text or explanation.
+        Example: ["topic1", "topic2", "topic3"]""",
+    instructions="Provide related topics for the research topic below.",
+)
+
+# Section summaries share one system prompt and instruction so consecutive sections of
+# a paper reuse the [instructions][title][context] prefix; the section-specific focus
+# comes after the append-only context, right before the section text.
+SECTION_SUMMARY = PromptTemplate(
+    system="You are a helpful research assistant that provides accurate and concise summaries of academic papers.",
+    instructions="""You are summarizing one section of a research paper.
+        Use the context from previously summarized sections only to stay consistent.
+        Follow the focus points given right before the section text.""",
+)
+
+SECTION_FOCUS = {
+    "abstract": clean_prompt("""Section: ABSTRACT
+        Please provide a concise summary that captures:
+        1. The main research question or objective
+        2. The approach or methodology used
+        3. Key findings or results
+        4. The significance or implications"""),
+    "introduction": clean_prompt("""Section: INTRODUCTION/BACKGROUND
+        Focus on:
+        1. The research problem and its context
+        2. Gaps in current knowledge
+        3. Research objectives or hypotheses"""),
+    "methodology": clean_prompt("""Section: METHODOLOGY
+        Focus on:
+        1. Research design and approach
+        2. Data collection methods
+        3. Analysis techniques
+        4. Any tools or frameworks used"""),
+    "results": clean_prompt("""Section: RESULTS/FINDINGS
+        Focus on:
+        1. Key results and findings
+        2. Important data points or statistics
+        3. Any patterns or trends observed"""),
+    "discussion": clean_prompt("""Section: DISCUSSION/CONCLUSION
+        Focus on:
+        1. Interpretation of results
+        2. Implications for the field
+        3. Limitations of the study
+        4. Suggestions for future research"""),
+}
+SECTION_FOCUS_ALIASES = {
+    "background": "introduction",
+    "method": "methodology",
+    "methods": "methodology",
+    "findings": "results",
+    "conclusion": "discussion",
+}
+
+
+def section_focus(section_name: str) -> str:
+    """Focus instructions for a section type, or a generic one for other sections."""
+    key = section_name.lower()
+    key = SECTION_FOCUS_ALIASES.get(key, key)
+    if key in SECTION_FOCUS:
+        return SECTION_FOCUS[key]
+    return f"Section: {section_name.upper()}\nPlease provide a concise summary of the key points from this section."
+
+
+KEY_POINTS = PromptTemplate(
+    system="You are a research assistant that extracts key points from academic papers.",
+    instructions="""Based on the paper summary below, extract 3-5 key points.
+        Format as a bulleted list of the most important findings or contributions.""",
+)
+
+OVERALL_SUMMARY = PromptTemplate(
+    system="You are a research assistant that writes clear, concise summaries of academic papers.",
+    instructions="""Write a comprehensive but concise summary of the research paper based on the section summaries below.
+        Your summary should be structured as follows:
+        1. Introduction to the research problem
+        2. Methodology overview
+        3. Key findings
+        4. Implications and conclusions
+        Keep it under 500 words.""",
+)
+
+PAPER_SUMMARY = PromptTemplate(
+    system="You are a research assistant that summarizes academic papers accurately and concisely.",
+    instructions="""Summarize the research paper content below in a structured format.
+        Please provide:
+        1. Main objective
+        2. Key methodology
+        3. Important results
+        4. Contributions
+        Keep it concise and informative.""",
+)
+
+FORMAT_CONTENT = PromptTemplate(
+    system="You are a research assistant that turns extracted research content into well-structured markdown.",
+    instructions="""Please process the research content below and provide a well-structured summary.
+        - Extract and organize key information into clear sections
+        - Ensure the output is coherent and properly formatted
+        - Remove any truncated text or incomplete sentences
+        - Use markdown formatting with appropriate headers""",
+)
+
+DRAFT_SYSTEM = """You are an expert academic research writer. Your task is to write a comprehensive
+    research paper draft based on the provided research summaries. The paper should be well-structured,
+    coherent, and properly cited where appropriate."""
+
+RESEARCH_DRAFT = PromptTemplate(
+    system=DRAFT_SYSTEM,
+    instructions="""Please write a comprehensive research paper draft that includes the following sections:
+        1. Abstract: A brief summary of the research
+        2. Introduction: Background, problem statement, and objectives
+        3. Literature Review: Synthesis of existing research
+        4. Methodology: Research approach and methods
+        5. Results: Key findings from the research
+        6. Discussion: Interpretation of results and implications
+        7. Conclusion: Summary and future research directions
+
+        Please ensure that:
+        - The paper is well-organized with clear section headings
+        - You maintain an academic tone throughout
+        - You properly synthesize information from multiple sources
+        - You highlight key findings and their significance
+        - You include in-text citations where appropriate (e.g., [1], [2], etc.)
+        - The paper should be comprehensive but concise, approximately 1500-2000 words
+        - Include relevant examples and evidence from the provided research
+        - Conclude with practical implications and suggestions for future research
+
+        The research topic and the research summaries to base your draft on follow.""",
+)
+
+DRAFT_OUTLINE = PromptTemplate(
+    system=DRAFT_SYSTEM,
+    instructions="""Plan the research paper before it is written.
+        Return ONLY a JSON object mapping each section name to a list of 2-4 short key points.""",
+)
+
+DRAFT_SECTION = PromptTemplate(
+    system=DRAFT_SYSTEM,
+    instructions="""Write one section of the research paper in an academic tone.
+        Use in-text citations like [1], [2] that refer to the numbered excerpts.
+        Do not repeat the section heading.""",
+)
@@ -0,0 +1,63 @@
+from typing import Dict, List, Any, Callable, Optional
+from urllib.parse import urlparse
+
+from research_assistant.utils.dedup import normalize_title
+
+
+def paper_key(paper: Dict[str, Any]) -> str:
+    """Identity used to dedup papers across result lists: link first, then normalized title."""
+    link = paper.get("link")
+    if link:
+        parsed = urlparse(link)
+        return f"url:{parsed.netloc.lower()}{parsed.path.rstrip('/')}"
+    return f"title:{normalize_title(paper.get('title') or '')}"
+
+
+def reciprocal_rank_fusion(rankings: List[List[Dict[str, Any]]], k: int = 60,
+                           limit: Optional[int] = None,
+                           key_fn: Callable[[Dict[str, Any]], str] = paper_key) -> List[Dict[str, Any]]:
+    """
+    Merge several ranked result lists with reciprocal-rank fusion.
+
+    Each item scores sum(1 / (k + rank)) over the lists it appears in. Items sharing
+    a link or a normalized title are merged into the first record seen.
+    """
+    scores: Dict[str, float] = {}
+    records: Dict[str, Dict[str, Any]] = {}
+    aliases: Dict[str, str] = {}
+
+    for ranking in rankings:
+        seen_in_list = set()
+        for rank, item in enumerate(ranking, 1):
+            key = key_fn(item)
+            # The same paper can come back under different links
+            title = normalize_title(item.get("title") or "")
+            canonical = aliases.get(key) or (aliases.get(f"title:{title}") if title else None) or key
+            aliases[key] = canonical
+            if title:
+                aliases.setdefault(f"title:{title}", canonical)
+
+            # Count each paper at most once per list, at its best rank
+            if canonical in seen_in_list:
+                continue
+            seen_in_list.add(canonical)
+
+            scores[canonical] = scores.get(canonical, 0.0) + 1.0 / (k + rank)
+            if canonical not in records:
+                records[canonical] = dict(item)
+            else:
+                queries = records[canonical].setdefault("matched_queries", [])
+                for query in item.get("matched_queries", []):
+                    if query not in queries:
+                        queries.append(query)
+
+    fused = sorted(records, key=lambda key: scores[key], reverse=True)
+    if limit is not None:
+        fused = fused[:limit]
+
+    results = []
+    for key in fused:
+        record = records[key]
+        record["rrf_score"] = round(scores[key], 6)
+        results.append(record)
+    return results
@@ -0,0 +1,88 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Parameters that never change the search response and must not end up in cache keys
+_VOLATILE_PARAMS = {"api_key", "output", "no_cache", "async"}
+
+
+class SearchCache:
+    """Persistent TTL cache for search API responses, one JSON file per entry."""
+
+    def __init__(self, cache_dir: str = ".search_cache", ttl: int = 7 * 24 * 3600):
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+    def make_key(self, params: Dict[str, Any]) -> str:
+        """Build a stable key from normalized query parameters."""
+        normalized = {}
+        for key, value in params.items():
+            if key in _VOLATILE_PARAMS or value is None or value == "":
+                continue
+            if isinstance(value, str):
+                value = " ".join(value.split()).lower()
+            normalized[key] = str(value)
+        payload = json.dumps(normalized, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the cached response for these params, or None if missing or expired."""
+        if self.ttl <= 0:
+            return None
+        path = self._path(self.make_key(params))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache entry {path}: {str(e)}")
+            return None
+
+        if time.time() - entry.get("created", 0) > self.ttl:
+            logger.debug(f"Cache entry expired: {path}")
+            return None
+        return entry.get("response")
+
+    def set(self, params: Dict[str, Any], response: Dict[str, Any]) -> None:
+        """Store a response atomically so concurrent runs never read partial files."""
+        if self.ttl <= 0:
+            return
+        path = self._path(self.make_key(params))
+        try:
+            with self._lock:
+                path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"created": time.time(), "response": response}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write cache entry {path}: {str(e)}")
+
+    def purge_expired(self) -> int:
+        """Delete expired entries and return how many were removed."""
+        removed = 0
+        if not self.cache_dir.exists():
+            return removed
+        now = time.time()
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    created = json.load(f).get("created", 0)
+                if now - created > self.ttl:
+                    path.unlink()
+                    removed += 1
+            except (OSError, ValueError):
+                continue
+        return removed
@@ -0,0 +1,236 @@
+import os
+import re
+import time
+import hashlib
+import logging
+import argparse
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("note", "summary", "paper")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    doc_id TEXT UNIQUE NOT NULL,
+    kind TEXT NOT NULL,
+    title TEXT,
+    topic TEXT,
+    source TEXT,
+    signature TEXT,
+    indexed REAL
+);
+CREATE INDEX IF NOT EXISTS documents_kind ON documents(kind);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(title, topic, body, tokenize='porter unicode61');
+"""
+
+# Notes files are named "<YYYYmmdd_HHMMSS>[-<run id>]_<topic>.md"
+_NOTES_NAME = re.compile(r"^\d{8}_\d{6}(?:-[0-9a-f]+)?_(?P<topic>.+)$")
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+class SearchHit(NamedTuple):
+    doc_id: str
+    kind: str
+    title: str
+    topic: str
+    source: str
+    snippet: str
+    score: float  # bm25: lower is better
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SearchIndex:
+    """
+    SQLite FTS5 index over notes, summaries and parsed paper text.
+
+    Documents are keyed by a stable doc_id and a signature (file mtime and size, or a
+    content hash); add() skips documents whose signature is unchanged, so re-indexing a
+    notes directory only touches new or edited files, and drops notes deleted from it. Ranking is bm25 with titles
+    weighted above topics and body text.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or os.getenv("RESEARCH_SEARCH_INDEX", ".search_index.db"))
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def add(self, doc_id: str, kind: str, title: str, body: str, topic: str = "", source: str = "",
+            signature: Optional[str] = None) -> bool:
+        """Insert or replace one document; False if it is already indexed with this signature."""
+        signature = signature or _digest(body)
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT id, signature FROM documents WHERE doc_id = ?", (doc_id,)).fetchone()
+            if row and row[1] == signature:
+                return False
+            with conn:
+                if row:
+                    conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (row[0],))
+                    conn.execute("DELETE FROM documents WHERE id = ?", (row[0],))
+                cursor = conn.execute(
+                    "INSERT INTO documents (doc_id, kind, title, topic, source, signature, indexed) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (doc_id, kind, title, topic, source, signature, time.time())
+                )
+                conn.execute("INSERT INTO documents_fts (rowid, title, topic, body) VALUES (?, ?, ?, ?)",
+                             (cursor.lastrowid, title, topic, body))
+        return True
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                row = conn.execute("SELECT id FROM documents WHERE doc_id = ?", (doc_id,)).fetchone()
+                if row:
+                    conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (row[0],))
+                    conn.execute("DELETE FROM documents WHERE id = ?", (row[0],))
+
+    def index_note(self, path: str) -> bool:
+        """Index one markdown notes file unless it is unchanged since it was last indexed."""
+        path = Path(path)
+        stat = path.stat()
+        match = _NOTES_NAME.match(path.stem)
+        topic = match.group("topic") if match else ""
+        text = path.read_text(encoding="utf-8", errors="replace")
+        title = next((line.lstrip("# ").strip() for line in text.splitlines() if line.startswith("#")), path.stem)
+        return self.add(f"note:{path.resolve()}", "note", title, text, topic=topic, source=str(path),
+                        signature=f"{stat.st_mtime_ns}:{stat.st_size}")
+
+    def prune_notes(self, notes_dir: str) -> int:
+        """Remove indexed notes under a directory whose files no longer exist; returns how many."""
+        prefix = f"note:{Path(notes_dir).resolve()}{os.sep}"
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT doc_id FROM documents WHERE kind = 'note' AND substr(doc_id, 1, ?) = ?", (len(prefix), prefix)
+            ).fetchall()
+        stale = [doc_id for (doc_id,) in rows if not os.path.exists(doc_id[len("note:"):])]
+        for doc_id in stale:
+            self.remove(doc_id)
+        return len(stale)
+
+    def index_notes(self, notes_dir: str) -> int:
+        """Index new or changed notes files in a directory and drop deleted ones; returns how many were (re)indexed."""
+        indexed = 0
+        paths = sorted(Path(notes_dir).glob("*.md"))
+        for path in paths:
+            try:
+                indexed += self.index_note(str(path))
+            except OSError as e:
+                logger.warning(f"Could not index {path}: {str(e)}")
+        removed = self.prune_notes(notes_dir)
+        logger.info(f"Indexed {indexed} new or changed notes of {len(paths)} in {notes_dir}, removed {removed} deleted")
+        return indexed
+
+    def index_summaries(self, topic: str, summaries: Iterable[Dict[str, Any]]) -> int:
+        indexed = 0
+        for summary in summaries:
+            if not isinstance(summary, dict) or not summary.get("summary"):
+                continue
+            title = summary.get("title", "Untitled")
+            indexed += self.add(f"summary:{_digest(topic + '|' + title)}", "summary", title, summary["summary"],
+                                topic=topic, source=summary.get("source", ""))
+        return indexed
+
+    def index_paper(self, title: str, text: str, source: str = "", topic: str = "") -> bool:
+        """Index a paper's parsed text; the same source is replaced when its text changes."""
+        return self.add(f"paper:{source or _digest(title)}", "paper", title, text, topic=topic, source=source)
+
+    @staticmethod
+    def _quoted(query: str) -> str:
+        """Query with every word quoted, for input that is not valid FTS5 syntax."""
+        return " ".join(f'"{word}"' for word in _WORD.findall(query))
+
+    def search(self, query: str, limit: int = 10, kind: Optional[str] = None) -> List[SearchHit]:
+        """Ranked hits with a highlighted snippet of the best matching passage."""
+        sql = (
+            "SELECT d.doc_id, d.kind, d.title, d.topic, d.source,"
+            " snippet(documents_fts, 2, '[', ']', ' ... ', 16),"
+            " bm25(documents_fts, 10.0, 2.0, 1.0) AS score"
+            " FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid"
+            " WHERE documents_fts MATCH ?" + (" AND d.kind = ?" if kind else "") +
+            " ORDER BY score LIMIT ?"
+        )
+        with self._lock:
+            conn = self._connect()
+            for expression in (query, self._quoted(query)):
+                if not expression:
+                    return []
+                params = [expression] + ([kind] if kind else []) + [limit]
+                try:
+                    return [SearchHit(*row) for row in conn.execute(sql, params)]
+                except sqlite3.OperationalError as e:
+                    # FTS5 syntax error (e.g. "AI-based" or an unbalanced quote): retry as plain words
+                    logger.debug(f"Query {expression!r} failed, retrying quoted: {str(e)}")
+        return []
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._connect().execute("SELECT kind, COUNT(*) FROM documents GROUP BY kind").fetchall()
+        return dict(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_default_index: Optional[SearchIndex] = None
+_default_lock = threading.Lock()
+
+
+def get_index() -> SearchIndex:
+    """Return the process-wide search index."""
+    global _default_index
+    with _default_lock:
+        if _default_index is None:
+            _default_index = SearchIndex()
+        return _default_index
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Search past notes, summaries and parsed papers.")
+    parser.add_argument("query", nargs="?", help="FTS5 query, e.g. 'transformer AND tutoring' or plain words")
+    parser.add_argument("--kind", choices=KINDS, help="Only return one kind of document")
+    parser.add_argument("--limit", type=int, default=10, help="Maximum hits")
+    parser.add_argument("--index", default=None, help="Index database (default: $RESEARCH_SEARCH_INDEX or .search_index.db)")
+    parser.add_argument("--reindex", metavar="NOTES_DIR", help="Index new or changed notes in a directory first")
+    args = parser.parse_args(argv)
+
+    index = SearchIndex(args.index)
+    if args.reindex:
+        index.index_notes(args.reindex)
+    if not args.query:
+        print(", ".join(f"{kind}: {count}" for kind, count in sorted(index.stats().items())) or "Index is empty")
+        return
+
+    start = time.perf_counter()
+    hits = index.search(args.query, limit=args.limit, kind=args.kind)
+    elapsed = (time.perf_counter() - start) * 1000
+    for i, hit in enumerate(hits, 1):
+        print(f"{i}. [{hit.kind}] {hit.title}" + (f" ({hit.topic})" if hit.topic else ""))
+        if hit.source:
+            print(f"   {hit.source}")
+        print(f"   {' '.join(hit.snippet.split())}")
+    print(f"{len(hits)} hits in {elapsed:.1f}ms")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
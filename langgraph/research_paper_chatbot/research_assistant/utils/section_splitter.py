@@ -0,0 +1,113 @@
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+# Heading variants mapped to the canonical section names used across the pipeline
+SECTION_ALIASES = {
+    "abstract": "abstract",
+    "introduction": "introduction",
+    "related work": "related work",
+    "related works": "related work",
+    "literature review": "related work",
+    "background": "related work",
+    "methodology": "methodology",
+    "methods": "methodology",
+    "method": "methodology",
+    "materials and methods": "methodology",
+    "research methodology": "methodology",
+    "experiments": "experiments",
+    "experimental setup": "experiments",
+    "experimental results": "results",
+    "evaluation": "experiments",
+    "results": "results",
+    "findings": "results",
+    "results and discussion": "results",
+    "discussion": "discussion",
+    "conclusion": "conclusion",
+    "conclusions": "conclusion",
+    "concluding remarks": "conclusion",
+    "conclusion and future work": "conclusion",
+    "conclusions and future work": "conclusion",
+    "references": "references",
+    "bibliography": "references",
+    "acknowledgments": "acknowledgments",
+    "acknowledgements": "acknowledgments",
+    "acknowledgment": "acknowledgments",
+    "acknowledgement": "acknowledgments",
+    "appendix": "appendix",
+    "appendices": "appendix",
+    "supplementary material": "appendix",
+}
+
+
+class SectionSpan(NamedTuple):
+    """A detected section: canonical name plus offsets into the original text."""
+    name: str
+    heading_start: int  # start of the heading line
+    start: int  # start of the section body
+    end: int  # end of the section body (start of the next heading)
+
+
+class SectionSplitter:
+    """
+    Detect section headings in extracted paper text with one precompiled regex.
+
+    A heading is a whole line holding an optional number ("3.", "3.1", "III.", "A.")
+    followed by a known section name, optionally followed by ":", an em dash, or a
+    spaced hyphen or en dash and inline text ("Abstract—We study...", "Results - ...").
+    Lines like "Results show that..." or "Evaluation-driven design..." are body text.
+    Section names match in any case; the numbering does not, so "a discussion." is text.
+    """
+
+    def __init__(self, aliases: Optional[Dict[str, str]] = None):
+        self.aliases = {k.lower(): v for k, v in (aliases or SECTION_ALIASES).items()}
+        # Longest names first so "results and discussion" wins over "results"
+        names = sorted(self.aliases, key=len, reverse=True)
+        alternation = "|".join(re.escape(name).replace(r"\ ", r"\s+") for name in names)
+        self.pattern = re.compile(
+            r"^[ \t]*"
+            r"(?:(?:\d{1,2}(?:\.\d{1,2})*|[IVX]{1,5}|[A-H])[.)]?[ \t]+)?"
+            rf"(?P<name>(?i:{alternation}))"
+            # A hyphen or en dash only separates when spaced; unspaced it joins a compound word
+            r"(?:(?:[ \t]*[:—]|[ \t]+[–-](?=[ \t]|$))[ \t]*(?P<inline>[^\n]*?)|[ \t]*\.?)"
+            r"[ \t]*$",
+            re.MULTILINE,
+        )
+
+    def spans(self, text: str) -> List[SectionSpan]:
+        """Return section spans in document order; text before the first heading is 'preamble'."""
+        headings = []
+        for match in self.pattern.finditer(text):
+            name = self.aliases[" ".join(match.group("name").lower().split())]
+            body_start = match.start("inline") if match.group("inline") else match.end()
+            headings.append((name, match.start(), body_start))
+
+        spans = []
+        first = headings[0][1] if headings else len(text)
+        if first > 0:
+            spans.append(SectionSpan("preamble", 0, 0, first))
+        for i, (name, heading_start, body_start) in enumerate(headings):
+            end = headings[i + 1][1] if i + 1 < len(headings) else len(text)
+            spans.append(SectionSpan(name, heading_start, body_start, end))
+        return spans
+
+    def canonical(self, heading: str) -> Optional[str]:
+        """Canonical section name for a single heading (e.g. a PDF outline title), or None."""
+        match = self.pattern.match(heading.strip())
+        if not match:
+            return None
+        return self.aliases[" ".join(match.group("name").lower().split())]
+
+    def split(self, text: str) -> Dict[str, str]:
+        """Return {section name: body text}; repeated sections are concatenated."""
+        sections: Dict[str, str] = {}
+        for span in self.spans(text):
+            lines = [line.strip() for line in text[span.start:span.end].splitlines()]
+            body = "\n".join(line for line in lines if line)
+            if not body:
+                continue
+            sections[span.name] = f"{sections[span.name]}\n{body}" if span.name in sections else body
+        return sections
+
+
+# Shared instance so the pattern is compiled once per process
+default_splitter = SectionSplitter()
@@ -0,0 +1,109 @@
+import json
+import asyncio
+import hashlib
+import logging
+import threading
+import concurrent.futures
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def work_key(stage: str, *identity: Any, **config: Any) -> str:
+    """Stable key for a unit of work: the stage, what it works on, and the settings that change its result."""
+    payload = json.dumps([stage, identity, config], sort_keys=True, default=str)
+    return f"{stage}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """Content hash of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def llm_key(model: str, messages: Any, **options: Any) -> str:
+    """Key for one LLM call: identical model, prompt and sampling options give the same answer."""
+    return work_key("llm", model, messages, **options)
+
+
+class SingleFlight:
+    """
+    Coalesce identical work that is in flight at the same time.
+
+    The first caller for a key (the leader) runs the work; every caller that arrives
+    before it finishes waits for the same result, or the same exception, instead of
+    repeating it. Nothing is kept once the work completes, so this is not a cache.
+
+    Sync and async callers share one table of concurrent.futures.Future, so a run on
+    app.invoke and another on app.ainvoke, or two server jobs on different threads and
+    event loops, coalesce with each other.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0  # calls that were served by another caller's work
+
+    def _join(self, key: str):
+        """(future, is_leader) for key."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = concurrent.futures.Future()
+            self._calls[key] = future
+            return future, True
+
+    def _settle(self, key: str, future: concurrent.futures.Future, result: Any = None,
+                error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """Run fn() unless the same key is already running; either way return its result."""
+        future, leader = self._join(key)
+        if not leader:
+            logger.debug(f"Waiting on in-flight work: {key}")
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, result)
+        return result
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Async variant of do(); fn is called only by the leader and must return an awaitable."""
+        future, leader = self._join(key)
+        if not leader:
+            logger.debug(f"Waiting on in-flight work: {key}")
+            # shield: a cancelled follower must not cancel the shared future
+            return await asyncio.shield(asyncio.wrap_future(future))
+        try:
+            result = await fn()
+        except BaseException as e:
+            # Includes cancellation, so followers are never left waiting
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, result)
+        return result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+# Shared across every node and run in the process
+default_flight = SingleFlight()
+
@@ -0,0 +1,111 @@
+import re
+import logging
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from research_assistant.utils.section_splitter import SectionSplitter, default_splitter
+from research_assistant.utils.token_budget import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Parsers join pages with a form feed on its own line so page edges survive into cleaning
+PAGE_BREAK = "\n\f\n"
+
+DROP_SECTIONS = ("references", "acknowledgments")
+
+# Lines that are only a page number: "12", "- 12 -", "Page 3", "Page 3 of 10", "3/10"
+_PAGE_NUMBER = re.compile(r"^\W*(?:page\s*)?\d{1,4}(?:\s*(?:of|/)\s*\d{1,4})?\W*$", re.IGNORECASE)
+_DIGITS = re.compile(r"\d+")
+# "algo-\nrithm" -> "algorithm"; only when the next line continues in lower case
+_HYPHEN_BREAK = re.compile(r"(\w)-[ \t]*\n[ \t]*([a-z])")
+_BLANK_RUNS = re.compile(r"\n[ \t]*(?:\n[ \t]*)+")
+_SPACE_RUNS = re.compile(r"[ \t]{2,}")
+
+
+class CleanResult(NamedTuple):
+    """Cleaned text plus what was removed, in characters and estimated tokens."""
+    text: str
+    tokens_before: int
+    tokens_after: int
+    removed: Dict[str, int]  # characters removed per rule
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+class TextCleaner:
+    """
+    Strip what PDF extraction adds but an LLM summary never needs.
+
+    Running headers and footers are found by frequency: a line (digits masked) that
+    starts or ends at least min_page_fraction of the pages is boilerplate. Reference and
+    acknowledgment sections are cut, hyphenated line breaks rejoined and whitespace
+    collapsed.
+    """
+
+    def __init__(self, edge_lines: int = 3, min_page_fraction: float = 0.5, min_pages: int = 3,
+                 max_header_chars: int = 120, drop_sections: Iterable[str] = DROP_SECTIONS,
+                 splitter: Optional[SectionSplitter] = None):
+        self.edge_lines = edge_lines
+        self.max_header_chars = max_header_chars  # longer edge lines are body text
+        self.min_page_fraction = min_page_fraction
+        self.min_pages = min_pages
+        self.drop_sections = set(drop_sections)
+        self.splitter = splitter or default_splitter
+
+    @staticmethod
+    def _line_key(line: str) -> str:
+        """Masks page numbers and case so "Journal X, 12" matches "Journal X, 13"."""
+        return _DIGITS.sub("#", " ".join(line.lower().split()))
+
+    def _edges(self, lines: List[str]) -> List[int]:
+        """Indexes of the first and last few non-empty lines of a page."""
+        filled = [i for i, line in enumerate(lines) if line.strip() and len(line) <= self.max_header_chars]
+        return sorted(set(filled[:self.edge_lines] + filled[-self.edge_lines:]))
+
+    def strip_headers_footers(self, pages: List[str]) -> List[str]:
+        """Remove repeated edge lines and bare page numbers from each page."""
+        page_lines = [page.splitlines() for page in pages]
+        repeated = set()
+        if len(pages) >= self.min_pages:
+            counts = Counter()
+            for lines in page_lines:
+                counts.update({self._line_key(lines[i]) for i in self._edges(lines)})
+            threshold = max(2, int(len(pages) * self.min_page_fraction))
+            repeated = {key for key, count in counts.items() if count >= threshold and key}
+
+        cleaned = []
+        for lines in page_lines:
+            drop = {i for i in self._edges(lines)
+                    if self._line_key(lines[i]) in repeated or _PAGE_NUMBER.match(lines[i].strip())}
+            cleaned.append("\n".join(line for i, line in enumerate(lines) if i not in drop))
+        return cleaned
+
+    def drop_unwanted_sections(self, text: str) -> str:
+        """Cut reference/acknowledgment sections, keeping everything else in order."""
+        spans = self.splitter.spans(text)
+        if not any(span.name in self.drop_sections for span in spans):
+            return text
+        return "".join(text[span.heading_start:span.end] for span in spans if span.name not in self.drop_sections)
+
+    def clean(self, text: str) -> CleanResult:
+        """Run every rule and report the savings."""
+        removed: Dict[str, int] = {}
+        before = text
+
+        def measure(rule: str, old: str, new: str) -> str:
+            removed[rule] = removed.get(rule, 0) + len(old) - len(new)
+            return new
+
+        pages = text.split("\f")
+        text = measure("headers_footers", text, "\n".join(self.strip_headers_footers(pages)))
+        text = measure("sections", text, self.drop_unwanted_sections(text))
+        text = measure("hyphenation", text, _HYPHEN_BREAK.sub(r"\1\2", text))
+        text = measure("whitespace", text, _BLANK_RUNS.sub("\n\n", _SPACE_RUNS.sub(" ", text)).strip())
+
+        return CleanResult(text, estimate_tokens(before), estimate_tokens(text), removed)
+
+
+# Shared instance with the default rules
+default_cleaner = TextCleaner()
@@ -0,0 +1,147 @@
+import re
+import math
+import logging
+import threading
+from typing import Dict, Any, Optional, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Context sizes we allow. Ollama reloads a model whenever num_ctx changes, so sizes are
+# kept to a few coarse buckets instead of the exact token count of every prompt.
+CTX_BUCKETS = (2048, 4096, 8192, 16384, 32768)
+
+# num_ctx each model was warmed up with. Requests that fit use it, so they never
+# trigger a reload of a model that is already resident.
+_pinned_ctx: Dict[str, int] = {}
+_pinned_lock = threading.Lock()
+
+
+def pin_context(model: str, num_ctx: int) -> None:
+    """Record the num_ctx a model is loaded with; later requests for it reuse that size."""
+    with _pinned_lock:
+        _pinned_ctx[model] = num_ctx
+
+
+def pinned_context(model: Optional[str]) -> Optional[int]:
+    with _pinned_lock:
+        return _pinned_ctx.get(model) if model else None
+
+
+# Sentence end: terminal punctuation, optional closing quote/bracket, then whitespace
+_SENTENCE_END = re.compile(r"[.!?][\"')\]]?\s")
+
+
+class TokenEstimator:
+    """
+    Fast token estimate from character counts.
+
+    Starts from a chars-per-token ratio typical of llama/mistral tokenizers on English
+    prose and is recalibrated from the prompt_eval_count Ollama reports for real calls.
+    """
+
+    def __init__(self, chars_per_token: float = 3.6, smoothing: float = 0.2):
+        self.chars_per_token = chars_per_token
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+
+    def estimate(self, text: str) -> int:
+        if not text:
+            return 0
+        return int(math.ceil(len(text) / self.chars_per_token))
+
+    def calibrate(self, prompt_chars: int, prompt_tokens: Optional[int]) -> None:
+        """Fold one observed (characters, tokens) pair into the ratio."""
+        if not prompt_tokens or prompt_chars < 200:
+            return
+        observed = prompt_chars / prompt_tokens
+        # Prefix-cache hits report fewer evaluated tokens; ignore implausible ratios
+        if not 2.0 <= observed <= 6.0:
+            return
+        with self._lock:
+            self.chars_per_token += self.smoothing * (observed - self.chars_per_token)
+
+
+# Shared so calibration from any node benefits every other node
+default_estimator = TokenEstimator()
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of text with the shared estimator."""
+    return default_estimator.estimate(text)
+
+
+def trim_to_tokens(text: str, max_tokens: int, estimator: Optional[TokenEstimator] = None) -> str:
+    """Cut text to roughly max_tokens, ending at a sentence boundary when one is close."""
+    estimator = estimator or default_estimator
+    if max_tokens <= 0 or not text:
+        return ""
+    if estimator.estimate(text) <= max_tokens:
+        return text
+
+    cut = text[:int(max_tokens * estimator.chars_per_token)]
+    last_end = None
+    for match in _SENTENCE_END.finditer(cut):
+        last_end = match.end()
+    # Only back off to a sentence end if it keeps most of the budget
+    if last_end and last_end >= len(cut) // 2:
+        return cut[:last_end].rstrip()
+    space = cut.rfind(" ")
+    return cut[:space] if space > len(cut) // 2 else cut
+
+
+class TokenBudget:
+    """Choose num_ctx per request and trim variable input so the prompt fits."""
+
+    def __init__(self, max_ctx: int = 8192, min_ctx: int = CTX_BUCKETS[0], margin: float = 1.1,
+                 estimator: Optional[TokenEstimator] = None):
+        self.max_ctx = max_ctx
+        self.min_ctx = min_ctx
+        self.margin = margin  # head-room for estimation error and chat template tokens
+        self.estimator = estimator or default_estimator
+
+    def num_ctx_for(self, prompt_tokens: int, num_predict: int) -> int:
+        """Smallest context bucket holding the prompt plus the reserved output."""
+        needed = int((prompt_tokens + num_predict) * self.margin)
+        for size in CTX_BUCKETS:
+            if size >= needed and size >= self.min_ctx:
+                return min(size, self.max_ctx)
+        return self.max_ctx
+
+    def input_budget(self, fixed_parts: Iterable[str], num_predict: int) -> int:
+        """Tokens left for variable content after the fixed prompt parts and the output reserve."""
+        fixed = sum(self.estimator.estimate(part) for part in fixed_parts)
+        return max(0, int(self.max_ctx / self.margin) - num_predict - fixed)
+
+    def fit(self, text: str, fixed_parts: Iterable[str], num_predict: int) -> str:
+        """Trim variable text so it fits beside the fixed parts within max_ctx."""
+        budget = self.input_budget(list(fixed_parts), num_predict)
+        trimmed = trim_to_tokens(text, budget, self.estimator)
+        if len(trimmed) < len(text):
+            logger.info(f"Trimmed input from ~{self.estimator.estimate(text)} to ~{budget} tokens")
+        return trimmed
+
+    def options(self, prompt_parts: Iterable[str], num_predict: int, model: Optional[str] = None,
+                **base: Any) -> Dict[str, Any]:
+        """
+        Ollama options for a prompt: num_ctx sized to it and num_predict reserved for output.
+        If the model was pinned to a context that holds the prompt, that size is used instead.
+        """
+        prompt_tokens = sum(self.estimator.estimate(part) for part in prompt_parts)
+        num_ctx = self.num_ctx_for(prompt_tokens, num_predict)
+        pinned = pinned_context(model)
+        if pinned and num_ctx <= pinned:
+            num_ctx = pinned
+        return {**base, "num_ctx": num_ctx, "num_predict": num_predict}
+
+    def record(self, prompt_parts: Iterable[str], response: Any) -> None:
+        """Calibrate the estimator from an Ollama response's prompt_eval_count."""
+        try:
+            tokens = response.get("prompt_eval_count") if hasattr(response, "get") else None
+            duration = response.get("prompt_eval_duration") if hasattr(response, "get") else None
+        except Exception:
+            tokens = duration = None
+        prompt_chars = sum(len(part) for part in prompt_parts)
+        if tokens is not None and duration:
+            # A prefix-cache hit shows up as few evaluated tokens for a long prompt
+            logger.debug(f"Prompt eval: {tokens} tokens for {prompt_chars} chars in {duration / 1e6:.0f} ms")
+        self.estimator.calibrate(prompt_chars, tokens)
@@ -0,0 +1,23 @@
+from research_assistant.utils.acquisition import AcquisitionPolicy
+
+SNIPPET = ("We propose a graph neural network that learns node representations by passing messages "
+           "between neighbours, and show that it outperforms spectral baselines on citation and …")
+
+
+def test_typical_snippet_stays_at_the_abstract_tier():
+    paper = {"title": "Message passing", "link": "https://example.org/1", "snippet": SNIPPET}
+    AcquisitionPolicy().plan([paper])
+    assert paper["acquisition"] == "abstract"
+
+
+def test_thin_snippet_is_escalated_up_to_the_cap():
+    papers = [{"title": f"Paper {i}", "link": f"https://example.org/{i}", "snippet": "Graph networks."}
+              for i in range(3)]
+    AcquisitionPolicy(max_full_text=2).plan(papers)
+    assert [p["acquisition"] for p in papers] == ["full", "full", "abstract"]
+
+
+def test_paper_without_a_link_is_never_escalated():
+    paper = {"title": "No link", "snippet": ""}
+    AcquisitionPolicy(depth="full").plan([paper])
+    assert paper["acquisition"] == "abstract"
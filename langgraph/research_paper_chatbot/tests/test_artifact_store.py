@@ -0,0 +1,26 @@
+from research_assistant.utils.artifact_store import INLINE_LIMIT, ArtifactStore, load_text, make_text_handle
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    ref = store.put_text("Graph neural networks.")
+
+    assert store.put_text("Graph neural networks.") == ref
+    assert store.get_text(ref) == "Graph neural networks."
+    assert [p.name for p in tmp_path.rglob("*") if p.is_file()] == [f"{ref}.txt"]
+    assert store.get_json(store.put_json({"b": 1, "a": [2]})) == {"a": [2], "b": 1}
+
+
+def test_long_text_is_handed_around_by_reference(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    short, long = "x" * INLINE_LIMIT, "y" * (INLINE_LIMIT + 1)
+
+    assert make_text_handle(short, store=store) == {"content": short, "content_chars": INLINE_LIMIT}
+    handle = make_text_handle(long, store=store)
+    assert "content" not in handle
+    assert load_text(dict(handle, title="Paper"), store=store) == long
+
+
+def test_missing_blob_loads_as_empty_text(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    assert load_text({"title": "Paper", "content_ref": "ab" * 32}, store=store) == ""
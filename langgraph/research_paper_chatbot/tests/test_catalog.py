@@ -0,0 +1,52 @@
+from research_assistant.utils.catalog import Catalog, paper_id
+
+
+def test_paper_ids_prefer_arxiv_and_doi_over_titles():
+    assert paper_id({"link": "https://arxiv.org/pdf/1710.10903v3.pdf"}) == "arxiv:1710.10903"
+    assert paper_id({"link": "https://doi.org/10.1145/3292500.3330925"}) == "doi:10.1145/3292500.3330925"
+    assert paper_id({"title": "[PDF] Graph Attention Networks"}) == paper_id({"title": "graph attention networks"})
+    assert paper_id({"title": "Untitled"}) is None
+
+
+def test_papers_are_found_again_by_url_or_title(tmp_path):
+    catalog = Catalog(str(tmp_path / "catalog.db"))
+    paper = {"title": "Graph Attention Networks", "link": "https://example.org/gat", "year": 2018}
+    pid = catalog.register(paper)
+
+    assert paper["paper_id"] == pid
+    assert catalog.lookup(url="https://example.org/gat") == pid
+    assert catalog.lookup(title="graph attention networks.") == pid
+    assert catalog.lookup(url="https://example.org/other") is None
+
+    pdf = tmp_path / "gat.pdf"
+    pdf.write_bytes(b"%PDF-1.4\n")
+    catalog.record_download(pid, str(pdf))
+    assert catalog.find_download(pid) == str(pdf)
+    pdf.unlink()
+    assert catalog.find_download(pid) is None
+    catalog.close()
+
+
+def test_artifacts_are_keyed_by_config_version(tmp_path):
+    catalog = Catalog(str(tmp_path / "catalog.db"))
+    pid = catalog.register({"title": "Graph Attention Networks"})
+    catalog.put_artifact(pid, "summary", "v1", "ref-1", model="mistral")
+
+    assert catalog.get_artifact(pid, "summary", "v1") == "ref-1"
+    assert catalog.get_artifact(pid, "summary", "v2") is None
+    catalog.close()
+
+
+def test_last_run_is_the_latest_completed_one_with_outputs(tmp_path):
+    catalog = Catalog(str(tmp_path / "catalog.db"))
+    first = catalog.start_run("Graph Learning")
+    catalog.record_node(first, "search", 1.5)
+    catalog.record_node(first, "search", 0.5)
+    catalog.finish_run(first, result_ref="outputs-1")
+    failed = catalog.start_run("graph  learning")
+    catalog.finish_run(failed, status="failed")
+
+    assert catalog.last_run("GRAPH LEARNING")["run_id"] == first
+    assert catalog.last_run("protein folding") is None
+    assert catalog.run_timings(first) == {"search": 2.0}
+    catalog.close()
@@ -0,0 +1,40 @@
+from research_assistant.utils.dedup import (
+    MinHasher, NearDuplicateDetector, jaccard, merge_duplicates, title_shingles
+)
+
+BODY = " ".join(f"graph neural networks pass message number {i} between neighbouring nodes" for i in range(60))
+
+
+def test_minhash_agreement_tracks_jaccard():
+    hasher = MinHasher(num_perm=256)
+    a = title_shingles("Graph attention networks for citation analysis")
+    b = title_shingles("Graph attention networks for citation graphs")
+    sig_a, sig_b = hasher.signature(a), hasher.signature(b)
+    estimate = sum(x == y for x, y in zip(sig_a, sig_b)) / hasher.num_perm
+    assert abs(estimate - jaccard(a, b)) < 0.1
+
+
+def test_same_paper_under_tag_and_other_link_is_merged():
+    records = [
+        {"title": "Graph Attention Networks", "link": "https://arxiv.org/abs/1710.10903"},
+        {"title": "Spectral networks on graphs", "link": "https://example.org/spectral"},
+        {"title": "[PDF] Graph attention networks", "link": "https://openreview.net/pdf?id=rJXMpikCZ"},
+    ]
+    clusters = NearDuplicateDetector().find_clusters(records)
+    assert clusters == [[0, 2], [1]]
+
+    merged = merge_duplicates(records, clusters)
+    assert merged[0]["alternate_links"] == ["https://openreview.net/pdf?id=rJXMpikCZ"]
+    assert merged[0]["duplicates"] == [{"title": records[2]["title"], "link": records[2]["link"]}]
+
+
+def test_numbered_parts_stay_apart():
+    records = [{"title": "Learning on graphs: part 1"}, {"title": "Learning on graphs: part 2"}]
+    assert NearDuplicateDetector().find_clusters(records) == [[0], [1]]
+
+
+def test_same_text_under_different_titles_is_merged():
+    records = [{"title": "GNN preprint", "text": BODY}, {"title": "Message passing on graphs", "text": BODY},
+               {"title": "Unrelated", "text": " ".join(f"protein folding step {i}" for i in range(200))}]
+    clusters = NearDuplicateDetector().find_clusters(records, text_fn=lambda r: r["text"])
+    assert clusters == [[0, 1], [2]]
@@ -0,0 +1,42 @@
+import threading
+
+from research_assistant.nodes.exporter import ExportNode, wait_for_exports
+from research_assistant.utils.search_index import SearchIndex
+
+
+def state(run_id=None):
+    return {"topic": "graph learning", "run_id": run_id, "explanation": "Message passing.",
+            "search_results": [{"title": "GNNs", "snippet": "Graph networks."}], "summaries": []}
+
+
+def test_runs_of_one_topic_in_the_same_second_get_their_own_files(tmp_path):
+    node = ExportNode(output_dir=str(tmp_path), formats=["notes", "json"], background=False,
+                      search_index=SearchIndex(str(tmp_path / "index.db")))
+    first, second = node(state("a1" * 8)), node(state())
+
+    assert first["export_id"] == "a1" * 8
+    assert set(first["export_paths"].values()).isdisjoint(second["export_paths"].values())
+    assert len(list(tmp_path.glob("*.md"))) == 2
+    assert not list(tmp_path.glob(".*.tmp"))
+
+
+def test_wait_covers_only_the_callers_export(tmp_path, monkeypatch):
+    release = threading.Event()
+    node = ExportNode(output_dir=str(tmp_path), formats=["json"],
+                      search_index=SearchIndex(str(tmp_path / "index.db")))
+    export = node.export
+
+    def slow_export(snapshot, paths, now):
+        if snapshot["topic"] == "slow":
+            release.wait(10)
+        return export(snapshot, paths, now)
+
+    monkeypatch.setattr(node, "export", slow_export)
+    slow = node(dict(state(), topic="slow"))
+    fast = node(state())
+
+    assert wait_for_exports(fast["export_id"], timeout=5) == [fast["export_paths"]]
+    # The other run's export is still pending and stays queued for its own caller
+    assert wait_for_exports(slow["export_id"], timeout=0.1) == []
+    release.set()
+    assert wait_for_exports(slow["export_id"], timeout=5) == [slow["export_paths"]]
@@ -0,0 +1,87 @@
+import textwrap
+
+import pytest
+
+from research_assistant.utils.extraction_worker import ExtractionLimits, ExtractionPool, ExtractionTimeout
+from research_assistant.utils.pdf_memory import MemoryCeilingExceeded, current_rss
+
+# Stand-in for pypdf, imported by the spawned workers: the file body picks how page 1 behaves
+FAKE_PYPDF = textwrap.dedent('''
+    import time
+
+
+    class _Page:
+        def __init__(self, mode, index):
+            self.mode = mode
+            self.index = index
+
+        def extract_text(self):
+            if self.index == 1 and self.mode == b"hang":
+                time.sleep(60)
+            if self.index == 1 and self.mode == b"grow":
+                held = []
+                for _ in range(100):
+                    held.append(b"x" * (8 << 20))
+                    time.sleep(0.02)
+            return f"page {self.index}"
+
+
+    class PdfReader:
+        def __init__(self, data):
+            mode = bytes(data[:]).split(b"\\n")[1]
+            self.pages = [_Page(mode, i) for i in range(3)]
+            self.metadata = {}
+            self.outline = []
+''')
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    package = tmp_path / "fake_modules" / "pypdf"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text(FAKE_PYPDF)
+    # Spawned workers start with the parent's sys.path
+    monkeypatch.syspath_prepend(str(tmp_path / "fake_modules"))
+    pool = ExtractionPool(size=1, limits=ExtractionLimits(document_seconds=30, page_seconds=1, memory_bytes=64 << 20))
+    yield pool
+    pool.close()
+
+
+def pdf(tmp_path, mode):
+    path = tmp_path / f"{mode}.pdf"
+    path.write_bytes(b"%PDF-1.4\n" + mode.encode() + b"\n")
+    return str(path)
+
+
+def test_pages_are_extracted_in_a_worker(pool, tmp_path):
+    with pool.open(pdf(tmp_path, "ok"), backend="pypdf") as document:
+        assert document.num_pages == 3
+        assert [document.page_text(page) for page in range(3)] == ["page 0", "page 1", "page 2"]
+    assert pool.killed == 0
+
+
+def test_hung_page_kills_the_worker(pool, tmp_path):
+    with pool.open(pdf(tmp_path, "hang"), backend="pypdf") as document:
+        assert document.page_text(0) == "page 0"
+        worker = document.worker
+        with pytest.raises(ExtractionTimeout):
+            document.page_text(1)
+        # The document stays failed; the worker is gone
+        with pytest.raises(ExtractionTimeout):
+            document.page_text(2)
+    assert pool.killed == 1
+    assert not worker.process.is_alive()
+
+    # A fresh worker takes the next document
+    with pool.open(pdf(tmp_path, "ok"), backend="pypdf") as document:
+        assert document.page_text(1) == "page 1"
+
+
+@pytest.mark.skipif(current_rss() is None, reason="RSS is not readable on this platform")
+def test_memory_growth_kills_the_worker(pool, tmp_path):
+    with pool.open(pdf(tmp_path, "grow"), backend="pypdf") as document:
+        worker = document.worker
+        with pytest.raises(MemoryCeilingExceeded):
+            document.page_text(1)
+    assert pool.killed == 1
+    assert not worker.process.is_alive()
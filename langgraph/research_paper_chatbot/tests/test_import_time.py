@@ -0,0 +1,11 @@
+import pytest
+
+from research_assistant.utils.import_time import DEFAULT_MODULES, check
+
+BUDGET_MS = 150.0
+
+
+@pytest.mark.parametrize("module", DEFAULT_MODULES)
+def test_import_stays_light_and_fast(module):
+    problems = check([module], BUDGET_MS)
+    assert not problems, "\n".join(problems)
@@ -0,0 +1,125 @@
+import asyncio
+import time
+
+import pytest
+
+from research_assistant.nodes.pdf_downloader import PDFDownloaderNode
+from research_assistant.utils.catalog import Catalog
+from research_assistant.utils.mirror_fetch import HedgedFetcher, HostStats, candidate_urls, serve_stand_in
+
+
+@pytest.fixture
+def hosts():
+    """A slow and a fast stand-in mirror, in that order."""
+    servers = [serve_stand_in(delay) for delay in (2.0, 0.05)]
+    yield [f"{base}/paper.pdf" for _, base in servers]
+    for server, _ in servers:
+        server.shutdown()
+
+
+def wait_for_no_part_files(directory, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while list(directory.glob("*.part")) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return list(directory.glob("*.part"))
+
+
+def test_candidate_urls_trust_labelled_pdf_links():
+    paper = {
+        "link": "https://example.org/article/123",
+        "pdf_links": ["https://example.org/download?id=123"],
+        "alternate_links": ["https://arxiv.org/abs/2101.00001", "https://mirror.example.org/view/123"],
+    }
+    assert candidate_urls(paper) == [
+        "https://example.org/download?id=123",
+        "https://arxiv.org/pdf/2101.00001",
+        "https://export.arxiv.org/pdf/2101.00001",
+    ]
+
+
+def test_fast_mirror_wins_and_loser_part_is_removed(hosts, tmp_path):
+    slow, fast = hosts
+    fetcher = HedgedFetcher(stats=HostStats(), default_hedge_delay=0.2)
+    dest = tmp_path / "paper.pdf"
+
+    result = fetcher.fetch([slow, fast], str(dest))
+
+    assert result["url"] == fast
+    assert fetcher.hedged == 1
+    assert dest.read_bytes().startswith(b"%PDF")
+    assert not wait_for_no_part_files(tmp_path)
+
+
+def test_host_stats_reorder_candidates(hosts, tmp_path):
+    slow, fast = hosts
+    fetcher = HedgedFetcher(stats=HostStats(), default_hedge_delay=0.2)
+    assert fetcher.order([slow, fast]) == [slow, fast]
+
+    fetcher.fetch([slow, fast], str(tmp_path / "first.pdf"))
+
+    assert fetcher.order([slow, fast]) == [fast, slow]
+    # The fast host is tried first now, so no hedge is needed
+    assert fetcher.fetch([slow, fast], str(tmp_path / "second.pdf"))["url"] == fast
+    assert fetcher.hedged == 1
+
+
+def test_async_fast_mirror_wins(hosts, tmp_path):
+    httpx = pytest.importorskip("httpx")
+    slow, fast = hosts
+    fetcher = HedgedFetcher(stats=HostStats(), default_hedge_delay=0.2)
+    dest = tmp_path / "paper.pdf"
+
+    async def run():
+        async with httpx.AsyncClient() as client:
+            return await fetcher.afetch(client, [slow, fast], str(dest))
+
+    assert asyncio.run(run())["url"] == fast
+    assert dest.read_bytes().startswith(b"%PDF")
+    assert not list(tmp_path.glob("*.part"))
+
+
+@pytest.fixture
+def streaming_hosts():
+    """A mirror that answers at once but streams its body over a second, then a fast one."""
+    servers = [serve_stand_in(0.0, stream_seconds=1.0), serve_stand_in(0.05)]
+    yield [f"{base}/paper.pdf" for _, base in servers]
+    for server, _ in servers:
+        server.shutdown()
+
+
+def test_streaming_primary_is_not_hedged(streaming_hosts, tmp_path):
+    streaming, fast = streaming_hosts
+    fetcher = HedgedFetcher(stats=HostStats(), default_hedge_delay=0.2)
+    dest = tmp_path / "paper.pdf"
+
+    result = fetcher.fetch([streaming, fast], str(dest))
+
+    assert result["url"] == streaming
+    assert fetcher.hedged == 0
+    assert dest.read_bytes().startswith(b"%PDF")
+
+
+def test_async_streaming_primary_is_not_hedged(streaming_hosts, tmp_path):
+    httpx = pytest.importorskip("httpx")
+    streaming, fast = streaming_hosts
+    fetcher = HedgedFetcher(stats=HostStats(), default_hedge_delay=0.2)
+
+    async def run():
+        async with httpx.AsyncClient() as client:
+            return await fetcher.afetch(client, [streaming, fast], str(tmp_path / "paper.pdf"))
+
+    assert asyncio.run(run())["url"] == streaming
+    assert fetcher.hedged == 0
+
+
+def test_downloader_leaves_landing_pages_not_attempted(hosts, tmp_path):
+    _, fast = hosts
+    node = PDFDownloaderNode(download_dir=str(tmp_path / "pdfs"), catalog=Catalog(str(tmp_path / "catalog.db")),
+                             fetcher=HedgedFetcher(stats=HostStats()))
+    state = node({"search_results": [
+        {"title": "Landing page only", "link": "https://example.org/article/1"},
+        {"title": "Labelled PDF", "link": "https://example.org/article/2", "pdf_links": [fast.replace(".pdf", "")]},
+    ]})
+
+    statuses = {p["title"]: p["download_status"] for p in state["processed_papers"]}
+    assert statuses == {"Landing page only": "not_attempted", "Labelled PDF": "success"}
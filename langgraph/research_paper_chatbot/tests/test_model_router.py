@@ -0,0 +1,31 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from research_assistant.utils.model_router import ThroughputStats
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def test_update_made_just_before_exit_is_saved(tmp_path):
+    path = tmp_path / "stats.json"
+    script = (
+        "from research_assistant.utils.model_router import ThroughputStats\n"
+        f"stats = ThroughputStats({str(path)!r}, save_interval=3600)\n"
+        "stats.update('mistral', 20.0, 200.0)\n"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=PROJECT_ROOT, check=True, timeout=60)
+    saved = json.loads(path.read_text())
+    assert saved["mistral"]["eval_tps"] == 20.0
+    assert saved["mistral"]["samples"] == 1
+
+
+def test_updates_are_smoothed_and_reloaded(tmp_path):
+    path = tmp_path / "stats.json"
+    stats = ThroughputStats(str(path), smoothing=0.5, save_interval=3600)
+    stats.update("mistral", 10.0, None)
+    stats.update("mistral", 20.0, None)
+    stats.flush()
+    assert ThroughputStats(str(path)).get("mistral")["eval_tps"] == 15.0
+    assert not list(tmp_path.glob("*.tmp"))
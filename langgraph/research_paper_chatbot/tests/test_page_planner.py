@@ -0,0 +1,32 @@
+from research_assistant.utils.page_planner import PagePlanner
+
+PAGES = [
+    "A Study of Things\nAbstract\nWe study things.\nAcknowledgments\nWe thank our funders.",
+    "1 Introduction\nThings matter.",
+    "3 Methods\nWe measure things.",
+    "5 Conclusion\nThings were measured.\nReferences\n[1] Someone. A paper.",
+    "[2] Someone else. Another paper.",
+]
+
+
+def plan(outline):
+    return PagePlanner(max_chars=None).plan(len(PAGES), lambda page: PAGES[page], outline)
+
+
+def test_front_matter_acknowledgments_do_not_end_the_body():
+    result = plan([("A Study of Things", 0), ("Acknowledgments", 0), ("1 Introduction", 1),
+                   ("3 Methods", 2), ("5 Conclusion", 3), ("References", 3)])
+    assert result.method == "outline"
+    assert result.pages == [0, 1, 2, 3]
+    assert "We study things." in result.text
+    assert "We thank our funders." in result.text
+    assert "Things were measured." in result.text
+    assert "[1] Someone" not in result.text
+
+
+def test_heuristic_plan_cuts_references():
+    result = plan(None)
+    assert result.method == "heuristic"
+    assert 4 not in result.pages
+    assert "Things were measured." in result.text
+    assert "[1] Someone" not in result.text
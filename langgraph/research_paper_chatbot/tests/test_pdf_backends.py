@@ -0,0 +1,92 @@
+import contextlib
+import time
+
+import pytest
+
+from research_assistant.utils import pdf_backends
+from research_assistant.utils.pdf_backends import BackendSelector, ExtractionBackend, PdfDocument
+
+TEXT = "Graph neural networks learn node representations by passing messages. " * 20
+
+
+class FakeDocument(PdfDocument):
+    def __init__(self, backend, pages, delay):
+        self.backend = backend
+        self.pages = pages
+        self.delay = delay
+
+    @property
+    def num_pages(self):
+        return len(self.pages)
+
+    def page_text(self, page):
+        time.sleep(self.delay)
+        return self.pages[page]
+
+
+def fake_backend(name, pages, delay=0.0, fails=False):
+    class Backend(ExtractionBackend):
+        @classmethod
+        def available(cls):
+            return True
+
+        @contextlib.contextmanager
+        def open(self, path):
+            if fails:
+                raise ValueError("cannot parse")
+            yield FakeDocument(name, pages, delay)
+
+    Backend.name = name
+    return Backend
+
+
+@pytest.fixture
+def register(monkeypatch):
+    def add(name, pages, delay=0.0, fails=False):
+        monkeypatch.setitem(pdf_backends.BACKENDS, name, fake_backend(name, pages, delay, fails))
+        return name
+    return add
+
+
+def selected(names, **kwargs):
+    with BackendSelector(names, **kwargs).open("paper.pdf") as document:
+        return document.backend, [document.page_text(page) for page in range(document.num_pages)]
+
+
+def test_fastest_backend_with_full_yield_wins(register):
+    slow = register("slow", [TEXT] * 4, delay=0.02)
+    fast = register("fast", [TEXT] * 4)
+    assert selected([slow, fast])[0] == "fast"
+
+
+def test_fast_backend_with_low_yield_loses(register):
+    full = register("full", [TEXT] * 4, delay=0.02)
+    sparse = register("sparse", [TEXT[:len(TEXT) // 2]] * 4)
+    assert selected([sparse, full])[0] == "full"
+
+
+def test_empty_pages_fall_back_to_other_backends(register):
+    primary = register("primary", [TEXT, TEXT, TEXT, ""])
+    other = register("other", [TEXT, TEXT, TEXT, "Conclusion text"], delay=0.02)
+    backend, pages = selected([primary, other])
+    assert backend == "primary"
+    assert pages[3] == "Conclusion text"
+
+
+def test_failing_backend_is_dropped(register):
+    broken = register("broken", [], fails=True)
+    working = register("working", [TEXT] * 2, delay=0.01)
+    assert selected([broken, working]) == ("working", [TEXT] * 2)
+
+
+def test_single_backend_is_used_without_probing(register, monkeypatch):
+    only = register("only", [TEXT] * 2)
+    monkeypatch.setattr(BackendSelector, "probe", lambda self, document: pytest.fail("probed a lone backend"))
+    assert selected([only])[0] == "only"
+
+
+def test_named_backend_skips_selection(register):
+    fast = register("fast", [TEXT] * 2)
+    slow = register("slow", [TEXT] * 2, delay=0.02)
+    with BackendSelector([fast, slow]).open("paper.pdf", backend=slow) as document:
+        assert document.backend == "slow"
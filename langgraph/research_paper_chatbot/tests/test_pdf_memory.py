@@ -0,0 +1,90 @@
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from research_assistant.utils.mirror_fetch import serve_stand_in
+from research_assistant.utils.pdf_memory import (
+    DownloadTooLarge, MemoryCeilingExceeded, MemoryGuard, current_rss, iter_page_text, open_mapped, spool_url
+)
+
+BODY = b"%PDF-1.4\n" + b"0" * 300000
+
+
+@pytest.fixture
+def spool_dir(tmp_path, monkeypatch):
+    """Temporary files land here, so leftovers can be seen."""
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def unsized_host():
+    """A host that streams BODY without a Content-Length header."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(BODY)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/paper.pdf"
+    server.shutdown()
+
+
+def test_spool_streams_to_a_file_and_removes_it(spool_dir):
+    server, base = serve_stand_in(body=BODY)
+    try:
+        with spool_url(f"{base}/paper.pdf") as path:
+            with open(path, "rb") as f:
+                assert f.read() == BODY
+        assert not list(spool_dir.iterdir())
+    finally:
+        server.shutdown()
+
+
+def test_spool_rejects_declared_size_over_limit(spool_dir):
+    server, base = serve_stand_in(body=BODY)
+    try:
+        with pytest.raises(DownloadTooLarge):
+            with spool_url(f"{base}/paper.pdf", max_bytes=100000):
+                pass
+        assert not list(spool_dir.iterdir())
+    finally:
+        server.shutdown()
+
+
+def test_spool_stops_streaming_past_limit(spool_dir, unsized_host):
+    with pytest.raises(DownloadTooLarge):
+        with spool_url(unsized_host, max_bytes=100000):
+            pass
+    assert not list(spool_dir.iterdir())
+
+
+def test_open_mapped_rejects_empty_file(tmp_path):
+    empty = tmp_path / "empty.pdf"
+    empty.write_bytes(b"")
+    with pytest.raises(ValueError):
+        with open_mapped(str(empty)):
+            pass
+
+
+@pytest.mark.skipif(current_rss() is None, reason="RSS is not readable on this platform")
+def test_memory_guard_stops_page_iteration():
+    guard = MemoryGuard(max_bytes=16 << 20)
+    held = []
+
+    def page_text(page):
+        # Each page pins 32 MB, so the ceiling is crossed after the first one
+        held.append(b"x" * (32 << 20))
+        return f"page {page}"
+
+    pages = list(iter_page_text(page_text, range(5), guard))
+    assert pages == [(0, "page 0")]
+    with pytest.raises(MemoryCeilingExceeded):
+        guard.check()
@@ -0,0 +1,26 @@
+from research_assistant.utils.rank_fusion import reciprocal_rank_fusion
+
+
+def paper(title, link=None):
+    return {"title": title, "link": link or f"https://example.org/{title.split()[-1].lower()}"}
+
+
+def test_papers_found_by_several_queries_rank_first():
+    main = [paper("Message Passing"), paper("Graph Attention"), paper("Spectral Networks")]
+    expanded = [paper("Graph Attention"), paper("Spectral Networks")]
+
+    fused = reciprocal_rank_fusion([main, expanded])
+
+    assert [p["title"] for p in fused] == ["Graph Attention", "Spectral Networks", "Message Passing"]
+    assert fused[0]["rrf_score"] == round(1 / 62 + 1 / 61, 6)
+
+
+def test_same_title_under_another_link_and_tag_is_merged():
+    main = [paper("Graph Attention Networks", "https://arxiv.org/abs/1710.10903"), paper("Message Passing")]
+    other = [paper("[PDF] Graph attention networks.", "https://openreview.net/pdf?id=rJXMpikCZ")]
+
+    fused = reciprocal_rank_fusion([main, other], limit=1)
+
+    assert len(fused) == 1
+    assert fused[0]["link"] == "https://arxiv.org/abs/1710.10903"
+    assert fused[0]["rrf_score"] == round(1 / 61 + 1 / 61, 6)
@@ -0,0 +1,45 @@
+from research_assistant.nodes.refresh import RefreshNode
+from research_assistant.utils.catalog import paper_id
+
+
+def summary(paper, status="completed"):
+    return {"paper_id": paper_id(paper), "title": paper["title"], "summary": "...", "source": paper["link"],
+            "status": status}
+
+
+def test_merge_keeps_every_completed_previous_summary():
+    refound = {"title": "Graph attention networks", "link": "https://example.org/gat"}
+    dropped = {"title": "Message passing neural networks", "link": "https://example.org/mpnn"}
+    failed = {"title": "Graph isomorphism networks", "link": "https://example.org/gin"}
+    new = {"title": "Graph transformers", "link": "https://example.org/gt"}
+    state = {
+        "previous_run": {"run_id": "r1", "summaries": [summary(refound), summary(dropped), summary(failed, "error")]},
+        "search_results": [dict(refound), dict(failed), dict(new)],
+    }
+
+    state = RefreshNode("diff")(state)
+    assert [p["title"] for p in state["search_results"]] == [failed["title"], new["title"]]
+
+    state["summaries"] = [summary(failed), summary(new)]
+    state = RefreshNode("merge")(state)
+    assert sorted(s["title"] for s in state["summaries"]) == sorted(
+        p["title"] for p in (refound, dropped, failed, new))
+    assert sorted(p["paper_id"] for p in state["search_results"]) == sorted(
+        paper_id(p) for p in (refound, dropped, failed, new))
+
+
+def test_fallback_summaries_are_redone():
+    modelled = {"title": "Graph attention networks", "link": "https://example.org/gat"}
+    fallback = {"title": "Message passing neural networks", "link": "https://example.org/mpnn"}
+    state = {
+        "previous_run": {"run_id": "r1", "summaries": [
+            dict(summary(modelled), method="ollama_enhanced"),
+            dict(summary(fallback), method="pattern_extraction_only"),
+        ]},
+        "search_results": [dict(modelled), dict(fallback)],
+    }
+
+    state = RefreshNode("diff")(state)
+
+    assert [p["title"] for p in state["search_results"]] == [fallback["title"]]
+    assert [s["title"] for s in state["reused_summaries"]] == [modelled["title"]]
@@ -0,0 +1,55 @@
+import pytest
+
+pytest.importorskip("serpapi")
+pytest.importorskip("dotenv")
+
+from research_assistant.nodes import scholar_search  # noqa: E402
+from research_assistant.nodes.scholar_search import ScholarSearchNode  # noqa: E402
+
+
+@pytest.fixture
+def scholar(monkeypatch):
+    """Stand-in for SerpAPI serving `available` results; records every page request."""
+    requests = []
+
+    class GoogleSearch:
+        available = 45
+
+        def __init__(self, params):
+            self.params = params
+
+        def get_dict(self):
+            requests.append((self.params["start"], self.params["num"]))
+            start, end = self.params["start"], min(self.params["start"] + self.params["num"], self.available)
+            return {"organic_results": [{"title": f"Paper {i}", "link": f"https://example.org/{i}"}
+                                        for i in range(start, end)]}
+
+    monkeypatch.setenv("SERPAPI_API_KEY", "test")
+    monkeypatch.setattr(scholar_search, "GoogleSearch", GoogleSearch)
+    GoogleSearch.requests = requests
+    return GoogleSearch
+
+
+def node(tmp_path, **kwargs):
+    return ScholarSearchNode(cache_dir=str(tmp_path / "cache"), **kwargs)
+
+
+def test_pages_are_fetched_and_merged_in_order(scholar, tmp_path):
+    results = node(tmp_path, max_results=50)._search_scholar("q")
+
+    assert sorted(scholar.requests) == [(0, 20), (20, 20), (40, 10)]
+    # The third page came back short, so the merge stops with what exists
+    assert [r["title"] for r in results["organic_results"]] == [f"Paper {i}" for i in range(45)]
+
+
+def test_repeated_search_is_served_from_the_cache(scholar, tmp_path):
+    node(tmp_path, max_results=30)._search_scholar("q")
+    node(tmp_path, max_results=30)._search_scholar("q")
+    assert len(scholar.requests) == 2
+
+
+def test_zero_results_requested_fetches_nothing(scholar, tmp_path):
+    state = node(tmp_path, max_results=0)({"topic": "graph learning"})
+    assert state["search_results"] == []
+    assert "search_error" not in state
+    assert scholar.requests == []
@@ -0,0 +1,34 @@
+import time
+
+from research_assistant.utils.search_cache import SearchCache
+
+PARAMS = {"q": '"graph  Learning"', "engine": "google_scholar", "start": 0, "num": 20, "api_key": "secret"}
+
+
+def test_hit_ignores_key_and_query_formatting(tmp_path):
+    cache = SearchCache(str(tmp_path))
+    cache.set(PARAMS, {"organic_results": [{"title": "GNNs"}]})
+
+    same_query = dict(PARAMS, q='"Graph learning"', api_key="other")
+    assert cache.get(same_query) == {"organic_results": [{"title": "GNNs"}]}
+    assert cache.get(dict(PARAMS, start=20)) is None
+
+
+def test_entries_expire_after_the_ttl(tmp_path, monkeypatch):
+    cache = SearchCache(str(tmp_path), ttl=60)
+    cache.set(PARAMS, {"organic_results": []})
+    cache.set(dict(PARAMS, start=20), {"organic_results": []})
+    assert cache.get(PARAMS) == {"organic_results": []}
+
+    later = time.time() + 61
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert cache.get(PARAMS) is None
+    assert cache.purge_expired() == 2
+    assert not list(tmp_path.glob("*/*.json"))
+
+
+def test_zero_ttl_disables_the_cache(tmp_path):
+    cache = SearchCache(str(tmp_path), ttl=0)
+    cache.set(PARAMS, {"organic_results": []})
+    assert cache.get(PARAMS) is None
+    assert not tmp_path.exists() or not list(tmp_path.iterdir())
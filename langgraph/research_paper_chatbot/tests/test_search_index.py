@@ -0,0 +1,22 @@
+from research_assistant.utils.search_index import SearchIndex
+
+
+def test_index_notes_removes_deleted_files(tmp_path):
+    notes = tmp_path / "notes"
+    notes.mkdir()
+    kept = notes / "20240101_120000_graph_learning.md"
+    deleted = notes / "20240102_120000_protein_folding.md"
+    kept.write_text("# Graph learning\n\nMessage passing networks.")
+    deleted.write_text("# Protein folding\n\nStructure prediction.")
+    other = tmp_path / "elsewhere.md"
+    other.write_text("# Elsewhere\n\nStructure of other notes.")
+
+    index = SearchIndex(str(tmp_path / "index.db"))
+    assert index.index_notes(str(notes)) == 2
+    index.index_note(str(other))
+    deleted.unlink()
+
+    assert index.index_notes(str(notes)) == 0
+    assert index.stats() == {"note": 2}
+    assert [hit.title for hit in index.search("structure")] == ["Elsewhere"]
+    index.close()
@@ -0,0 +1,44 @@
+import pytest
+
+from research_assistant.utils.section_splitter import SectionSplitter
+from research_assistant.utils.text_cleaner import TextCleaner
+
+splitter = SectionSplitter()
+
+
+@pytest.mark.parametrize("line, name", [
+    ("Abstract", "abstract"),
+    ("1. Introduction", "introduction"),
+    ("3.1 Experimental Setup", "experiments"),
+    ("IV. RESULTS", "results"),
+    ("B. Related Work", "related work"),
+    ("Abstract—We study message passing.", "abstract"),
+    ("Abstract: We study message passing.", "abstract"),
+    ("Results - accuracy improves.", "results"),
+    ("references", "references"),
+])
+def test_headings(line, name):
+    assert splitter.canonical(line) == name
+
+
+@pytest.mark.parametrize("line", [
+    "Evaluation-driven design is common in this area.",
+    "References-based evaluation is common for summarization.",
+    "Results show that the model improves.",
+    "a discussion.",
+    "i results",
+])
+def test_body_lines_are_not_headings(line):
+    assert splitter.canonical(line) is None
+    assert [span.name for span in splitter.spans(f"Some text.\n{line}\nMore text.")] == ["preamble"]
+
+
+def test_cleaner_keeps_hyphenated_body_lines():
+    text = ("1 Introduction\nWe evaluate summaries.\n"
+            "References-based evaluation is common for this task.\n"
+            "Our key result: a 12% gain over the baseline.\n"
+            "References\n[1] A. Author. A paper.")
+    result = TextCleaner().clean(text)
+    assert "References-based evaluation is common" in result.text
+    assert "12% gain" in result.text
+    assert "[1] A. Author" not in result.text
@@ -0,0 +1,85 @@
+import os
+import threading
+import time
+import uuid
+
+import pytest
+
+from research_assistant import server
+from research_assistant.nodes.exporter import ExportNode
+from research_assistant.server import JobManager
+from research_assistant.utils.search_index import SearchIndex
+
+
+@pytest.mark.parametrize("options", [
+    {"max_papers": True},
+    {"max_papers": 0},
+    {"max_papers": 10 ** 9},
+    {"min_year": -5},
+    {"depth": "deep"},
+    {"models": {"unknown_task": "mistral"}},
+    {"models": {"summarizer": ""}},
+    {"colour": "blue"},
+])
+def test_validate_rejects_bad_options(options):
+    with pytest.raises(ValueError):
+        JobManager.validate(dict(options, topic="graph neural networks"))
+
+
+def test_validate_accepts_good_options():
+    topic, config = JobManager.validate({"topic": " graph neural networks ", "max_papers": 5,
+                                         "expand_queries": True, "models": {"summarizer": "mistral"}})
+    assert topic == "graph neural networks"
+    assert config == {"max_papers": 5, "expand_queries": True, "models": {"summarizer": "mistral"}}
+
+
+def test_each_job_waits_only_for_its_own_export(tmp_path, monkeypatch):
+    release = threading.Event()
+    exporter = ExportNode(output_dir=str(tmp_path), formats=["json"],
+                          search_index=SearchIndex(str(tmp_path / "index.db")))
+    export = exporter.export
+
+    def export_slow_topic(snapshot, paths, now):
+        if snapshot["topic"] == "slow":
+            release.wait(10)
+        return export(snapshot, paths, now)
+
+    class App:
+        def stream(self, state, stream_mode):
+            yield {"exporter": exporter(dict(state))}
+            if state["topic"] == "slow":
+                # Still busy after queuing its export, so that export is pending when the fast job waits
+                release.wait(10)
+
+    monkeypatch.setattr(exporter, "export", export_slow_topic)
+    monkeypatch.setattr(server, "get_app", lambda **config: App())
+    monkeypatch.setattr(server, "start_run", lambda topic, refresh=False, **config: {
+        "topic": topic, "run_id": uuid.uuid4().hex, "search_results": [], "summaries": []})
+    monkeypatch.setattr(server, "finish_run", lambda state, status="completed": None)
+    jobs = JobManager(max_jobs=2, output_dir=str(tmp_path))
+
+    slow = jobs.submit("slow", {})
+    try:
+        # The slow job's export is queued by the time its exporter step is reported
+        assert reached(slow, "exporter")
+        fast = jobs.submit("fast", {})
+        assert wait_until(lambda: fast.done)
+        assert fast.status == "completed" and not slow.done
+        assert os.path.exists(fast.state["export_paths"]["json"])
+        release.set()
+        assert wait_until(lambda: slow.done)
+        assert os.path.exists(slow.state["export_paths"]["json"])
+    finally:
+        release.set()
+        jobs.shutdown()
+
+
+def reached(job, node):
+    return any(event == "node" and data["node"] == node for _, event, data in job.events(heartbeat=0.1))
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return condition()
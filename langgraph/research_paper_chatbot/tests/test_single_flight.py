@@ -0,0 +1,76 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+
+import pytest
+
+from research_assistant.utils.single_flight import SingleFlight, llm_key
+
+
+def run_concurrently(flight, fn, callers=4):
+    """Call flight.do from several threads while fn is held; returns each caller's outcome."""
+    release = threading.Event()
+
+    def held():
+        release.wait(5)
+        return fn()
+
+    with concurrent.futures.ThreadPoolExecutor(callers) as executor:
+        futures = [executor.submit(flight.do, "key", held) for _ in range(callers)]
+        deadline = time.monotonic() + 5
+        while flight.coalesced < callers - 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        concurrent.futures.wait(futures)
+    return futures
+
+
+def test_concurrent_identical_keys_run_once():
+    flight, calls = SingleFlight(), []
+
+    futures = run_concurrently(flight, lambda: calls.append(1) or "answer")
+
+    assert [future.result() for future in futures] == ["answer"] * 4
+    assert len(calls) == 1
+    assert flight.coalesced == 3 and flight.in_flight() == 0
+    # Finished work is not cached: the next call runs again
+    assert flight.do("key", lambda: "again") == "again"
+
+
+def test_followers_get_the_leaders_exception():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("model unavailable")
+
+    futures = run_concurrently(flight, fail)
+
+    for future in futures:
+        with pytest.raises(ValueError, match="model unavailable"):
+            future.result()
+    assert flight.in_flight() == 0
+
+
+def test_async_and_sync_callers_share_one_call():
+    flight, calls = SingleFlight(), []
+
+    async def answer():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return "answer"
+
+    async def main():
+        leader = asyncio.ensure_future(flight.ado("key", answer))
+        await asyncio.sleep(0.05)
+        follower = asyncio.to_thread(flight.do, "key", lambda: pytest.fail("ran twice"))
+        return await asyncio.gather(leader, follower)
+
+    assert asyncio.run(main()) == ["answer", "answer"]
+    assert len(calls) == 1
+
+
+def test_llm_key_depends_on_prompt_and_options():
+    messages = [{"role": "user", "content": "Explain GNNs"}]
+    assert llm_key("mistral", messages, temperature=0.3) == llm_key("mistral", list(messages), temperature=0.3)
+    assert llm_key("mistral", messages, temperature=0.3) != llm_key("mistral", messages, temperature=0.7)
@@ -0,0 +1,32 @@
+from research_assistant.utils.text_cleaner import PAGE_BREAK, TextCleaner
+
+BODY = [
+    "Graph networks learn node representations by passing messages between neighbours.",
+    "We evaluate the learned repre-\nsentations on three citation benchmarks.",
+    "Message passing is repeated for a fixed number of rounds before readout.",
+    "Attention weights let each node focus on its most informative neighbours.",
+]
+
+
+def pages():
+    return [f"Journal of Graph Learning, vol. {i + 1}\n{body}\n{i + 1}" for i, body in enumerate(BODY)]
+
+
+def test_headers_page_numbers_and_references_go_body_text_stays():
+    text = PAGE_BREAK.join(pages()) + "\nReferences\n[1] A. Author. A paper. 2020."
+
+    result = TextCleaner().clean(text)
+
+    assert "Journal of Graph Learning" not in result.text
+    assert "[1] A. Author" not in result.text
+    assert "We evaluate the learned representations on three citation benchmarks." in result.text
+    for body in (BODY[0], BODY[2], BODY[3]):
+        assert body in result.text
+    assert result.tokens_saved > 0
+    assert result.removed["headers_footers"] > 0 and result.removed["sections"] > 0
+
+
+def test_short_documents_keep_their_first_lines():
+    # Two pages are too few to tell a running header from a repeated opening line
+    text = PAGE_BREAK.join(pages()[:2])
+    assert "Journal of Graph Learning, vol. 1" in TextCleaner().clean(text).text
@@ -0,0 +1,39 @@
+from research_assistant.utils import token_budget
+from research_assistant.utils.token_budget import TokenBudget, TokenEstimator
+
+SENTENCE = "Graph networks pass messages between nodes. "
+
+
+def budget(**kwargs):
+    return TokenBudget(estimator=TokenEstimator(chars_per_token=4.0), **kwargs)
+
+
+def test_num_ctx_is_the_smallest_bucket_that_fits():
+    small = budget(max_ctx=16384).options(["x" * 4000], num_predict=500)
+    assert small == {"num_ctx": 2048, "num_predict": 500}
+    assert budget(max_ctx=16384).options(["x" * 20000], num_predict=500)["num_ctx"] == 8192
+    assert budget(max_ctx=4096).options(["x" * 100000], num_predict=500)["num_ctx"] == 4096
+
+
+def test_pinned_context_is_reused_when_the_prompt_fits(monkeypatch):
+    monkeypatch.setattr(token_budget, "_pinned_ctx", {})
+    token_budget.pin_context("mistral", 8192)
+    assert budget(max_ctx=16384).options(["x" * 4000], 500, model="mistral")["num_ctx"] == 8192
+    # A prompt too large for the pinned size still gets a bigger context
+    assert budget(max_ctx=16384).options(["x" * 40000], 500, model="mistral")["num_ctx"] == 16384
+
+
+def test_fit_trims_to_a_sentence_end_within_the_budget():
+    trimmed = budget(max_ctx=2048, margin=1.0).fit(SENTENCE * 400, ["x" * 2000], num_predict=500)
+    tokens = len(trimmed) / 4.0
+    assert 500 < tokens <= 2048 - 500 - 500
+    assert trimmed.endswith("nodes.")
+
+
+def test_estimator_calibrates_from_reported_tokens():
+    estimator = TokenEstimator(chars_per_token=4.0, smoothing=0.5)
+    TokenBudget(estimator=estimator).record(["x" * 3000], {"prompt_eval_count": 1000})
+    assert estimator.chars_per_token == 3.5
+    # Few evaluated tokens for a long prompt is a prefix-cache hit, not a ratio
+    TokenBudget(estimator=estimator).record(["x" * 3000], {"prompt_eval_count": 100})
+    assert estimator.chars_per_token == 3.5